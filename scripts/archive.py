@@ -0,0 +1,281 @@
+"""Append-only, month-partitioned job archive for long-range hiring trends.
+
+Every saved job is appended to ``data/archive/<YYYY-MM>/`` as a segment:
+
+- ``<segment>.col``: the fields trend queries touch, stored column by column
+  as narrow integers (day, dictionary-encoded company and city, seniority)
+  behind a small JSON header, so readers memory-map the file and view each
+  column in place without parsing anything
+- ``<segment>.jsonl.gz``: the full job records, gzip-compressed, for drill-down
+
+Company and city names live once in an append-only ``strings.txt``
+dictionary. Queries only open the partitions inside their date range and
+aggregate each segment with NumPy, so a year of history is counted in
+milliseconds. Small segments from frequent runs are merged once a partition
+has more than ``MAX_SEGMENTS`` of them.
+
+Usage:
+    python scripts/archive.py backfill
+    python scripts/archive.py trend --by company --since 2024-01 --until 2024-12 --top 10
+    python scripts/archive.py trend --by city --period W --company "Acme"
+"""
+
+import os
+import sys
+import gzip
+import json
+import mmap
+import time
+import struct
+import logging
+import argparse
+import threading
+from datetime import date
+
+import numpy as np
+
+from dates import day_number
+from job_stats import job_city
+from profiles import seniority
+from ranking import SENIORITY_CODES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARCHIVE_DIR = 'data/archive'
+MAGIC = b'JSARCH1\n'
+MAX_SEGMENTS = 32
+
+# Column name -> dtype; all fixed width so a segment is a set of flat arrays
+COLUMNS = {
+    'day': np.dtype('<i4'),       # days since 1970-01-01
+    'company': np.dtype('<u4'),   # id in strings.txt
+    'city': np.dtype('<u4'),      # id in strings.txt
+    'seniority': np.dtype('u1'),  # ranking.SENIORITY_CODES
+}
+
+
+def _write_segment(path, columns):
+    """Write columns as one header plus 8-byte aligned raw arrays (atomically)"""
+    rows = len(columns['day'])
+    layout = {}
+    offset = 0
+    for name, dtype in COLUMNS.items():
+        layout[name] = [dtype.str, offset]
+        offset += -(-rows * dtype.itemsize // 8) * 8
+    header = json.dumps({'rows': rows, 'columns': layout}).encode('utf-8')
+    start = -(-(len(MAGIC) + 4 + len(header)) // 8) * 8
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC + struct.pack('<I', len(header)) + header)
+        for name, dtype in COLUMNS.items():
+            f.seek(start + layout[name][1])
+            f.write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+        f.truncate(start + offset)
+    os.replace(tmp_path, path)
+
+
+class Segment:
+    """Memory-mapped view of one ``.col`` segment; columns are read lazily"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not an archive segment")
+        header_len = struct.unpack_from('<I', self._map, len(MAGIC))[0]
+        header = json.loads(self._map[len(MAGIC) + 4:len(MAGIC) + 4 + header_len])
+        self.rows = header['rows']
+        self._start = -(-(len(MAGIC) + 4 + header_len) // 8) * 8
+        self._layout = header['columns']
+
+    def column(self, name):
+        dtype, offset = self._layout[name]
+        return np.frombuffer(self._map, dtype=np.dtype(dtype), count=self.rows, offset=self._start + offset)
+
+
+class JobArchive:
+    """Writer and reader for the partitioned archive"""
+
+    def __init__(self, root=DEFAULT_ARCHIVE_DIR):
+        self.root = root
+        self.lock = threading.Lock()
+        self.strings_path = os.path.join(root, 'strings.txt')
+        self.strings = []
+        if os.path.exists(self.strings_path):
+            with open(self.strings_path, 'r', encoding='utf-8') as f:
+                self.strings = f.read().split('\n')[:-1]
+        self.string_ids = {s: i for i, s in enumerate(self.strings)}
+
+    def _intern(self, values):
+        """Dictionary ids for values, appending unseen ones to strings.txt"""
+        new = []
+        ids = []
+        for value in values:
+            value = ' '.join(value.split()) or 'Unknown'
+            if value not in self.string_ids:
+                self.string_ids[value] = len(self.strings)
+                self.strings.append(value)
+                new.append(value)
+            ids.append(self.string_ids[value])
+        if new:
+            os.makedirs(self.root, exist_ok=True)
+            with open(self.strings_path, 'a', encoding='utf-8') as f:
+                f.write(''.join(f"{value}\n" for value in new))
+        return ids
+
+    def partitions(self, start=None, end=None):
+        """Month partitions (YYYY-MM) overlapping [start, end], oldest first"""
+        if not os.path.isdir(self.root):
+            return []
+        months = sorted(name for name in os.listdir(self.root) if len(name) == 7 and name[4] == '-')
+        return [m for m in months if (not start or m >= start[:7]) and (not end or m <= end[:7])]
+
+    def segments(self, month):
+        directory = os.path.join(self.root, month)
+        return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.col'))
+
+    def is_empty(self):
+        return not self.partitions()
+
+    def append(self, jobs):
+        """Append jobs as one new segment per month they fall in; returns rows written"""
+        if not jobs:
+            return 0
+        by_month = {}
+        for job in jobs:
+            by_month.setdefault(str(job.get('date_found') or date.today().isoformat())[:7], []).append(job)
+
+        with self.lock:
+            for month, month_jobs in by_month.items():
+                directory = os.path.join(self.root, month)
+                os.makedirs(directory, exist_ok=True)
+                name = os.path.join(directory, f"seg-{time.time_ns():020d}")
+                with gzip.open(name + '.jsonl.gz', 'wt', encoding='utf-8') as f:
+                    f.writelines(json.dumps(job, ensure_ascii=False) + '\n' for job in month_jobs)
+                # The .col file is written last: a segment exists once its columns do
+                _write_segment(name + '.col', {
+                    'day': [day_number(job.get('date_found')) for job in month_jobs],
+                    'company': self._intern(job.get('company') or '' for job in month_jobs),
+                    'city': self._intern(job_city(job) for job in month_jobs),
+                    'seniority': [SENIORITY_CODES[seniority(job.get('title'))] for job in month_jobs],
+                })
+                if len(self.segments(month)) > MAX_SEGMENTS:
+                    self._compact(month)
+        return len(jobs)
+
+    def _compact(self, month):
+        """Merge a partition's segments into one"""
+        paths = self.segments(month)
+        segments = [Segment(path) for path in paths]
+        columns = {name: np.concatenate([s.column(name) for s in segments]) for name in COLUMNS}
+        merged = os.path.join(self.root, month, f"seg-{time.time_ns():020d}")
+        # gzip members concatenate into a valid gzip stream
+        with open(merged + '.jsonl.gz', 'wb') as out:
+            for path in paths:
+                with open(path[:-4] + '.jsonl.gz', 'rb') as f:
+                    out.write(f.read())
+        _write_segment(merged + '.col', columns)
+        del segments, columns
+        for path in paths:
+            os.remove(path)
+            os.remove(path[:-4] + '.jsonl.gz')
+        logger.info(f"Archive: compacted {len(paths)} segments of {month}")
+
+    def iter_records(self, month):
+        """Full job records of one partition"""
+        for path in self.segments(month):
+            with gzip.open(path[:-4] + '.jsonl.gz', 'rt', encoding='utf-8') as f:
+                for line in f:
+                    yield json.loads(line)
+
+    def _ids(self, names):
+        return np.array([self.string_ids[n] for n in names if n in self.string_ids], dtype=np.uint32)
+
+    def trend(self, by='company', start=None, end=None, period='M', companies=None, cities=None, top=None):
+        """Job counts per ``by`` group (company, city or None for totals) and period.
+
+        ``period`` is a NumPy datetime unit: 'M' (month), 'W' (week) or 'D'.
+        Returns {'periods': [...], 'series': {group: [count per period]}},
+        groups ordered by total, largest first.
+        """
+        months = self.partitions(start, end)
+        if not months:
+            return {'periods': [], 'series': {}}
+        first = np.datetime64(start or f"{months[0]}-01", 'D')
+        last = np.datetime64(end, 'D') if end else (np.datetime64(months[-1], 'M') + 1).astype('datetime64[D]') - 1
+        lo, hi = first.astype(np.int64), last.astype(np.int64)
+        p0 = first.astype(f'datetime64[{period}]').astype(np.int64)
+        n_periods = int(last.astype(f'datetime64[{period}]').astype(np.int64) - p0 + 1)
+        company_ids = self._ids(companies) if companies else None
+        city_ids = self._ids(cities) if cities else None
+
+        keys = []
+        for month in months:
+            for path in self.segments(month):
+                segment = Segment(path)
+                days = segment.column('day')
+                mask = (days >= lo) & (days <= hi)
+                if company_ids is not None:
+                    mask &= np.isin(segment.column('company'), company_ids)
+                if city_ids is not None:
+                    mask &= np.isin(segment.column('city'), city_ids)
+                periods = days[mask].astype('datetime64[D]').astype(f'datetime64[{period}]').astype(np.int64) - p0
+                groups = segment.column(by)[mask].astype(np.int64) if by else 0
+                keys.append(groups * n_periods + periods)
+        if not keys:
+            return {'periods': [], 'series': {}}
+
+        # Count (group, period) pairs among matching rows only, whatever the dictionary size
+        pairs, pair_counts = np.unique(np.concatenate(keys), return_counts=True)
+        group_ids, inverse = np.unique(pairs // n_periods, return_inverse=True)
+        counts = np.zeros((len(group_ids), n_periods), dtype=np.int64)
+        counts[inverse, pairs % n_periods] = pair_counts
+        order = np.argsort(-counts.sum(axis=1), kind='stable')[:top or None]
+        labels = (np.arange(n_periods) + p0).astype(f'datetime64[{period}]').astype(str).tolist()
+        return {
+            'periods': labels,
+            'series': {(self.strings[group_ids[i]] if by else 'all'): counts[i].tolist() for i in order},
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Job archive maintenance and trend queries')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('backfill', help='archive every job in the job store (only into an empty archive)')
+    trend = sub.add_parser('trend', help='job counts per group and period')
+    trend.add_argument('--by', choices=['company', 'city', 'total'], default='company')
+    trend.add_argument('--since', help='YYYY-MM or YYYY-MM-DD')
+    trend.add_argument('--until', help='YYYY-MM or YYYY-MM-DD')
+    trend.add_argument('--period', choices=['M', 'W', 'D'], default='M')
+    trend.add_argument('--company', action='append')
+    trend.add_argument('--city', action='append')
+    trend.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    archive = JobArchive()
+    if args.command == 'backfill':
+        from job_store import open_store
+        if not archive.is_empty():
+            print("Archive already has data, nothing to backfill")
+            return
+        store = open_store()
+        written = archive.append(store.load_jobs(include_closed=True))
+        store.close()
+        print(f"Archived {written} jobs")
+        return
+
+    since = args.since + '-01' if args.since and len(args.since) == 7 else args.since
+    until = args.until
+    if until and len(until) == 7:
+        until = str((np.datetime64(until, 'M') + 1).astype('datetime64[D]') - 1)
+    started = time.perf_counter()
+    result = archive.trend(None if args.by == 'total' else args.by, since, until, args.period,
+                           args.company, args.city, args.top)
+    json.dump(result, sys.stdout, indent=2, ensure_ascii=False)
+    print(f"\n({(time.perf_counter() - started) * 1000:.1f} ms)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+import os
+import re
+import json
+import html
+import logging
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from classifier import DEFAULT_ROLES, CITY_RE, CITY_NAMES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WATCHLIST_FILE = 'watchlist.json'
+DEFAULT_STATE_FILE = 'data/connector_state.json'
+
+TAG_RE = re.compile(r'<[^>]+>')
+
+
+def plain_text(markup, limit=200):
+    """Strip HTML from a posting description and cut it to a snippet"""
+    text = re.sub(r'\s+', ' ', TAG_RE.sub(' ', html.unescape(markup or ''))).strip()
+    return text[:limit] or 'No description available'
+
+
+def india_location(*parts):
+    """Return "City, India" when any location part names an Indian city, else None"""
+    match = CITY_RE.search(' '.join(p for p in parts if p))
+    if not match:
+        return None
+    city = CITY_NAMES[match.group(1).lower()]
+    return 'India' if city == 'India' else f"{city}, India"
+
+
+class BoardConnector:
+    """Base class for an ATS that publishes a public JSON job board per company"""
+
+    name = None
+    base_url = None
+
+    def __init__(self, session, base_url=None, timeout=30, roles=DEFAULT_ROLES):
+        self.session = session
+        self.base_url = base_url or self.base_url
+        self.timeout = timeout
+        self.roles = roles
+
+    def board_url(self, board):
+        raise NotImplementedError
+
+    def parse(self, board, data):
+        """Yield job dicts for the target postings in a board response"""
+        raise NotImplementedError
+
+    def job(self, board, title, location, link, description):
+        return {
+            'title': title.strip(),
+            'company': board['company'],
+            'location': location,
+            'link': link,
+            'snippet': plain_text(description),
+            'date_found': datetime.now().strftime('%Y-%m-%d'),
+            'source': self.name,
+        }
+
+
+class GreenhouseConnector(BoardConnector):
+    name = 'greenhouse'
+    base_url = 'https://boards-api.greenhouse.io/v1/boards'
+
+    def board_url(self, board):
+        return f"{self.base_url}/{board['token']}/jobs?content=true"
+
+    def parse(self, board, data):
+        for posting in data.get('jobs', []):
+            location = india_location((posting.get('location') or {}).get('name'))
+            if location and self.roles.is_target(posting.get('title')):
+                yield self.job(board, posting['title'], location,
+                               posting['absolute_url'], posting.get('content'))
+
+
+class LeverConnector(BoardConnector):
+    name = 'lever'
+    base_url = 'https://api.lever.co/v0/postings'
+
+    def board_url(self, board):
+        return f"{self.base_url}/{board['token']}?mode=json"
+
+    def parse(self, board, data):
+        for posting in data:
+            categories = posting.get('categories') or {}
+            location = india_location(categories.get('location'), *(categories.get('allLocations') or []))
+            if location and self.roles.is_target(posting.get('text')):
+                yield self.job(board, posting['text'], location,
+                               posting['hostedUrl'], posting.get('descriptionPlain'))
+
+
+class SmartRecruitersConnector(BoardConnector):
+    name = 'smartrecruiters'
+    base_url = 'https://api.smartrecruiters.com/v1/companies'
+
+    def board_url(self, board):
+        return f"{self.base_url}/{board['token']}/postings?country=in&limit=100"
+
+    def parse(self, board, data):
+        for posting in data.get('content', []):
+            place = posting.get('location') or {}
+            location = india_location(place.get('city'), place.get('region'), 'India' if place.get('country') == 'in' else '')
+            if location and self.roles.is_target(posting.get('name')):
+                link = f"https://jobs.smartrecruiters.com/{board['token']}/{posting['id']}"
+                yield self.job(board, posting['name'], location, link, '')
+
+
+CONNECTORS = {
+    'greenhouse': GreenhouseConnector,
+    'lever': LeverConnector,
+    'smartrecruiters': SmartRecruitersConnector,
+}
+
+
+class BoardPoller:
+    """Poll a watchlist of company job boards concurrently with conditional requests.
+
+    The watchlist maps ATS names to boards, e.g.
+    ``{"greenhouse": [{"token": "phonepe", "company": "PhonePe"}]}``. Each
+    board's ETag / Last-Modified is remembered so unchanged boards cost a 304.
+    Only postings whose title matches one of ``roles`` are kept.
+    """
+
+    def __init__(self, watchlist_file=DEFAULT_WATCHLIST_FILE, state_file=DEFAULT_STATE_FILE,
+                 max_workers=8, base_urls=None, roles=DEFAULT_ROLES):
+        self.watchlist = self._load_json(watchlist_file, {})
+        self.state_file = state_file
+        self.state = self._load_json(state_file, {})
+        self.max_workers = max_workers
+
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=len(CONNECTORS), pool_maxsize=max_workers))
+        base_urls = base_urls or {}
+        self.connectors = {
+            name: cls(self.session, base_url=base_urls.get(name), roles=roles)
+            for name, cls in CONNECTORS.items()
+        }
+
+    @staticmethod
+    def _load_json(path, default):
+        if not os.path.exists(path):
+            return default
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            logger.warning(f"Invalid JSON in {path}, ignoring")
+            return default
+
+    def boards(self):
+        for name, boards in self.watchlist.items():
+            if name not in self.connectors:
+                logger.warning(f"Unknown ATS '{name}' in watchlist, skipping")
+                continue
+            for board in boards:
+                board.setdefault('company', board['token'])
+                yield self.connectors[name], board
+
+    def poll_board(self, connector, board):
+        """Fetch one board; returns (state_key, new_state, jobs)"""
+        url = connector.board_url(board)
+        key = f"{connector.name}:{board['token']}"
+        cached = self.state.get(key, {})
+        headers = {}
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+
+        try:
+            response = self.session.get(url, headers=headers, timeout=connector.timeout)
+            if response.status_code == 304:
+                return key, cached, []
+            response.raise_for_status()
+            jobs = list(connector.parse(board, response.json()))
+        except Exception as e:
+            logger.error(f"Error polling {key}: {e}")
+            return key, cached, []
+
+        state = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+        }
+        return key, state, jobs
+
+    def iter_jobs(self):
+        """Yield each board's matching jobs as soon as that board has been polled"""
+        boards = list(self.boards())
+        if not boards:
+            return
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self.poll_board, connector, board) for connector, board in boards]
+            for future in as_completed(futures):
+                key, state, jobs = future.result()
+                self.state[key] = state
+                if jobs:
+                    yield jobs
+        self.save_state()
+
+    def fetch_all(self):
+        jobs = [job for board_jobs in self.iter_jobs() for job in board_jobs]
+        logger.info(f"Board connectors returned {len(jobs)} matching jobs")
+        return jobs
+
+    def save_state(self):
+        os.makedirs(os.path.dirname(self.state_file) or '.', exist_ok=True)
+        with open(self.state_file, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=2)
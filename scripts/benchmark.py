@@ -0,0 +1,399 @@
+"""Offline benchmarks for the job search pipeline and dashboard.
+
+SerpAPI, Groq and Telegram are replaced by in-process fakes with configurable
+latency, and every run works inside a temporary directory, so nothing touches
+the network or the repository's data/ and docs/ folders.
+
+Usage:
+    python scripts/benchmark.py --sizes 1000,10000 --output benchmarks/baseline.json
+    python scripts/benchmark.py --sizes 1000 --compare benchmarks/baseline.json
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import zlib
+import shutil
+import logging
+import argparse
+import tempfile
+import contextlib
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('GROQ_API_KEY', 'offline-benchmark')
+os.environ.setdefault('SERPAPI_KEY', 'offline-benchmark')
+os.environ.setdefault('TELEGRAM_BOT_TOKEN', 'offline-benchmark')
+os.environ.setdefault('TELEGRAM_CHAT_ID', 'benchmark-chat')
+
+from job_search import JobSearchAutomation  # noqa: E402
+from archive import JobArchive  # noqa: E402
+from search_index import SearchIndex  # noqa: E402
+from generate_dashboard import generate_dashboard  # noqa: E402
+from job_store import DEFAULT_DB_PATH, JobStore  # noqa: E402
+from pipeline import StreamingPipeline  # noqa: E402
+from telegram_notifier import ChatRateLimiter  # noqa: E402
+from search_config import ATS_DOMAINS, CITIES  # noqa: E402
+
+COMPANIES = [f"Company {i}" for i in range(500)]
+TITLES = ['Product Manager', 'Senior Product Manager', 'Associate Product Manager',
+          'Principal Product Manager', 'Product Owner', 'Technical Product Manager']
+WORDS = ('roadmap platform payments growth customers discovery analytics strategy '
+         'stakeholders delivery experiments engineering design launch metrics').split()
+
+
+def make_search_results(count, seed=0):
+    """Synthetic SerpAPI organic results spread across the ATS domains"""
+    rng = random.Random(seed)
+    results = []
+    for i in range(count):
+        company = rng.choice(COMPANIES)
+        slug = company.lower().replace(' ', '')
+        results.append({
+            'position': i + 1,
+            'title': f"{rng.choice(TITLES)} - {rng.choice(CITIES)}",
+            'link': f"https://jobs.{rng.choice(ATS_DOMAINS)}/{slug}/{i}",
+            'displayed_link': f"jobs.{rng.choice(ATS_DOMAINS)} › {slug}",
+            'snippet': ' '.join(rng.choice(WORDS) for _ in range(25)),
+        })
+    return results
+
+
+def make_jobs(count, seed=0, days=365):
+    """Synthetic stored jobs found over the last ``days`` days"""
+    rng = random.Random(seed)
+    today = datetime.now()
+    return [{
+        'title': rng.choice(TITLES),
+        'company': rng.choice(COMPANIES),
+        'location': f"{rng.choice(CITIES)}, India",
+        'link': f"https://boards.greenhouse.io/bench/jobs/{seed}-{i}",
+        'snippet': ' '.join(rng.choice(WORDS) for _ in range(20)),
+        'date_found': (today - timedelta(days=rng.randrange(days))).strftime('%Y-%m-%d'),
+    } for i in range(count)]
+
+
+class FakeResponse:
+    def __init__(self, data, status_code=200):
+        self._data = data
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.headers = {}
+        self.text = json.dumps(data)
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSerpSession:
+    """Serves pages of synthetic organic results for any shard query"""
+
+    def __init__(self, results_per_shard, latency):
+        self.results_per_shard = results_per_shard
+        self.latency = latency
+
+    def get(self, url, params=None, timeout=None, **kwargs):
+        time.sleep(self.latency)
+        start = params.get('start', 0)
+        num = params.get('num', 10)
+        # crc32, not hash(): str hashes are salted per process and would change the corpus between runs
+        seed = zlib.crc32(params.get('q').encode('utf-8')) % 10000
+        shard_results = make_search_results(self.results_per_shard, seed=seed)
+        page = shard_results[start:start + num]
+        data = {'organic_results': page}
+        if start + num < len(shard_results):
+            data['serpapi_pagination'] = {'next': 'fake'}
+        return FakeResponse(data)
+
+
+class FakePageSession:
+    """Serves ATS posting pages, every other one with JobPosting JSON-LD"""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.headers = {}
+        self.hooks = {'response': []}
+
+    def get(self, url, headers=None, timeout=None, **kwargs):
+        time.sleep(self.latency)
+        response = FakeResponse({})
+        response.text = '<html><body>Job</body></html>'
+        if zlib.crc32(url.encode('utf-8')) % 2:
+            posting = {'@type': 'JobPosting', 'title': 'Product Manager',
+                       'hiringOrganization': {'name': 'Bench Co'}, 'datePosted': '2024-01-01',
+                       'jobLocation': {'address': {'addressLocality': 'Pune', 'addressCountry': 'IN'}}}
+            response.text = f'<script type="application/ld+json">{json.dumps(posting)}</script>'
+        return response
+
+
+class FakeGroqClient:
+    """Echoes every result in the prompt back as an extracted job, streamed in small chunks"""
+
+    def __init__(self, latency, chunk_chars=64):
+        self.latency = latency
+        self.chunk_chars = chunk_chars
+        self.chat = self
+        self.completions = self
+
+    def create(self, messages, **kwargs):
+        prompt = messages[-1]['content']
+        batch = json.loads(prompt.split('SEARCH RESULTS:\n', 1)[1].split('\n\nTASK:', 1)[0])
+        jobs = [{'title': r['title'], 'company': 'Bench Co', 'location': 'Pune, India',
+                 'link': r['link'], 'snippet': r.get('snippet', '')} for r in batch]
+        return self._stream(json.dumps(jobs))
+
+    def _stream(self, content):
+        pieces = [content[i:i + self.chunk_chars] for i in range(0, len(content), self.chunk_chars)]
+        for i, piece in enumerate(pieces):
+            time.sleep(self.latency / len(pieces))
+            delta = type('Delta', (), {'content': piece})
+            finish_reason = 'stop' if i == len(pieces) - 1 else None
+            choice = type('Choice', (), {'delta': delta, 'finish_reason': finish_reason})
+            yield type('Chunk', (), {'choices': [choice]})
+
+
+class FakeTelegramSession:
+    def __init__(self, latency):
+        self.latency = latency
+
+    def post(self, url, json=None, timeout=None, **kwargs):
+        time.sleep(self.latency)
+        return FakeResponse({'ok': True})
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(name, size, items, repeat, setup, target):
+    """Time ``target`` over ``repeat`` runs, each after a fresh ``setup``.
+
+    tracemalloc slows allocation-heavy code several times over, so peak memory
+    comes from one extra traced run that is not part of the timings.
+    """
+    timings = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            state = setup()
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            target(state)
+        timings.append(time.perf_counter() - started)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        state = setup()
+        tracemalloc.start()
+        target(state)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    p50 = percentile(timings, 50)
+    result = {
+        'benchmark': name,
+        'size': size,
+        'p50_seconds': round(p50, 4),
+        'p95_seconds': round(percentile(timings, 95), 4),
+        'throughput_per_second': round(items / p50, 1) if p50 else None,
+        'peak_memory_mb': round(peak / 1024 / 1024, 2),
+        'runs': repeat,
+    }
+    print(f"{name:<22} size={size:<8} p50={result['p50_seconds']:.4f}s "
+          f"p95={result['p95_seconds']:.4f}s {result['throughput_per_second']}/s "
+          f"peak={result['peak_memory_mb']}MB")
+    return result
+
+
+def make_automation(args):
+    automation = JobSearchAutomation()
+    automation.groq_client = FakeGroqClient(args.groq_latency)
+    automation.fetcher.session = FakeSerpSession(args.results_per_shard, args.serp_latency)
+    if automation.enricher:
+        automation.enricher.session = FakePageSession(args.serp_latency)
+    if automation.notifier:
+        automation.notifier.session = FakeTelegramSession(args.telegram_latency)
+        # Telegram's 1 message/s per chat pacing would dominate; time our side only
+        automation.notifier.rate_limiter = ChatRateLimiter(per_chat_interval=0, global_interval=0)
+    return automation
+
+
+def fresh_workdir(workdir):
+    """Reset the temporary working directory between runs"""
+    os.chdir('/')
+    shutil.rmtree(workdir, ignore_errors=True)
+    os.makedirs(workdir)
+    os.chdir(workdir)
+
+
+def build_store(jobs, path):
+    """Bulk-load a synthetic history once; runs copy the file instead of re-inserting 1M jobs"""
+    if os.path.exists(path):
+        os.remove(path)
+    store = JobStore(path)
+    store.import_jobs(jobs)
+    store.close()
+
+
+def seed_store(template):
+    os.makedirs('data', exist_ok=True)
+    shutil.copyfile(template, DEFAULT_DB_PATH)
+
+
+def run_benchmarks(args):
+    results = []
+    workdir = os.path.join(tempfile.mkdtemp(prefix='job-scout-bench-'), 'run')
+
+    def fresh_automation():
+        fresh_workdir(workdir)
+        return make_automation(args)
+
+    try:
+        automation = fresh_automation()
+        fetched = len(automation.plan_shards()) * args.results_per_shard
+        # The production path: fetch -> classify -> extract -> save -> notify, streamed
+        results.append(measure(
+            'pipeline_run', 0, fetched, args.repeat,
+            fresh_automation, lambda a: StreamingPipeline(a, extract_workers=a.groq_concurrency).run()
+        ))
+
+        for size in args.sizes:
+            history = make_jobs(size, seed=1)
+            batch = make_jobs(200, seed=2) + history[:200]
+            template = os.path.join(os.path.dirname(workdir), 'history.db')
+            started = time.perf_counter()
+            build_store(history, template)
+            print(f"Seeded {size} jobs in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+            def setup_store():
+                fresh_workdir(workdir)
+                seed_store(template)
+                return make_automation(args)
+
+            results.append(measure(
+                'pipeline_run', size, fetched, args.repeat,
+                setup_store, lambda a: StreamingPipeline(a, extract_workers=a.groq_concurrency).run()
+            ))
+
+            results.append(measure(
+                'save_jobs_data', size, len(batch), args.repeat,
+                setup_store, lambda a: a.save_jobs_data(batch)
+            ))
+
+            def setup_dashboard():
+                fresh_workdir(workdir)
+                seed_store(template)
+
+            results.append(measure(
+                'generate_dashboard', size, size, args.repeat,
+                setup_dashboard, lambda _: generate_dashboard()
+            ))
+
+            def setup_warm_dashboard():
+                setup_dashboard()
+                generate_dashboard()
+
+            results.append(measure(
+                'generate_dashboard_warm', size, size, args.repeat,
+                setup_warm_dashboard, lambda _: generate_dashboard()
+            ))
+
+            def setup_archive():
+                fresh_workdir(workdir)
+                archive = JobArchive()
+                # One segment per simulated daily run, as the pipeline writes them
+                by_day = {}
+                for job in history:
+                    by_day.setdefault(job['date_found'], []).append(job)
+                for jobs in by_day.values():
+                    archive.append(jobs)
+                return JobArchive()
+
+            results.append(measure(
+                'archive_trend_year', size, size, args.repeat,
+                setup_archive, lambda a: a.trend('company', top=20)
+            ))
+
+            def setup_search_index():
+                fresh_workdir(workdir)
+                index = SearchIndex()
+                for i in range(0, size, 500):
+                    index.add(history[i:i + 500])
+                return SearchIndex()
+
+            results.append(measure(
+                'search_index_query', size, size, args.repeat,
+                setup_search_index,
+                lambda index: index.search('title:prod* (bangalore OR gurgaon) -senior', since='2024-01-01')
+            ))
+    finally:
+        os.chdir('/')
+        shutil.rmtree(os.path.dirname(workdir), ignore_errors=True)
+
+    return results
+
+
+def compare(results, baseline_file, tolerance):
+    """Print p50 changes against a previous baseline; returns True on regression"""
+    with open(baseline_file, 'r') as f:
+        baseline = {(r['benchmark'], r['size']): r for r in json.load(f)['results']}
+
+    regressed = False
+    for result in results:
+        previous = baseline.get((result['benchmark'], result['size']))
+        if not previous or not previous['p50_seconds']:
+            continue
+        ratio = result['p50_seconds'] / previous['p50_seconds']
+        flag = ''
+        if ratio > 1 + tolerance:
+            flag = '  <-- REGRESSION'
+            regressed = True
+        print(f"{result['benchmark']:<22} size={result['size']:<8} {ratio:.2f}x baseline{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline job search benchmarks')
+    parser.add_argument('--sizes', default='1000,10000',
+                        help='comma-separated corpus sizes (e.g. 1000,10000,100000,1000000)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--results-per-shard', type=int, default=30)
+    parser.add_argument('--serp-latency', type=float, default=0.05, help='seconds per fake SerpAPI call')
+    parser.add_argument('--groq-latency', type=float, default=0.5, help='seconds per fake Groq call')
+    parser.add_argument('--telegram-latency', type=float, default=0.05, help='seconds per fake Telegram message')
+    parser.add_argument('--output', help='write results to this JSON baseline file')
+    parser.add_argument('--compare', help='compare against a previous baseline file')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed p50 slowdown before flagging')
+    args = parser.parse_args()
+    args.sizes = [int(s) for s in args.sizes.split(',') if s]
+    logging.getLogger().setLevel(logging.WARNING)
+
+    output = os.path.abspath(args.output) if args.output else None
+    baseline = os.path.abspath(args.compare) if args.compare else None
+
+    results = run_benchmarks(args)
+
+    if output:
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        with open(output, 'w') as f:
+            json.dump({
+                'created': datetime.now().isoformat(),
+                'python': sys.version.split()[0],
+                'config': {k: v for k, v in vars(args).items() if k not in ('output', 'compare')},
+                'results': results,
+            }, f, indent=2)
+        print(f"📄 Baseline written to {output}")
+
+    if baseline and compare(results, baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import os
+import json
+import shutil
+import logging
+import threading
+from datetime import datetime
+
+from dedup import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RUNS_DIR = 'data/runs'
+
+
+class RunCheckpoint:
+    """Append-only record of one run's progress, so a retried run resumes where it stopped.
+
+    Everything lives under ``data/runs/<run_id>/`` as JSON lines that are
+    flushed as soon as each unit of work finishes:
+
+    - ``shards.jsonl``: raw organic results of every fetched shard
+    - ``batches.jsonl``: model outcome (job or rejection) per result link
+    - ``new_jobs.jsonl``: jobs this run saved for the first time
+    - ``notified.jsonl``: jobs (or the quiet-day message) delivered per chat
+    - ``state.json``: completed stages
+
+    Resuming replays fetched shards and extracted batches from disk without
+    calling SerpAPI or Groq, re-queues new jobs whose alerts did not go out,
+    and never sends a chat anything it already received. A torn last line
+    (the run died mid-write) is ignored. A run that reached ``complete`` is
+    not resumed: running its ID again starts over.
+    """
+
+    def __init__(self, run_id=None, root=DEFAULT_RUNS_DIR, keep_runs=14):
+        self.run_id = run_id or datetime.now().strftime('%Y-%m-%dT%H%M%S')
+        self.path = os.path.join(root, self.run_id)
+        self.lock = threading.Lock()
+        os.makedirs(self.path, exist_ok=True)
+        self._prune(root, keep_runs, self.path)
+
+        state_file = os.path.join(self.path, 'state.json')
+        self.state = {'stages': []}
+        if os.path.exists(state_file):
+            with open(state_file, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+        if 'complete' in self.state['stages']:
+            logger.info(f"Run {self.run_id} already completed, starting a fresh checkpoint")
+            shutil.rmtree(self.path)
+            os.makedirs(self.path)
+            self.state = {'stages': []}
+
+        self.shards = {}
+        for record in self._read('shards.jsonl'):
+            self.shards[record['key']] = record['results']
+        self.extracted = {}
+        for record in self._read('batches.jsonl'):
+            self.extracted.update(record['results'])
+        self.new_jobs = list(self._read('new_jobs.jsonl'))
+        self.notified = {}
+        for record in self._read('notified.jsonl'):
+            self.notified.setdefault(record['chat'], set()).update(record['keys'])
+
+        if self.shards or self.new_jobs:
+            logger.info(f"Resuming run {self.run_id}: {len(self.shards)} shards, "
+                        f"{len(self.extracted)} extracted results and {len(self.new_jobs)} new jobs checkpointed")
+
+    @staticmethod
+    def _prune(root, keep_runs, current):
+        """Keep only the most recent run directories (and the one being resumed)"""
+        runs = sorted((os.path.join(root, name) for name in os.listdir(root)), key=os.path.getmtime)
+        for old in runs[:-keep_runs]:
+            if old == current:
+                continue
+            shutil.rmtree(old, ignore_errors=True)
+
+    def _read(self, name):
+        file_path = os.path.join(self.path, name)
+        if not os.path.exists(file_path):
+            return
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Ignoring incomplete checkpoint line in {file_path}")
+
+    def _append(self, name, record):
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self.lock:
+            with open(os.path.join(self.path, name), 'a', encoding='utf-8') as f:
+                f.write(line)
+
+    def record_shard(self, shard, results):
+        self.shards[shard['key']] = results
+        self._append('shards.jsonl', {'key': shard['key'], 'results': results})
+
+    def record_batch(self, batch, jobs):
+        """Like ExtractionCache.store_batch: each result's job, or None for a rejection"""
+        jobs_by_link = {canonicalize_url(job['link']): job for job in jobs}
+        outcomes = {
+            canonicalize_url(r['link']): jobs_by_link.get(canonicalize_url(r['link'])) for r in batch
+        }
+        self.extracted.update(outcomes)
+        self._append('batches.jsonl', {'results': outcomes})
+
+    def lookup(self, results):
+        """Split results into (jobs, misses) using batches already extracted this run"""
+        jobs, misses = [], []
+        for result in results:
+            key = canonicalize_url(result.get('link', ''))
+            if key not in self.extracted:
+                misses.append(result)
+            elif self.extracted[key] is not None:
+                jobs.append(self.extracted[key])
+        return jobs, misses
+
+    def record_new_jobs(self, jobs):
+        if not jobs:
+            return
+        self.new_jobs.extend(jobs)
+        with self.lock:
+            with open(os.path.join(self.path, 'new_jobs.jsonl'), 'a', encoding='utf-8') as f:
+                f.writelines(json.dumps(job, ensure_ascii=False) + '\n' for job in jobs)
+
+    def unsent(self, chat_id, keys):
+        sent = self.notified.get(chat_id, set())
+        return [key for key in keys if key not in sent]
+
+    def record_sent(self, chat_id, keys):
+        self.notified.setdefault(chat_id, set()).update(keys)
+        self._append('notified.jsonl', {'chat': chat_id, 'keys': list(keys)})
+
+    def mark(self, stage):
+        """Record a completed stage"""
+        with self.lock:
+            if stage not in self.state['stages']:
+                self.state['stages'].append(stage)
+            tmp_path = os.path.join(self.path, 'state.json.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f, indent=2)
+            os.replace(tmp_path, os.path.join(self.path, 'state.json'))
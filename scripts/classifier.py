@@ -0,0 +1,221 @@
+import re
+import logging
+from datetime import datetime
+from urllib.parse import urlparse
+
+from search_config import ATS_DOMAINS, CITIES, ROLE_TITLES
+
+logger = logging.getLogger(__name__)
+
+ACCEPT = 'accept'
+REJECT = 'reject'
+AMBIGUOUS = 'ambiguous'
+
+SENIORITY_PREFIX = r'(?:(?:associate|senior|sr\.?|principal|lead|group|staff)\s+)'
+# Product-adjacent titles that need the model to decide
+NEAR_PM_RE = re.compile(
+    r'\b(?:product\s+(?:marketing|owner|lead|head|director|operations)|'
+    r'technical\s+product|sales\s+product|project\s+manager|program\s+manager)\b',
+    re.IGNORECASE
+)
+EXCLUDED_TITLE_RE = re.compile(
+    r'\b(?:intern|internship|contract|contractor|freelance|temporary|temp)\b',
+    re.IGNORECASE
+)
+CITY_RE = re.compile(r'\b(' + '|'.join(re.escape(c) for c in CITIES) + r')\b', re.IGNORECASE)
+CITY_NAMES = {city.lower(): city for city in CITIES}
+# A bare "India" does not say where the role is based
+_INDIAN_CITIES = '|'.join(re.escape(c) for c in CITIES if c != 'India')
+INDIAN_CITY_RE = re.compile(r'\b(' + _INDIAN_CITIES + r')\b', re.IGNORECASE)
+# Snippet text that states the job location rather than merely mentioning a city
+SNIPPET_LOCATION_RE = re.compile(
+    r'\b(?:locations?|based\s+(?:in|out\s+of)|work\s+location|office\s+in)\s*[:\-–]?\s*'
+    r'(' + _INDIAN_CITIES + r')\b'
+    r'|\b(' + _INDIAN_CITIES + r')\s*,\s*(?:[a-z]+(?:\s[a-z]+)?\s*,\s*)?india\b',
+    re.IGNORECASE
+)
+# Places outside India: postings that mention one go to the model
+FOREIGN_PLACE_RE = re.compile(
+    r'\b(?:london|dublin|singapore|san\s+francisco|new\s+york|seattle|austin|boston|chicago|'
+    r'toronto|vancouver|berlin|munich|amsterdam|paris|madrid|warsaw|zurich|sydney|melbourne|'
+    r'dubai|tokyo|hong\s+kong|kuala\s+lumpur|jakarta|manila|tel\s+aviv|'
+    r'united\s+states|united\s+kingdom|ireland|canada|australia|germany|netherlands|'
+    r'france|spain|poland|japan|philippines|indonesia|malaysia|vietnam|brazil|mexico)\b',
+    re.IGNORECASE
+)
+FOREIGN_CODE_RE = re.compile(r'\b(?:USA|UK|U\.S\.|UAE)\b')
+
+
+class RoleMatcher:
+    """Title tests for the roles being searched (the profiles' ``titles``).
+
+    ``title_re`` matches a searched role with an optional seniority prefix,
+    ``keyword_re`` any word of one, so results whose title shares no word
+    with the searched roles are rejected without the model.
+    """
+
+    def __init__(self, titles=ROLE_TITLES):
+        prefix_re = re.compile(r'^' + SENIORITY_PREFIX + '+', re.IGNORECASE)
+        self.roles = list(dict.fromkeys(prefix_re.sub('', t.strip().lower()) for t in titles))
+        self.title_re = re.compile(
+            r'\b' + SENIORITY_PREFIX + r'?(?:'
+            + '|'.join(r'\s+'.join(re.escape(w) for w in role.split()) for role in self.roles) + r')\b',
+            re.IGNORECASE
+        )
+        words = dict.fromkeys(w for role in self.roles for w in role.split() if len(w) > 2)
+        self.keyword_re = re.compile('|'.join(re.escape(w) for w in words), re.IGNORECASE)
+
+    @property
+    def names(self):
+        """Searched roles for prompts, e.g. 'Product Manager or Data Scientist'"""
+        return ' or '.join(role.title() for role in self.roles)
+
+    def is_target(self, title):
+        return bool(self.title_re.search(title or '')) and not EXCLUDED_TITLE_RE.search(title or '')
+
+
+DEFAULT_ROLES = RoleMatcher()
+PM_TITLE_RE = DEFAULT_ROLES.title_re
+
+# Title decorations added by ATS pages and Google
+TITLE_PREFIX_RE = re.compile(r'^(?:job application for|careers at|apply for)\s+', re.IGNORECASE)
+TITLE_COMPANY_RE = re.compile(r'\s+(?:at|@)\s+.*$', re.IGNORECASE)
+TITLE_SPLIT_RE = re.compile(r'\s+[-–|]\s+')
+SITE_SUFFIX_RE = re.compile(r'\b(?:careers?|jobs?|workday|greenhouse|lever|hiring)\b', re.IGNORECASE)
+
+# Host patterns that carry the company slug in the URL
+COMPANY_PATH_HOSTS = (
+    'boards.greenhouse.io', 'job-boards.greenhouse.io', 'jobs.lever.co',
+    'jobs.smartrecruiters.com', 'jobs.jobvite.com',
+)
+COMPANY_SUBDOMAIN_SUFFIXES = (
+    'myworkdayjobs.com', 'bamboohr.com', 'breezy.hr', 'icims.com', 'jobvite.com',
+)
+
+
+def ats_domain(link):
+    """Return the ATS domain a link belongs to, or None"""
+    host = urlparse(link).netloc.lower().split(':')[0]
+    for domain in ATS_DOMAINS:
+        if host == domain or host.endswith('.' + domain):
+            return domain
+    return None
+
+
+def _humanize_slug(slug):
+    slug = re.sub(r'^careers-', '', slug)
+    return ' '.join(part.capitalize() for part in re.split(r'[-_]+', slug) if part)
+
+
+def company_from_link(link):
+    """Derive a company name from ATS URLs that carry the company slug"""
+    parsed = urlparse(link)
+    host = parsed.netloc.lower().split(':')[0]
+    path_parts = [p for p in parsed.path.split('/') if p]
+
+    if host in COMPANY_PATH_HOSTS and path_parts:
+        return _humanize_slug(path_parts[0])
+
+    for suffix in COMPANY_SUBDOMAIN_SUFFIXES:
+        if host.endswith('.' + suffix):
+            subdomain = host[:-len(suffix) - 1].split('.')[0]
+            if subdomain not in ('www', 'jobs', 'careers', 'boards'):
+                return _humanize_slug(subdomain)
+    return None
+
+
+def clean_title(raw_title, company=None, title_re=PM_TITLE_RE):
+    """Pick the job title out of a decorated search result title.
+
+    Keeps the segment naming the role plus a following team qualifier
+    ("Product Manager - Growth"), dropping city, company and site suffixes.
+    """
+    raw_title = TITLE_PREFIX_RE.sub('', raw_title.strip())
+    raw_title = TITLE_COMPANY_RE.sub('', raw_title)
+    segments = [s.strip() for s in TITLE_SPLIT_RE.split(raw_title)]
+    for index, segment in enumerate(segments):
+        if title_re.search(segment):
+            following = segments[index + 1] if index + 1 < len(segments) else ''
+            if (following and len(following.split()) <= 3
+                    and not CITY_RE.search(following)
+                    and not SITE_SUFFIX_RE.search(following)
+                    and (not company or following.lower() != company.lower())):
+                return f"{segment} - {following}"
+            return segment
+    return raw_title
+
+
+def located_city(title, snippet):
+    """The Indian city a result is clearly based in, or None if the model should decide.
+
+    The city must be in the title or in a location-like part of the snippet
+    ("Location: Pune", "Gurugram, Haryana, India"); any mention of a place
+    outside India makes the result ambiguous.
+    """
+    text = f"{title} {snippet}"
+    if FOREIGN_PLACE_RE.search(text) or FOREIGN_CODE_RE.search(text):
+        return None
+    match = INDIAN_CITY_RE.search(title) or SNIPPET_LOCATION_RE.search(snippet)
+    if not match:
+        return None
+    return CITY_NAMES[next(g for g in match.groups() if g).lower()]
+
+
+def classify_result(result, roles=DEFAULT_ROLES):
+    """Classify one search result as (decision, job).
+
+    ``job`` is only set for accepted results. Clear cases are decided from the
+    URL host and the searched roles' title regexes; anything else is left for
+    the model.
+    """
+    link = result.get('link', '')
+    title = result.get('title', '')
+    snippet = result.get('snippet', '')
+
+    if not link or not ats_domain(link):
+        return REJECT, None
+    if EXCLUDED_TITLE_RE.search(title):
+        return REJECT, None
+    if not roles.keyword_re.search(title):
+        return REJECT, None
+    if not roles.title_re.search(title) or NEAR_PM_RE.search(title):
+        return AMBIGUOUS, None
+
+    city = located_city(title, snippet)
+    company = company_from_link(link)
+    if not city or not company:
+        return AMBIGUOUS, None
+
+    job = {
+        'title': clean_title(title, company, roles.title_re),
+        'company': company,
+        'location': f"{city}, India",
+        'link': link,
+        'snippet': snippet[:200] or 'No description available',
+        'date_found': datetime.now().strftime('%Y-%m-%d'),
+    }
+    return ACCEPT, job
+
+
+def classify_results(results, roles=DEFAULT_ROLES):
+    """Split results into locally accepted jobs and results needing the model.
+
+    Returns (accepted_jobs, ambiguous_results, counts).
+    """
+    accepted = []
+    ambiguous = []
+    counts = {ACCEPT: 0, REJECT: 0, AMBIGUOUS: 0}
+
+    for result in results:
+        decision, job = classify_result(result, roles)
+        counts[decision] += 1
+        if decision == ACCEPT:
+            accepted.append(job)
+        elif decision == AMBIGUOUS:
+            ambiguous.append(result)
+
+    logger.info(
+        f"Pre-classifier: {counts[ACCEPT]} accepted, {counts[REJECT]} rejected, "
+        f"{counts[AMBIGUOUS]} sent to AI"
+    )
+    return accepted, ambiguous, counts
@@ -0,0 +1,18 @@
+"""Day numbers shared by the columnar stores (archive, search index, ranking)"""
+
+from datetime import date
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def today_number():
+    """Days since 1970-01-01 for today"""
+    return date.today().toordinal() - EPOCH_ORDINAL
+
+
+def day_number(value):
+    """Days since 1970-01-01 for an ISO date (or datetime) string; today if unparseable"""
+    try:
+        return date.fromisoformat(str(value)[:10]).toordinal() - EPOCH_ORDINAL
+    except (TypeError, ValueError):
+        return today_number()
@@ -0,0 +1,252 @@
+import re
+import hashlib
+import logging
+import functools
+from datetime import datetime, timedelta
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {
+    'gh_src', 'source', 'src', 'ref', 'referrer', 'lever-source', 'lever-origin',
+    'gclid', 'fbclid', 'mc_cid', 'mc_eid', 'trk', 'mode', 'in_iframe', 'iis', 'iisn',
+}
+LOCALE_SEGMENT_RE = re.compile(r'^[a-z]{2}(?:-[a-zA-Z]{2})?$')
+
+COMPANY_SUFFIX_RE = re.compile(
+    r'\b(?:private|pvt|limited|ltd|inc|llc|llp|corp|corporation|co|india|technologies|technology)\b'
+)
+TITLE_SYNONYMS = {'sr': 'senior', 'jr': 'junior', 'mgr': 'manager', 'assoc': 'associate', 'prod': 'product'}
+CITY_ALIASES = {
+    'bangalore': 'bengaluru', 'gurgaon': 'gurugram', 'new delhi': 'delhi',
+    'bombay': 'mumbai', 'madras': 'chennai', 'calcutta': 'kolkata',
+}
+
+# Canonical ATS URLs (see canonicalize_url) that end in a requisition ID
+REQUISITION_URL_RES = [
+    re.compile(r'^https://[^/]+\.myworkdayjobs\.com/.+/job/[^/]+$'),
+    re.compile(r'^https://boards\.greenhouse\.io/[^/]*/jobs/[^/]+$'),
+    re.compile(r'^greenhouse:[^:]+:.+$'),
+    re.compile(r'^https://jobs\.lever\.co/[^/]+/[^/]+$'),
+    re.compile(r'^https://jobs\.smartrecruiters\.com/[^/]+/[^/]+$'),
+    re.compile(r'^https://[^/]+\.icims\.com/jobs/[^/]+$'),
+]
+# A (company, title, city) match only counts as a repost within this many days
+KEY_MATCH_WINDOW_DAYS = 30
+
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4
+BAND_BITS = SIMHASH_BITS // SIMHASH_BANDS
+# With 4 bands of 16 bits, any pair within 3 bits shares at least one exact band
+MAX_HAMMING_DISTANCE = 3
+MIN_SNIPPET_TOKENS = 8
+
+
+def _strip_tracking(query):
+    params = [(k, v) for k, v in parse_qsl(query, keep_blank_values=True)
+              if k.lower() not in TRACKING_PARAMS and not k.lower().startswith('utm_')]
+    return urlencode(sorted(params))
+
+
+def canonicalize_url(link):
+    """Reduce an ATS posting URL to one canonical form per requisition.
+
+    Handles locale paths, apply sub-pages, embed URLs and tracking parameters
+    for the common ATS platforms; other URLs just lose tracking parameters,
+    fragments and trailing slashes.
+    """
+    parsed = urlparse(link.strip())
+    host = parsed.netloc.lower().split(':')[0]
+    parts = [p for p in parsed.path.split('/') if p]
+    query = dict(parse_qsl(parsed.query))
+
+    if host.endswith('myworkdayjobs.com') and 'job' in parts:
+        # tenant.wd5.myworkdayjobs.com/en-US/Site/job/City/Title_R123 -> tenant/Site/R123
+        tenant = host.split('.')[0]
+        parts = [p for p in parts if not LOCALE_SEGMENT_RE.match(p)]
+        site = parts[:parts.index('job')]
+        requisition = parts[-1].rsplit('_', 1)[-1]
+        return f"https://{tenant}.myworkdayjobs.com/{'/'.join(site + ['job', requisition])}"
+
+    if host.endswith('greenhouse.io'):
+        if 'token' in query and 'for' in query:
+            return f"https://boards.greenhouse.io/{query['for'].lower()}/jobs/{query['token']}"
+        if 'jobs' in parts and parts.index('jobs') + 1 < len(parts):
+            index = parts.index('jobs')
+            company = parts[index - 1].lower() if index > 0 else ''
+            return f"https://boards.greenhouse.io/{company}/jobs/{parts[index + 1]}"
+
+    if 'gh_jid' in query:
+        # Greenhouse postings embedded on a company careers site
+        return f"greenhouse:{host}:{query['gh_jid']}"
+
+    if host == 'jobs.lever.co' and len(parts) >= 2:
+        return f"https://jobs.lever.co/{parts[0].lower()}/{parts[1].lower()}"
+
+    if host == 'jobs.smartrecruiters.com' and len(parts) >= 2:
+        return f"https://jobs.smartrecruiters.com/{parts[0].lower()}/{parts[1].split('-')[0]}"
+
+    if host.endswith('icims.com') and 'jobs' in parts and parts.index('jobs') + 1 < len(parts):
+        return f"https://{host}/jobs/{parts[parts.index('jobs') + 1]}"
+
+    path = '/'.join(p for p in parts if not LOCALE_SEGMENT_RE.match(p))
+    return urlunparse(('https', host, '/' + path if path else '', '', _strip_tracking(parsed.query), ''))
+
+
+def has_requisition_id(canonical_url):
+    """Whether a canonical URL identifies one ATS requisition"""
+    return any(pattern.match(canonical_url) for pattern in REQUISITION_URL_RES)
+
+
+def _normalize_words(text):
+    return re.sub(r'[^a-z0-9 ]+', ' ', (text or '').lower()).split()
+
+
+def normalize_city(location):
+    """First component of a location, lowercased with Indian city aliases resolved"""
+    city = ' '.join(_normalize_words((location or '').split(',')[0]))
+    return CITY_ALIASES.get(city, city)
+
+
+def normalize_job_key(company, title, location):
+    """Normalized (company, title, city) key that survives cosmetic differences"""
+    company_words = COMPANY_SUFFIX_RE.sub(' ', ' '.join(_normalize_words(company))).split()
+    title_words = [TITLE_SYNONYMS.get(w, w) for w in _normalize_words(title)]
+    return '|'.join([''.join(company_words), ' '.join(title_words), normalize_city(location)])
+
+
+def simhash(text):
+    """64-bit SimHash over word unigrams and bigrams, or None for short text"""
+    words = _normalize_words(text)
+    if len(words) < MIN_SNIPPET_TOKENS:
+        return None
+
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    weights = np.sum([_feature_signs(feature) for feature in features], axis=0)
+    return int.from_bytes(np.packbits(weights > 0, bitorder='little').tobytes(), 'little')
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def _feature_signs(feature):
+    """+1/-1 per bit (least significant first) of a feature's 64-bit hash"""
+    digest = hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+    bits = np.unpackbits(np.frombuffer(digest[::-1], dtype=np.uint8), bitorder='little')
+    return bits.astype(np.int16) * 2 - 1
+
+
+def _to_signed(value):
+    """SQLite integers are signed 64-bit"""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _bands(value):
+    mask = (1 << BAND_BITS) - 1
+    return [(value >> (i * BAND_BITS)) & mask for i in range(SIMHASH_BANDS)]
+
+
+class DedupIndex:
+    """Duplicate detection over the full job history.
+
+    A job is a duplicate when its canonical URL is already known, when a
+    job found in the last ``KEY_MATCH_WINDOW_DAYS`` has the same normalized
+    (company, title, city) key (unless both URLs name their own ATS
+    requisition, i.e. they are separate openings), or when a job from the
+    same company has a near-identical snippet. Snippet SimHashes are split into
+    bands stored in indexed columns, so candidate lookup is a handful of index
+    probes rather than a pairwise scan.
+    """
+
+    INSERT_SQL = f"""
+        INSERT OR REPLACE INTO job_fingerprints
+            (link, canonical_url, job_key, company_key, simhash, {', '.join(f'band{i}' for i in range(SIMHASH_BANDS))})
+        VALUES (?, ?, ?, ?, ?, {', '.join('?' * SIMHASH_BANDS)})
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS job_fingerprints (
+                link TEXT PRIMARY KEY,
+                canonical_url TEXT NOT NULL,
+                job_key TEXT NOT NULL,
+                company_key TEXT NOT NULL,
+                simhash INTEGER,
+                {', '.join(f'band{i} INTEGER' for i in range(SIMHASH_BANDS))}
+            );
+            CREATE INDEX IF NOT EXISTS idx_fp_canonical ON job_fingerprints(canonical_url);
+            CREATE INDEX IF NOT EXISTS idx_fp_job_key ON job_fingerprints(job_key);
+            {' '.join(f'CREATE INDEX IF NOT EXISTS idx_fp_band{i} ON job_fingerprints(band{i});' for i in range(SIMHASH_BANDS))}
+        """)
+        self.conn.commit()
+
+    @staticmethod
+    def fingerprint(job):
+        company_key = normalize_job_key(job.get('company'), '', '').split('|')[0]
+        value = simhash(job.get('snippet'))
+        return {
+            'link': job['link'],
+            'canonical_url': canonicalize_url(job['link']),
+            'job_key': normalize_job_key(job.get('company'), job.get('title'), job.get('location')),
+            'company_key': company_key,
+            'simhash': value,
+            'bands': _bands(value) if value is not None else [None] * SIMHASH_BANDS,
+        }
+
+    def find_duplicate(self, job):
+        """Return the stored link this job duplicates, or None"""
+        fp = self.fingerprint(job)
+        row = self.conn.execute(
+            "SELECT link FROM job_fingerprints WHERE canonical_url = ? LIMIT 1", (fp['canonical_url'],)
+        ).fetchone()
+        if row:
+            return row[0]
+
+        own_requisition = has_requisition_id(fp['canonical_url'])
+        cutoff = (datetime.now() - timedelta(days=KEY_MATCH_WINDOW_DAYS)).strftime('%Y-%m-%d')
+        # Jobs added earlier in the same save are not in the jobs table yet (no date_found)
+        for link, canonical_url, date_found in self.conn.execute("""
+            SELECT fp.link, fp.canonical_url, jobs.date_found FROM job_fingerprints fp
+            LEFT JOIN jobs ON jobs.link = fp.link
+            WHERE fp.job_key = ?
+        """, (fp['job_key'],)):
+            if own_requisition and has_requisition_id(canonical_url):
+                continue
+            if date_found is None or date_found >= cutoff:
+                return link
+
+        if fp['simhash'] is None:
+            return None
+
+        clauses = ' OR '.join(f'band{i} = ?' for i in range(SIMHASH_BANDS))
+        candidates = self.conn.execute(
+            f"SELECT link, simhash FROM job_fingerprints WHERE company_key = ? AND ({clauses})",
+            [fp['company_key']] + fp['bands']
+        )
+        for link, other in candidates:
+            if bin((fp['simhash'] ^ other) & ((1 << 64) - 1)).count('1') <= MAX_HAMMING_DISTANCE:
+                return link
+        return None
+
+    @classmethod
+    def _row(cls, job):
+        fp = cls.fingerprint(job)
+        return [fp['link'], fp['canonical_url'], fp['job_key'], fp['company_key'],
+                _to_signed(fp['simhash']) if fp['simhash'] is not None else None] + fp['bands']
+
+    def add(self, job):
+        self.conn.execute(self.INSERT_SQL, self._row(job))
+
+    def add_many(self, jobs):
+        """Index jobs in one statement, without duplicate checks (caller commits)"""
+        self.conn.executemany(self.INSERT_SQL, map(self._row, jobs))
+
+    def backfill(self, jobs):
+        """Index stored jobs that have no fingerprint yet"""
+        count = len(jobs)
+        self.add_many(jobs)
+        self.conn.commit()
+        if count:
+            logger.info(f"Indexed {count} stored jobs for duplicate detection")
@@ -0,0 +1,335 @@
+"""Structured data from ATS posting pages.
+
+Most ATS pages embed a schema.org ``JobPosting`` as JSON-LD. Pages are
+downloaded concurrently, parsed in a process pool and cached by URL and
+ETag; results whose posting data is conclusive never reach the model.
+
+Parse saved pages (e.g. fixtures) directly with:
+    python scripts/enrichment.py page1.html page2.html
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import logging
+import sqlite3
+import threading
+import multiprocessing
+from datetime import date, datetime
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ats_connectors import plain_text, india_location
+from classifier import (ACCEPT, REJECT, AMBIGUOUS, DEFAULT_ROLES, NEAR_PM_RE, EXCLUDED_TITLE_RE,
+                        company_from_link)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_FILE = 'data/enrichment_cache.db'
+MAX_PAGE_BYTES = 1024 * 1024
+
+SCRIPT_RE = re.compile(
+    r'<script[^>]*type\s*=\s*["\']application/(ld\+)?json["\'][^>]*>(.*?)</script>',
+    re.IGNORECASE | re.DOTALL
+)
+INDIA_COUNTRY_RE = re.compile(r'^(?:in|ind|india)$', re.IGNORECASE)
+
+
+def _name(value):
+    """schema.org values may be a plain string or an object with a name"""
+    if isinstance(value, dict):
+        return value.get('name') or ''
+    return value if isinstance(value, str) else ''
+
+
+def _iter_dicts(node):
+    if isinstance(node, dict):
+        yield node
+        for value in node.values():
+            yield from _iter_dicts(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _iter_dicts(value)
+
+
+def _is_job_posting(node, ld):
+    types = node.get('@type')
+    types = types if isinstance(types, list) else [types]
+    if 'JobPosting' in types:
+        return True
+    # Embedded (non JSON-LD) page state: accept anything shaped like a posting
+    return not ld and 'title' in node and ('datePosted' in node or 'jobLocation' in node)
+
+
+def _format_location(posting):
+    locations = posting.get('jobLocation') or []
+    if isinstance(locations, dict):
+        locations = [locations]
+
+    formatted = []
+    countries = []
+    for location in locations:
+        address = location.get('address', location) if isinstance(location, dict) else location
+        if isinstance(address, str):
+            formatted.append(address)
+            continue
+        if not isinstance(address, dict):
+            continue
+        country = _name(address.get('addressCountry'))
+        countries.append(country)
+        if INDIA_COUNTRY_RE.match(country.strip()):
+            country = 'India'
+        parts = [address.get('addressLocality'), address.get('addressRegion'), country]
+        text = ', '.join(p.strip() for p in parts if isinstance(p, str) and p.strip())
+        if text:
+            formatted.append(text)
+
+    if posting.get('jobLocationType') == 'TELECOMMUTE':
+        formatted.append('Remote')
+    return '; '.join(dict.fromkeys(formatted)), [c for c in countries if c]
+
+
+def parse_job_posting(html_text):
+    """Extract normalized JobPosting fields from a page, or None when there is none.
+
+    Runs in worker processes, so it only takes and returns plain data.
+    """
+    for ld, body in SCRIPT_RE.findall(html_text or ''):
+        try:
+            data = json.loads(body.strip(), strict=False)
+        except ValueError:
+            continue
+        for node in _iter_dicts(data):
+            if not _is_job_posting(node, ld) or not isinstance(node.get('title'), str):
+                continue
+            location, countries = _format_location(node)
+            employment_type = node.get('employmentType') or ''
+            if isinstance(employment_type, list):
+                employment_type = ', '.join(str(t) for t in employment_type)
+            return {
+                'title': node['title'].strip(),
+                'company': _name(node.get('hiringOrganization')).strip(),
+                'location': location,
+                'countries': countries,
+                'date_posted': str(node.get('datePosted') or '')[:10],
+                'valid_through': str(node.get('validThrough') or '')[:10],
+                'employment_type': str(employment_type),
+                'description': plain_text(node.get('description'), limit=300),
+            }
+    return None
+
+
+def posting_fields(posting):
+    """Job fields taken from structured data in preference to the search snippet"""
+    fields = {
+        'date_posted': posting['date_posted'],
+        'valid_through': posting['valid_through'],
+        'employment_type': posting['employment_type'],
+        'source_data': 'jsonld',
+    }
+    if posting['company']:
+        fields['company'] = posting['company']
+    if posting['location'] and india_location(posting['location']):
+        fields['location'] = posting['location']
+    if posting['description'] != 'No description available':
+        fields['snippet'] = posting['description'][:200]
+    return {k: v for k, v in fields.items() if v}
+
+
+def is_expired(posting, today=None):
+    """True when the posting's validThrough date has passed"""
+    try:
+        valid_through = date.fromisoformat(posting['valid_through'])
+    except (TypeError, KeyError, ValueError):
+        return False
+    return valid_through < (today or date.today())
+
+
+def decide_from_posting(result, posting, roles=DEFAULT_ROLES):
+    """Classify a search result from its page's JobPosting: (decision, job)"""
+    if not posting:
+        return AMBIGUOUS, None
+    title = posting['title']
+    if EXCLUDED_TITLE_RE.search(title) or is_expired(posting):
+        return REJECT, None
+    in_india = any(INDIA_COUNTRY_RE.match(c.strip()) for c in posting['countries'])
+    if posting['countries'] and not in_india:
+        return REJECT, None
+    location = posting['location'] if india_location(posting['location']) else ('India' if in_india else None)
+    if not location or not roles.is_target(title) or NEAR_PM_RE.search(title):
+        return AMBIGUOUS, None
+
+    company = posting['company'] or company_from_link(result['link'])
+    if not company:
+        return AMBIGUOUS, None
+    job = {
+        'title': title,
+        'company': company,
+        'location': location,
+        'link': result['link'],
+        'snippet': 'No description available',
+        'date_found': datetime.now().strftime('%Y-%m-%d'),
+    }
+    job.update(posting_fields(posting))
+    return ACCEPT, job
+
+
+class Enricher:
+    """Download posting pages concurrently and parse their JobPosting data in a process pool.
+
+    Parsed results (including "no structured data") are cached in SQLite by
+    URL with the page's ETag / Last-Modified, so pages fetched within
+    ``max_age_hours`` are not requested again and older ones cost a 304
+    when unchanged.
+    """
+
+    def __init__(self, cache_path=DEFAULT_CACHE_FILE, max_workers=16, processes=None,
+                 timeout=15, max_age_hours=24):
+        self.max_workers = max_workers
+        self.processes = processes or min(4, os.cpu_count() or 1)
+        self.timeout = timeout
+        self.max_age_seconds = max_age_hours * 3600
+        self._pool = None
+
+        os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(cache_path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS postings (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                posting TEXT,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers['User-Agent'] = 'Mozilla/5.0 (compatible; PM-Job-Scout/1.0)'
+
+    @property
+    def pool(self):
+        # spawn: forking a process that is already running pipeline threads is unsafe
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.processes, mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._pool
+
+    def _parse_async(self, html_text):
+        try:
+            return self.pool.submit(parse_job_posting, html_text)
+        except (BrokenProcessPool, OSError) as e:
+            # No worker processes available: parse in this thread instead
+            logger.warning(f"Process pool unavailable, parsing in-process: {e}")
+            self._pool = None
+            future = Future()
+            future.set_result(parse_job_posting(html_text))
+            return future
+
+    def _cached(self, urls):
+        with self.lock:
+            rows = {}
+            for i in range(0, len(urls), 500):
+                chunk = urls[i:i + 500]
+                rows.update({
+                    row[0]: row[1:] for row in self.conn.execute(
+                        f"SELECT url, etag, last_modified, posting, fetched_at FROM postings "
+                        f"WHERE url IN ({','.join('?' * len(chunk))})", chunk
+                    )
+                })
+        return rows
+
+    def _download(self, url, cached):
+        """GET one page; returns (status, html, etag, last_modified)"""
+        headers = {}
+        if cached and cached[0]:
+            headers['If-None-Match'] = cached[0]
+        if cached and cached[1]:
+            headers['If-Modified-Since'] = cached[1]
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            logger.debug(f"Could not fetch {url} for enrichment: {e}")
+            return None, None, None, None
+        html_text = response.text[:MAX_PAGE_BYTES] if response.status_code == 200 else None
+        return (response.status_code, html_text,
+                response.headers.get('ETag'), response.headers.get('Last-Modified'))
+
+    def fetch_postings(self, urls):
+        """Return {url: posting dict or None} for every url"""
+        urls = list(dict.fromkeys(u for u in urls if u))
+        if not urls:
+            return {}
+        cached = self._cached(urls)
+        now = time.time()
+        postings = {}
+        stale = []
+        for url in urls:
+            entry = cached.get(url)
+            if entry and now - entry[3] < self.max_age_seconds:
+                postings[url] = json.loads(entry[2]) if entry[2] else None
+            else:
+                stale.append(url)
+        if not stale:
+            return postings
+
+        rows = []
+        parsing = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self._download, url, cached.get(url)): url for url in stale}
+            for future in as_completed(futures):
+                url = futures[future]
+                status, html_text, etag, last_modified = future.result()
+                entry = cached.get(url)
+                if status == 304 and entry:
+                    postings[url] = json.loads(entry[2]) if entry[2] else None
+                    rows.append((url, entry[0], entry[1], entry[2], now))
+                elif html_text is not None:
+                    # Parse while the remaining downloads are still in flight
+                    parsing[self._parse_async(html_text)] = (url, etag, last_modified)
+                else:
+                    postings[url] = None
+
+        for future in as_completed(parsing):
+            url, etag, last_modified = parsing[future]
+            try:
+                posting = future.result()
+            except Exception as e:
+                logger.warning(f"Failed to parse posting data for {url}: {e}")
+                posting = None
+            postings[url] = posting
+            rows.append((url, etag, last_modified, json.dumps(posting) if posting else None, now))
+
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO postings (url, etag, last_modified, posting, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self.conn.commit()
+
+        found = sum(1 for url in stale if postings.get(url))
+        logger.info(f"Enrichment: fetched {len(stale)} pages ({found} with JobPosting data), "
+                    f"{len(urls) - len(stale)} served from cache")
+        return postings
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        self.conn.close()
+
+
+if __name__ == "__main__":
+    for path in sys.argv[1:]:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            print(json.dumps({'file': path, 'posting': parse_job_posting(f.read())}, indent=2, ensure_ascii=False))
@@ -0,0 +1,168 @@
+import json
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Only these search result fields are useful to the model
+EXTRACTION_FIELDS = ('title', 'link', 'snippet', 'displayed_link')
+
+REQUIRED_JOB_FIELDS = ('title', 'company', 'link')
+
+MAX_SNIPPET_CHARS = 400
+
+
+def estimate_tokens(text):
+    """Rough token estimate (~4 characters per token for English text)"""
+    return len(text) // 4 + 1
+
+
+def compact_result(result, max_snippet_chars=MAX_SNIPPET_CHARS):
+    """Keep only the fields the model needs from a SerpAPI organic result"""
+    compact = {field: result[field] for field in EXTRACTION_FIELDS if result.get(field)}
+    if len(compact.get('snippet', '')) > max_snippet_chars:
+        compact['snippet'] = compact['snippet'][:max_snippet_chars]
+    return compact
+
+
+def truncation_counts(results, max_snippet_chars=MAX_SNIPPET_CHARS):
+    """How many results packing will drop (no link) and how many snippets it will cut"""
+    no_link = sum(1 for r in results if not r.get('link'))
+    truncated = sum(1 for r in results if r.get('link') and len(r.get('snippet') or '') > max_snippet_chars)
+    return no_link, truncated
+
+
+def serialize_results(results):
+    """Serialize compact results as a dense JSON array"""
+    return json.dumps(results, separators=(',', ':'), ensure_ascii=False)
+
+
+def pack_batches(results, token_budget=2500, max_items=20):
+    """Greedily pack compact results into batches that fit the token budget.
+
+    Results are never cut mid-object: each batch serializes to a complete JSON
+    array whose estimated size stays within ``token_budget``.
+    """
+    batches = []
+    current = []
+    current_tokens = 2  # surrounding brackets
+
+    for result in results:
+        compact = compact_result(result)
+        if not compact.get('link'):
+            continue
+
+        tokens = estimate_tokens(serialize_results([compact]))
+        if current and (current_tokens + tokens > token_budget or len(current) >= max_items):
+            batches.append(current)
+            current = []
+            current_tokens = 2
+
+        current.append(compact)
+        current_tokens += tokens
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+def parse_ai_json(ai_response):
+    """Strip markdown fences from a model response and parse the JSON inside"""
+    ai_response = ai_response.strip()
+    if '```json' in ai_response:
+        ai_response = ai_response.split('```json')[1].split('```')[0].strip()
+    elif '```' in ai_response:
+        ai_response = ai_response.split('```')[1].strip()
+    return json.loads(ai_response)
+
+
+class JsonArrayStream:
+    """Incrementally parse a streamed JSON array, returning each object as soon as it closes.
+
+    Anything before the opening bracket (markdown fences, preamble) and after
+    the closing one is ignored. If the stream stops early, every object that
+    did close has already been returned and ``complete`` stays False.
+    """
+
+    def __init__(self):
+        self.buffer = ''
+        self.pos = 0
+        self.start = None
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.started = False
+        self.complete = False
+        self.errors = 0
+
+    def feed(self, text):
+        """Add a chunk of model output and return the objects completed by it"""
+        self.buffer += text
+        objects = []
+        buffer = self.buffer
+        i = self.pos
+        while i < len(buffer) and not self.complete:
+            c = buffer[i]
+            if not self.started:
+                self.started = c == '['
+            elif self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif c == '\\':
+                    self.escape = True
+                elif c == '"':
+                    self.in_string = False
+            elif c == '"':
+                self.in_string = True
+            elif c in '{[':
+                if self.depth == 0:
+                    self.start = i
+                self.depth += 1
+            elif c in '}]':
+                if self.depth == 0:
+                    self.complete = c == ']'
+                else:
+                    self.depth -= 1
+                    if self.depth == 0:
+                        try:
+                            objects.append(json.loads(buffer[self.start:i + 1]))
+                        except json.JSONDecodeError:
+                            self.errors += 1
+                        self.start = None
+            i += 1
+
+        # Drop consumed text so long streams do not keep growing the buffer
+        keep = self.start if self.start is not None else i
+        self.buffer = buffer[keep:]
+        self.pos = i - keep
+        if self.start is not None:
+            self.start = 0
+        return objects
+
+
+def validate_jobs(jobs):
+    """Keep well-formed job dicts and fill in missing optional fields"""
+    if not isinstance(jobs, list):
+        return []
+
+    today = datetime.now().strftime('%Y-%m-%d')
+    validated_jobs = []
+    for job in jobs:
+        if isinstance(job, dict) and all(key in job for key in REQUIRED_JOB_FIELDS):
+            job.setdefault('location', 'India')
+            job.setdefault('snippet', 'No description available')
+            job.setdefault('date_found', today)
+            validated_jobs.append(job)
+    return validated_jobs
+
+
+def merge_jobs(job_lists):
+    """Merge job lists from several batches, dropping duplicate links"""
+    merged = []
+    seen_links = set()
+    for jobs in job_lists:
+        for job in jobs:
+            if job['link'] not in seen_links:
+                seen_links.add(job['link'])
+                merged.append(job)
+    return merged
@@ -0,0 +1,148 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from datetime import datetime
+
+from dedup import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = 'data/extraction_cache.db'
+
+
+def _normalize_text(text):
+    return re.sub(r'\s+', ' ', (text or '').strip().lower())
+
+
+def result_key(result):
+    """Content hash of a search result (canonical URL + title + snippet)"""
+    payload = '\n'.join([
+        canonicalize_url(result.get('link', '')),
+        _normalize_text(result.get('title')),
+        _normalize_text(result.get('snippet')),
+    ])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ExtractionCache:
+    """On-disk cache of per-result AI extraction outcomes.
+
+    Each entry maps a search result's content hash to the extracted job dict,
+    or to ``None`` when the model rejected the result. Entries expire after
+    ``ttl_seconds`` and the least recently used ones are evicted beyond
+    ``max_entries``.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl_seconds=14 * 86400, max_entries=50000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # Shared by pipeline stages running in different threads
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS extractions (
+                key TEXT PRIMARY KEY,
+                job TEXT,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_extractions_last_used ON extractions(last_used)")
+        self.conn.commit()
+
+    def lookup(self, results):
+        """Split results into cached jobs and results that still need the model.
+
+        Returns (cached_jobs, misses). Cached rejections are simply dropped.
+        """
+        keys = [result_key(r) for r in results]
+        with self.lock:
+            found = self._fetch(keys)
+
+        today = datetime.now().strftime('%Y-%m-%d')
+        cached_jobs = []
+        misses = []
+        for key, result in zip(keys, results):
+            if key not in found:
+                misses.append(result)
+                continue
+            if found[key] is not None:
+                job = json.loads(found[key])
+                job['date_found'] = today
+                cached_jobs.append(job)
+
+        self.hits += len(results) - len(misses)
+        self.misses += len(misses)
+        return cached_jobs, misses
+
+    def _fetch(self, keys):
+        """Load live entries for keys and mark them as recently used"""
+        cutoff = time.time() - self.ttl_seconds
+        found = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT key, job FROM extractions WHERE created_at >= ? AND key IN ({placeholders})",
+                [cutoff] + chunk
+            )
+            found.update(rows)
+
+        if found:
+            now = time.time()
+            self.conn.executemany(
+                "UPDATE extractions SET last_used = ? WHERE key = ?",
+                [(now, key) for key in found]
+            )
+            self.conn.commit()
+        return found
+
+    def store_batch(self, batch, jobs):
+        """Record the model's outcome for every result in a batch.
+
+        Results whose link matches an extracted job cache that job; the rest
+        are cached as rejections.
+        """
+        jobs_by_link = {canonicalize_url(job['link']): job for job in jobs}
+        now = time.time()
+        rows = []
+        for result in batch:
+            job = jobs_by_link.get(canonicalize_url(result.get('link', '')))
+            rows.append((result_key(result), json.dumps(job, ensure_ascii=False) if job else None, now, now))
+
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO extractions (key, job, created_at, last_used) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self.conn.commit()
+
+    def evict(self):
+        """Drop expired entries and trim the cache to max_entries"""
+        cutoff = time.time() - self.ttl_seconds
+        with self.lock:
+            self.conn.execute("DELETE FROM extractions WHERE created_at < ?", (cutoff,))
+            self.conn.execute("""
+                DELETE FROM extractions WHERE key IN (
+                    SELECT key FROM extractions ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+            self.conn.commit()
+
+    def log_stats(self):
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0
+        logger.info(f"Extraction cache: {self.hits} hits, {self.misses} misses ({rate:.0f}% hit rate)")
+
+    def close(self):
+        self.conn.close()
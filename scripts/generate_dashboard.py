@@ -1,40 +1,22 @@
 # FILE 2: scripts/generate_dashboard.py
 # Copy everything below this line for your second file
 
-import json
 import os
-from datetime import datetime, timedelta
-from jinja2 import Template
+import re
+import json
+import hashlib
+from datetime import datetime
+from functools import lru_cache
 
-def generate_dashboard():
-    """Generate beautiful HTML dashboard from jobs data"""
-    
-    # Load jobs data
-    jobs_file = 'data/jobs.json'
-    jobs = []
-    
-    if os.path.exists(jobs_file):
-        try:
-            with open(jobs_file, 'r') as f:
-                jobs = json.load(f)
-        except json.JSONDecodeError:
-            jobs = []
-    
-    # Calculate statistics
-    today = datetime.now().strftime('%Y-%m-%d')
-    yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-    
-    new_today = len([j for j in jobs if j.get('date_found') == today])
-    new_yesterday = len([j for j in jobs if j.get('date_found') == yesterday])
-    
-    companies = list(set(j.get('company', 'Unknown') for j in jobs if j.get('company')))
-    cities = list(set(j.get('location', 'Unknown').split(',')[0].strip() for j in jobs if j.get('location')))
-    
-    # Sort jobs by date (newest first)
-    jobs.sort(key=lambda x: x.get('date_found', '1900-01-01'), reverse=True)
-    
-    # HTML template
-    html_template = """<!DOCTYPE html>
+from jinja2 import Environment, DictLoader, FileSystemBytecodeCache
+
+from job_stats import job_city
+from job_store import open_store
+from metrics import RunMetrics, profiling
+from profiles import ProfileRegistry
+from ranking import RankingIndex
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -144,6 +126,56 @@ def generate_dashboard():
             font-weight: 500;
         }
         
+        .trends {
+            display: grid;
+            grid-template-columns: 2fr 1fr;
+            gap: 20px;
+            padding: 0 40px 40px;
+            background: #f8fafc;
+        }
+        
+        .trend-card {
+            background: white;
+            padding: 25px;
+            border-radius: 15px;
+            box-shadow: 0 4px 15px rgba(0,0,0,0.08);
+        }
+        
+        .trend-title {
+            color: #1e293b;
+            font-size: 1.1rem;
+            margin-bottom: 15px;
+        }
+        
+        .trend-bars {
+            display: flex;
+            align-items: flex-end;
+            gap: 3px;
+            height: 140px;
+        }
+        
+        .trend-bar {
+            flex: 1;
+            min-height: 2px;
+            background: linear-gradient(180deg, #667eea, #764ba2);
+            border-radius: 3px 3px 0 0;
+        }
+        
+        .top-companies {
+            padding-left: 20px;
+            color: #475569;
+        }
+        
+        .top-companies li span {
+            display: inline-block;
+        }
+        
+        .trend-count {
+            float: right;
+            color: #667eea;
+            font-weight: 600;
+        }
+        
         .jobs-section {
             padding: 40px;
         }
@@ -267,6 +299,39 @@ def generate_dashboard():
             font-weight: 500;
         }
         
+        .filters {
+            display: flex;
+            gap: 15px;
+            justify-content: center;
+            margin-bottom: 30px;
+            flex-wrap: wrap;
+        }
+        
+        .filters select {
+            padding: 10px 16px;
+            border: 2px solid #f1f5f9;
+            border-radius: 10px;
+            font-size: 1rem;
+            color: #1e293b;
+            background: white;
+            min-width: 220px;
+        }
+        
+        .pagination {
+            display: flex;
+            justify-content: center;
+            align-items: center;
+            gap: 20px;
+            margin-top: 40px;
+            color: #64748b;
+        }
+        
+        .pagination a {
+            color: #667eea;
+            text-decoration: none;
+            font-weight: 600;
+        }
+        
         .no-jobs {
             text-align: center;
             padding: 80px 20px;
@@ -319,6 +384,11 @@ def generate_dashboard():
                 font-size: 2rem;
             }
             
+            .trends {
+                grid-template-columns: 1fr;
+                padding: 0 20px 20px;
+            }
+            
             .stats {
                 grid-template-columns: repeat(2, 1fr);
                 padding: 30px 20px;
@@ -378,39 +448,41 @@ def generate_dashboard():
             </div>
         </section>
         
+        {% if page == 1 and top_companies %}
+        <section class="trends">
+            <div class="trend-card">
+                <h3 class="trend-title">Jobs Found per Day (last {{ daily_series|length }} days)</h3>
+                <div class="trend-bars">
+                    {% for point in daily_series %}
+                    <div class="trend-bar" style="height: {{ (point.count / max_daily * 100)|round(1) }}%" title="{{ point.day }}: {{ point.count }}"></div>
+                    {% endfor %}
+                </div>
+            </div>
+            <div class="trend-card">
+                <h3 class="trend-title">Top Hiring Companies</h3>
+                <ol class="top-companies">
+                    {% for entry in top_companies %}
+                    <li><span>{{ entry.company }}</span><span class="trend-count">{{ entry.count }}</span></li>
+                    {% endfor %}
+                </ol>
+            </div>
+        </section>
+        {% endif %}
+        
         <section class="jobs-section">
             <div class="section-header">
                 <h2 class="section-title">Latest Opportunities</h2>
                 <p class="section-subtitle">Curated from Workday, Greenhouse, Lever, and 12+ other ATS platforms</p>
             </div>
             
-            <div class="jobs-grid">
-                {% if jobs %}
-                    {% for job in jobs %}
-                    <div class="job-card {% if job.date_found == today %}new-job{% endif %}">
-                        <h3 class="job-title">{{ job.title }}</h3>
-                        <div class="job-company">
-                            <span class="icon">🏢</span>
-                            {{ job.company }}
-                        </div>
-                        <div class="job-location">
-                            <span class="icon">📍</span>
-                            {{ job.location }}
-                        </div>
-                        {% if job.snippet and job.snippet != 'No description available' %}
-                        <div class="job-snippet">{{ job.snippet }}</div>
-                        {% endif %}
-                        <div class="job-actions">
-                            <a href="{{ job.link }}" target="_blank" class="apply-btn">
-                                Apply Now 
-                                <span>→</span>
-                            </a>
-                            <div class="job-date">
-                                Found: {{ job.date_found }}
-                            </div>
-                        </div>
-                    </div>
-                    {% endfor %}
+            <div class="filters">
+                <select id="city-filter" aria-label="Filter by city"><option value="">All cities</option></select>
+                <select id="company-filter" aria-label="Filter by company"><option value="">All companies</option></select>
+            </div>
+            
+            <div class="jobs-grid" id="jobs-grid">
+                {% if job_cards %}
+{{ job_cards }}
                 {% else %}
                     <div class="no-jobs">
                         <h3>🔍 No jobs found yet</h3>
@@ -419,6 +491,14 @@ def generate_dashboard():
                     </div>
                 {% endif %}
             </div>
+            
+            {% if total_pages > 1 %}
+            <nav class="pagination">
+                {% if prev_url %}<a href="{{ prev_url }}">← Previous</a>{% endif %}
+                <span>Page {{ page }} of {{ total_pages }}</span>
+                {% if next_url %}<a href="{{ next_url }}">Next →</a>{% endif %}
+            </nav>
+            {% endif %}
         </section>
         
         <footer class="footer">
@@ -434,41 +514,430 @@ def generate_dashboard():
             </div>
         </footer>
     </div>
+    <script>
+        // Filters load a compact prebuilt index, then fetch only the JSON pages holding matches
+        (function () {
+            const grid = document.getElementById('jobs-grid');
+            const cityFilter = document.getElementById('city-filter');
+            const companyFilter = document.getElementById('company-filter');
+            const pageCache = {};
+            const originalCards = grid.innerHTML;
+            let index = null;
+            
+            function addOptions(select, names) {
+                names.map((name, i) => [name, i])
+                    .sort((a, b) => a[0].localeCompare(b[0]))
+                    .forEach(([name, i]) => select.add(new Option(name, i)));
+            }
+            
+            function loadPage(page) {
+                if (!pageCache[page]) {
+                    pageCache[page] = fetch(`api/pages/${page}.json`).then(r => r.json());
+                }
+                return pageCache[page];
+            }
+            
+            function card(job) {
+                const div = document.createElement('div');
+                div.className = 'job-card';
+                const fields = [['h3', 'job-title', job.title], ['div', 'job-company', '🏢 ' + job.company],
+                                ['div', 'job-location', '📍 ' + job.location]];
+                fields.forEach(([tag, cls, text]) => {
+                    const el = document.createElement(tag);
+                    el.className = cls;
+                    el.textContent = text;
+                    div.appendChild(el);
+                });
+                const actions = document.createElement('div');
+                actions.className = 'job-actions';
+                const link = document.createElement('a');
+                link.className = 'apply-btn';
+                link.href = job.link;
+                link.target = '_blank';
+                link.textContent = 'Apply Now →';
+                const date = document.createElement('div');
+                date.className = 'job-date';
+                date.textContent = 'Found: ' + job.date_found;
+                actions.append(link, date);
+                div.appendChild(actions);
+                return div;
+            }
+            
+            async function applyFilters() {
+                const city = cityFilter.value;
+                const company = companyFilter.value;
+                if (city === '' && company === '') {
+                    grid.innerHTML = originalCards;
+                    return;
+                }
+                const matches = [];
+                index.rows.forEach(([companyId, cityId], i) => {
+                    if ((city === '' || cityId == city) && (company === '' || companyId == company)) {
+                        matches.push(i);
+                    }
+                });
+                const shown = matches.slice(0, {{ page_size }});
+                const pages = await Promise.all([...new Set(shown.map(i => Math.floor(i / index.page_size) + 1))].map(
+                    p => loadPage(p).then(jobs => [p, jobs])));
+                const byPage = Object.fromEntries(pages);
+                grid.replaceChildren(...shown.map(i => card(byPage[Math.floor(i / index.page_size) + 1][i % index.page_size])));
+            }
+            
+            fetch('api/search-index.json').then(r => r.json()).then(data => {
+                index = data;
+                addOptions(cityFilter, index.cities);
+                addOptions(companyFilter, index.companies);
+                cityFilter.addEventListener('change', applyFilters);
+                companyFilter.addEventListener('change', applyFilters);
+            });
+        })();
+    </script>
 </body>
 </html>"""
-    
-    # Render the template
-    template = Template(html_template)
-    html_content = template.render(
-        jobs=jobs[:100],  # Show latest 100 jobs
-        total_jobs=len(jobs),
-        new_today=new_today,
-        unique_companies=len(companies),
-        unique_cities=len(cities),
-        today=today,
-        last_updated=datetime.now().strftime('%B %d, %Y at %H:%M IST')
+
+CARD_TEMPLATE = """                    <div class="job-card {% if is_new %}new-job{% endif %}">
+                        <h3 class="job-title">{{ job.title }}</h3>
+                        <div class="job-company">
+                            <span class="icon">🏢</span>
+                            {{ job.company }}
+                        </div>
+                        <div class="job-location">
+                            <span class="icon">📍</span>
+                            {{ job.location }}
+                        </div>
+                        {% if job.snippet and job.snippet != 'No description available' %}
+                        <div class="job-snippet">{{ job.snippet }}</div>
+                        {% endif %}
+                        <div class="job-actions">
+                            <a href="{{ job.link }}" target="_blank" class="apply-btn">
+                                Apply Now 
+                                <span>→</span>
+                            </a>
+                            <div class="job-date">
+                                Found: {{ job.date_found }}
+                            </div>
+                        </div>
+                    </div>"""
+
+CARD_CACHE_FILE = 'data/card_cache.json'
+API_DIR = 'docs/api'
+FEED_DIR = 'docs/feed'
+# Deltas older than this many sequence numbers are pruned; clients that far behind resync from the snapshot
+FEED_MAX_DELTAS = 720
+PAGE_SIZE = 100
+RANKING_HALF_LIFE_DAYS = 7
+TEMPLATE_CACHE_DIR = 'data/.jinja_cache'
+
+
+@lru_cache(maxsize=1)
+def get_environment():
+    """Compile the dashboard templates once, reusing bytecode across runs"""
+    os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+    return Environment(
+        loader=DictLoader({'page.html': PAGE_TEMPLATE, 'card.html': CARD_TEMPLATE}),
+        bytecode_cache=FileSystemBytecodeCache(TEMPLATE_CACHE_DIR)
     )
+
+
+def card_cache_key(job, is_new):
+    """Hash of the job content, its "new today" state and the card template"""
+    payload = json.dumps([job, is_new, CARD_TEMPLATE], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def load_card_cache():
+    if os.path.exists(CARD_CACHE_FILE):
+        try:
+            with open(CARD_CACHE_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            pass
+    return {}
+
+
+def render_job_cards(jobs, today):
+    """Render job cards, re-rendering only the ones whose content or state changed"""
+    cache = load_card_cache()
+    card_template = get_environment().get_template('card.html')
+
+    fragments = []
+    used = {}
+    rendered = 0
+    for job in jobs:
+        is_new = job.get('date_found') == today
+        key = card_cache_key(job, is_new)
+        html = cache.get(key)
+        if html is None:
+            html = card_template.render(job=job, is_new=is_new)
+            rendered += 1
+        used[key] = html
+        fragments.append(html)
+
+    # Only keep fragments for cards still on the dashboard
+    os.makedirs(os.path.dirname(CARD_CACHE_FILE), exist_ok=True)
+    with open(CARD_CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(used, f, ensure_ascii=False)
+
+    print(f"🧩 Rendered {rendered} changed job cards, reused {len(jobs) - rendered} cached")
+    return fragments
+
+
+def page_filename(page):
+    return 'index.html' if page == 1 else f'page-{page}.html'
+
+
+def slugify(text):
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-') or 'unknown'
+
+
+def write_if_changed(path, content):
+    """Write a file only when its content changed, keeping Pages commits small"""
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return True
+
+
+def write_json_shards(directory, shards):
+    """Write {name: data} as compact JSON files and delete shards that no longer exist"""
+    expected = set()
+    changed = 0
+    for name, data in shards.items():
+        filename = f"{name}.json"
+        expected.add(filename)
+        changed += write_if_changed(os.path.join(directory, filename),
+                                    json.dumps(data, separators=(',', ':'), ensure_ascii=False))
+
+    if os.path.isdir(directory):
+        for filename in os.listdir(directory):
+            if filename.endswith('.json') and filename not in expected:
+                os.remove(os.path.join(directory, filename))
+    return changed
+
+
+def write_api(jobs, stats):
+    """Write paginated, per-day and per-company JSON shards, a search index and a manifest"""
+    pages = {str(i // PAGE_SIZE + 1): jobs[i:i + PAGE_SIZE] for i in range(0, len(jobs), PAGE_SIZE)}
+
+    days = {}
+    companies = {}
+    company_names = {}
+    for job in jobs:
+        days.setdefault(job.get('date_found', 'unknown'), []).append(job)
+        company = job.get('company') or 'Unknown'
+        slug = slugify(company)
+        company_names.setdefault(slug, company)
+        companies.setdefault(slug, []).append(job)
+
+    changed = write_json_shards(f'{API_DIR}/pages', pages)
+    changed += write_json_shards(f'{API_DIR}/days', days)
+    changed += write_json_shards(f'{API_DIR}/companies', companies)
+
+    # Dictionary-encoded (company, city) per job, in dashboard order
+    company_ids = {}
+    city_ids = {}
+    rows = []
+    for job in jobs:
+        company = job.get('company') or 'Unknown'
+        city = job_city(job)
+        rows.append([
+            company_ids.setdefault(company, len(company_ids)),
+            city_ids.setdefault(city, len(city_ids)),
+        ])
+    search_index = {
+        'page_size': PAGE_SIZE,
+        'companies': list(company_ids),
+        'cities': list(city_ids),
+        'rows': rows,
+    }
+    changed += write_if_changed(f'{API_DIR}/search-index.json',
+                                json.dumps(search_index, separators=(',', ':'), ensure_ascii=False))
+
+    manifest = dict(stats)
+    manifest.update({
+        'page_size': PAGE_SIZE,
+        'pages': len(pages),
+        'days': {day: {'count': len(day_jobs), 'file': f'api/days/{day}.json'}
+                 for day, day_jobs in sorted(days.items(), reverse=True)},
+        'companies': {company_names[slug]: {'count': len(company_jobs), 'file': f'api/companies/{slug}.json'}
+                      for slug, company_jobs in sorted(companies.items())},
+        'search_index': 'api/search-index.json',
+    })
+    with open(f'{API_DIR}/manifest.json', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    print(f"🗂️ Wrote API for {len(pages)} pages, {len(days)} days, {len(companies)} companies ({changed} files changed)")
+
+
+def job_hash(job):
+    """Short content hash of a published job (sorted keys, compact JSON)"""
+    payload = json.dumps(job, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def snapshot_hash(hashes):
+    """Hash of a whole job set: sha256 over sorted "link<TAB>job hash" lines"""
+    payload = ''.join(f"{link}\t{digest}\n" for link, digest in sorted(hashes.items()))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def write_feed(jobs):
+    """Append a numbered delta of added, updated and removed jobs and move the feed head.
+
+    ``feed/head.json`` is tiny and only changes when the job set does, so
+    clients poll it and fetch ``feed/deltas/<seq>.json`` for each sequence
+    number they are missing. Each delta names the snapshot hash it applies
+    to and the one it produces. ``feed/snapshot.json`` holds the full set
+    at the head for new clients or those behind the oldest kept delta.
+    The head is written last, so every sequence number it announces exists.
+    """
+    snapshot_path = f'{FEED_DIR}/snapshot.json'
+    previous = {'seq': 0, 'jobs': []}
+    if os.path.exists(snapshot_path):
+        with open(snapshot_path, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+
+    old = {job['link']: job_hash(job) for job in previous['jobs']}
+    new = {job['link']: job_hash(job) for job in jobs}
+    added = [job for job in jobs if job['link'] not in old]
+    updated = [job for job in jobs if job['link'] in old and old[job['link']] != new[job['link']]]
+    removed = [link for link in old if link not in new]
+    if previous['seq'] and not (added or updated or removed):
+        print(f"📰 Feed unchanged at seq {previous['seq']}")
+        return
+
+    seq = previous['seq'] + 1
+    new_hash = snapshot_hash(new)
+    os.makedirs(f'{FEED_DIR}/deltas', exist_ok=True)
+    delta_sha = None
+    if previous['seq']:
+        delta_text = json.dumps({
+            'seq': seq,
+            'base_hash': snapshot_hash(old),
+            'hash': new_hash,
+            'created': datetime.now().isoformat(),
+            'added': added,
+            'updated': updated,
+            'removed': removed,
+        }, separators=(',', ':'), ensure_ascii=False)
+        with open(f'{FEED_DIR}/deltas/{seq:08d}.json', 'w', encoding='utf-8') as f:
+            f.write(delta_text)
+        delta_sha = hashlib.sha256(delta_text.encode('utf-8')).hexdigest()
+
+    snapshot_text = json.dumps({'seq': seq, 'hash': new_hash, 'jobs': jobs}, separators=(',', ':'), ensure_ascii=False)
+    with open(snapshot_path, 'w', encoding='utf-8') as f:
+        f.write(snapshot_text)
+
+    # Keep the last FEED_MAX_DELTAS deltas (the first snapshot has none)
+    kept = []
+    for name in sorted(os.listdir(f'{FEED_DIR}/deltas')):
+        if int(name[:-5]) <= seq - FEED_MAX_DELTAS:
+            os.remove(f'{FEED_DIR}/deltas/{name}')
+        else:
+            kept.append(int(name[:-5]))
+
+    head = {
+        'seq': seq,
+        'hash': new_hash,
+        'jobs': len(jobs),
+        # Clients older than oldest_seq - 1 resync from the snapshot
+        'oldest_seq': kept[0] if kept else seq + 1,
+        'delta_template': 'feed/deltas/{seq:08d}.json',
+        'delta_sha256': delta_sha,
+        'snapshot': 'feed/snapshot.json',
+        'snapshot_sha256': hashlib.sha256(snapshot_text.encode('utf-8')).hexdigest(),
+        'updated': datetime.now().isoformat(),
+    }
+    with open(f'{FEED_DIR}/head.json', 'w', encoding='utf-8') as f:
+        json.dump(head, f, indent=2)
+
+    if delta_sha:
+        print(f"📰 Feed seq {seq}: {len(added)} added, {len(updated)} updated, {len(removed)} removed")
+    else:
+        print(f"📰 Feed started at seq {seq} with a snapshot of {len(jobs)} jobs")
+
+
+def generate_dashboard():
+    """Generate beautiful HTML dashboard from jobs data"""
+    
+    # Load jobs data from the job store (migrates data/jobs.json on first use)
+    store = open_store()
+    latest_jobs = store.load_jobs()  # Newest first
+    
+    # Counters and trends come from the materialized statistics
+    today = datetime.now().strftime('%Y-%m-%d')
+    counters = store.stats.counters(today)
+    daily_series = store.stats.daily_series(days=30)
+    top_companies = store.stats.top_companies(limit=10)
+    store.close()
+    
+    new_today = counters['new_today']
+    
+    # Order by relevance to the primary profile, decayed by age so fresh postings stay near the top
+    ranker = RankingIndex.load()
+    profile = ProfileRegistry.load(os.getenv('PROFILES_FILE', 'profiles.json')).profiles[0]
+    jobs = ranker.rank(latest_jobs, profile, half_life_days=RANKING_HALF_LIFE_DAYS)
+    ranker.save()
+    
+    last_updated = datetime.now()
+    
+    # Render paginated pages, splicing in cached job card fragments
+    fragments = render_job_cards(jobs, today)
+    total_pages = max(1, -(-len(jobs) // PAGE_SIZE))
+    page_template = get_environment().get_template('page.html')
     
-    # Create docs directory and save HTML
     os.makedirs('docs', exist_ok=True)
-    with open('docs/index.html', 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    for page in range(1, total_pages + 1):
+        start = (page - 1) * PAGE_SIZE
+        html_content = page_template.render(
+            job_cards='\n'.join(fragments[start:start + PAGE_SIZE]),
+            page=page,
+            total_pages=total_pages,
+            page_size=PAGE_SIZE,
+            prev_url=page_filename(page - 1) if page > 1 else None,
+            next_url=page_filename(page + 1) if page < total_pages else None,
+            total_jobs=counters['total_jobs'],
+            new_today=new_today,
+            unique_companies=counters['companies'],
+            unique_cities=counters['cities'],
+            daily_series=daily_series,
+            max_daily=max([p['count'] for p in daily_series] + [1]),
+            top_companies=top_companies,
+            today=today,
+            last_updated=last_updated.strftime('%B %d, %Y at %H:%M IST')
+        )
+        with open(f'docs/{page_filename(page)}', 'w', encoding='utf-8') as f:
+            f.write(html_content)
+    
+    # Remove pages left over from a larger history
+    for filename in os.listdir('docs'):
+        match = re.match(r'page-(\d+)\.html$', filename)
+        if match and int(match.group(1)) > total_pages:
+            os.remove(os.path.join('docs', filename))
+    
+    stats = dict(counters, last_updated=last_updated.isoformat())
+    write_api(jobs, stats)
+    write_feed(latest_jobs)
+    write_if_changed(f'{API_DIR}/trends.json', json.dumps({
+        'daily': daily_series,
+        'top_companies': top_companies,
+    }, indent=2, ensure_ascii=False))
     
     # Also create a simple jobs JSON API endpoint
     with open('docs/jobs.json', 'w', encoding='utf-8') as f:
-        json.dump({
-            'total_jobs': len(jobs),
-            'new_today': new_today,
-            'companies': len(companies),
-            'cities': len(cities),
-            'last_updated': datetime.now().isoformat(),
-            'jobs': jobs[:50]  # Latest 50 for API
-        }, f, indent=2, ensure_ascii=False)
+        json.dump(dict(stats, feed='feed/head.json', jobs=latest_jobs[:50]), f, indent=2, ensure_ascii=False)  # Latest 50 for API
     
-    print(f"✅ Dashboard generated with {len(jobs)} jobs ({new_today} new today)")
-    print(f"📊 Tracking {len(companies)} companies across {len(cities)} cities")
+    print(f"✅ Dashboard generated with {counters['total_jobs']} jobs ({new_today} new today)")
+    print(f"📊 Tracking {counters['companies']} companies across {counters['cities']} cities")
 
 if __name__ == "__main__":
-    generate_dashboard()
+    metrics = RunMetrics('dashboard')
+    with profiling('dashboard'), metrics.stage('dashboard'):
+        generate_dashboard()
+    metrics.write()
 
 # END OF FILE 2
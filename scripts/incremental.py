@@ -0,0 +1,210 @@
+import os
+import math
+import time
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+
+from dedup import canonicalize_url
+from scheduler import HIGH, NORMAL
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = 'data/watermarks.db'
+
+# Extra hour on every window: Google's "past N hours" is approximate and
+# results indexed late would otherwise fall between two runs
+WINDOW_OVERLAP_HOURS = 1
+# Longest a shard waits between fetches when the budget is spread by heat
+MAX_REFRESH_HOURS = 72
+
+
+def time_window(gap_seconds, default='qdr:d'):
+    """Google ``tbs`` recency window covering ``gap_seconds`` since the last fetch"""
+    if gap_seconds is None:
+        return default
+    hours = math.ceil(gap_seconds / 3600) + WINDOW_OVERLAP_HOURS
+    if hours < 24:
+        return f'qdr:h{hours}' if hours > 1 else 'qdr:h'
+    days = math.ceil(hours / 24)
+    return f'qdr:d{days}' if days < 7 else 'qdr:w'
+
+
+class ShardWatermarks:
+    """Per-shard fetch watermarks and the result links already handed to extraction.
+
+    Each shard remembers when it was last fetched completely, so the next
+    run only asks Google for the hours since then (``qdr:hN``). With a
+    ``daily_fetches`` budget, shards that produced more new links recently
+    are refreshed more often (hot shards every run or two), and every
+    result link that went downstream is remembered so a result showing up
+    again in an overlapping window is skipped before classification or any
+    model call. Updates are staged in memory and only committed when the
+    run completes; links from batches that failed extraction are forgotten
+    again so the next run retries them.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, default_window='qdr:d', retention_days=8,
+                 refresh_hours=None, runs_per_day=24, daily_fetches=None):
+        self.default_window = default_window
+        self.retention_seconds = retention_days * 86400
+        # A fixed refresh_hours applies to every shard; otherwise daily_fetches is spread by heat
+        if refresh_hours is None and not daily_fetches:
+            refresh_hours = 24
+        self.refresh_seconds = None if refresh_hours is None else refresh_hours * 3600
+        self.daily_fetches = daily_fetches
+        self.runs_per_day = max(runs_per_day, 1)
+        self.run_interval = 86400 / self.runs_per_day
+        self.started_at = time.time()
+        self.pending_fetched = {}
+        self.pending_seen = {}
+        self.skipped = 0
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS shard_watermarks (
+                shard TEXT PRIMARY KEY,
+                fetched_at REAL NOT NULL,
+                result_count INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS seen_results (
+                link TEXT PRIMARY KEY,
+                shard TEXT NOT NULL,
+                first_seen REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_seen_first_seen ON seen_results(first_seen);
+            CREATE TABLE IF NOT EXISTS profile_alerts (
+                profile TEXT NOT NULL,
+                day TEXT NOT NULL,
+                PRIMARY KEY (profile, day)
+            );
+        """)
+        self.conn.commit()
+
+    def refresh_intervals(self, shards):
+        """Seconds between fetches for each shard key.
+
+        With a ``daily_fetches`` budget each shard's share grows with the square
+        root of the new links it produced within the retention window (plus
+        one, so quiet shards are still swept), capped at one fetch per run;
+        what capped shards cannot use goes to the others.
+        """
+        if self.refresh_seconds is not None:
+            return {shard['key']: self.refresh_seconds for shard in shards}
+        with self.lock:
+            heat = dict(self.conn.execute("SELECT shard, COUNT(*) FROM seen_results GROUP BY shard"))
+        weights = {shard['key']: math.sqrt(heat.get(shard['key'], 0) + 1) for shard in shards}
+        rates = {}
+        budget = self.daily_fetches
+        while weights:
+            scale = budget / sum(weights.values())
+            capped = [key for key, weight in weights.items() if weight * scale >= self.runs_per_day]
+            if not capped:
+                rates.update((key, weight * scale) for key, weight in weights.items())
+                break
+            for key in capped:
+                rates[key] = self.runs_per_day
+                budget -= self.runs_per_day
+                del weights[key]
+        return {key: min(86400 / rate if rate > 0 else float('inf'), MAX_REFRESH_HOURS * 3600)
+                for key, rate in rates.items()}
+
+    def plan(self, shards):
+        """This run's share of the shards, each with its recency window and a priority.
+
+        Every shard is refreshed about once per its refresh interval: shards
+        fetched more recently are skipped, the rest go most overdue first
+        (never-fetched shards first, at HIGH priority), and each run takes only
+        its share, so hourly runs spread the day's searches instead of repeating them.
+        """
+        with self.lock:
+            fetched = dict(self.conn.execute("SELECT shard, fetched_at FROM shard_watermarks"))
+        intervals = self.refresh_intervals(shards)
+
+        def overdue(shard):
+            last = fetched.get(shard['key'])
+            interval = intervals[shard['key']]
+            if last is None or not interval:
+                return float('inf')
+            return (self.started_at - last) / interval
+
+        # Half a run of slack, so start-time jitter does not push a shard back a whole run
+        due = [shard for shard in shards
+               if shard['key'] not in fetched
+               or self.started_at - fetched[shard['key']] + self.run_interval / 2 >= intervals[shard['key']]]
+        due.sort(key=overdue, reverse=True)
+        # Each run takes the fetches per day the intervals add up to, divided by the runs per day
+        per_run = len(shards)
+        if all(intervals.values()):
+            per_run = math.ceil(round(sum(self.run_interval / interval for interval in intervals.values()), 6))
+        planned = due[:per_run]
+        for shard in planned:
+            last = fetched.get(shard['key'])
+            shard['tbs'] = time_window(None if last is None else self.started_at - last, self.default_window)
+            shard['priority'] = HIGH if last is None else NORMAL
+        logger.info(f"Watermarks: {len(due)} of {len(shards)} shards due, fetching {len(planned)} this run")
+        return planned
+
+    def filter_new(self, shard, results):
+        """Drop results whose link was already seen; stage the rest (and the watermark) for commit"""
+        links = {canonicalize_url(r['link']): r for r in results if r.get('link')}
+        with self.lock:
+            known = set()
+            keys = list(links)
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                known.update(row[0] for row in self.conn.execute(
+                    f"SELECT link FROM seen_results WHERE link IN ({','.join('?' * len(chunk))})", chunk
+                ))
+            fresh = [r for key, r in links.items() if key not in known and key not in self.pending_seen]
+            for key in links:
+                if key not in known:
+                    self.pending_seen.setdefault(key, shard['key'])
+            if not shard.get('incomplete'):
+                self.pending_fetched[shard['key']] = len(results)
+            self.skipped += len(links) - len(fresh)
+        return fresh
+
+    def forget(self, results):
+        """Un-stage results whose extraction failed, so a later run sees them again"""
+        with self.lock:
+            for result in results:
+                self.pending_seen.pop(canonicalize_url(result.get('link', '')), None)
+
+    def commit(self):
+        """Persist this run's watermarks and seen links, and prune old links"""
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO shard_watermarks (shard, fetched_at, result_count) VALUES (?, ?, ?)",
+                [(key, self.started_at, count) for key, count in self.pending_fetched.items()]
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO seen_results (link, shard, first_seen) VALUES (?, ?, ?)",
+                [(link, key, self.started_at) for link, key in self.pending_seen.items()]
+            )
+            cutoff = time.time() - self.retention_seconds
+            self.conn.execute("DELETE FROM seen_results WHERE first_seen < ?", (cutoff,))
+            self.conn.execute("DELETE FROM profile_alerts WHERE day < ?",
+                              (datetime.fromtimestamp(cutoff).strftime('%Y-%m-%d'),))
+            self.conn.commit()
+        logger.info(f"Watermarks: {len(self.pending_fetched)} shards advanced, "
+                    f"{len(self.pending_seen)} new results recorded, {self.skipped} already-seen results skipped")
+        self.pending_fetched, self.pending_seen = {}, {}
+
+    def record_alerts(self, profile_names):
+        day = datetime.now().strftime('%Y-%m-%d')
+        with self.lock:
+            self.conn.executemany("INSERT OR IGNORE INTO profile_alerts (profile, day) VALUES (?, ?)",
+                                  [(name, day) for name in profile_names])
+            self.conn.commit()
+
+    def alerted_today(self):
+        day = datetime.now().strftime('%Y-%m-%d')
+        with self.lock:
+            return {row[0] for row in self.conn.execute("SELECT profile FROM profile_alerts WHERE day = ?", (day,))}
+
+    def close(self):
+        self.conn.close()
@@ -2,77 +2,172 @@
 # Copy everything below this line for your first file
 
 import os
+import sys
 import json
-import requests
 from datetime import datetime
 from groq import Groq
+import time
 import logging
 
+from ats_connectors import BoardPoller
+from archive import JobArchive
+from search_index import SearchIndex
+from checkpoint import RunCheckpoint
+from classifier import ACCEPT, REJECT
+from dedup import canonicalize_url
+from enrichment import Enricher, decide_from_posting, is_expired, posting_fields
+from extraction import (
+    JsonArrayStream, estimate_tokens, serialize_results, parse_ai_json, validate_jobs,
+    merge_jobs, truncation_counts
+)
+from extraction_cache import ExtractionCache
+from incremental import ShardWatermarks
+from job_store import open_store
+from metrics import RunMetrics, profiling
+from pipeline import StreamingPipeline
+from profiles import ProfileRegistry
+from ranking import RankingIndex
+from scheduler import BudgetPlanner, CircuitBreaker, Provider, QuotaExceeded, QuotaScheduler
+from serp_fetcher import SerpFetcher
+from telegram_notifier import TelegramNotifier
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+GROQ_MAX_TOKENS = 3000
+
+
 class JobSearchAutomation:
     def __init__(self):
         self.serpapi_key = os.getenv('SERPAPI_KEY')
-        self.groq_client = Groq(api_key=os.getenv('GROQ_API_KEY'))
+        # Retries are the scheduler's job, not the client's
+        self.groq_client = Groq(api_key=os.getenv('GROQ_API_KEY'), max_retries=0)
         self.telegram_bot_token = os.getenv('TELEGRAM_BOT_TOKEN')
         self.telegram_chat_id = os.getenv('TELEGRAM_CHAT_ID')
+        self.metrics = RunMetrics('job_search')
+        
+        # Groq batching: input tokens per batch and number of concurrent calls
+        self.batch_token_budget = int(os.getenv('GROQ_BATCH_TOKENS', '2500'))
+        self.groq_concurrency = int(os.getenv('GROQ_CONCURRENCY', '4'))
+        serpapi_concurrency = int(os.getenv('SERPAPI_CONCURRENCY', '8'))
+        runs_per_day = int(os.getenv('QUOTA_RUNS_PER_DAY') or '1')
+        self.serpapi_monthly_quota = int(os.getenv('SERPAPI_MONTHLY_QUOTA') or '0')
+        
+        # Every SerpAPI and Groq call is paced, prioritized, retried and budgeted here.
+        # Quotas of 0 (the default) mean unlimited; unset variables from the workflow are empty
+        self.scheduler = QuotaScheduler(
+            BudgetPlanner(runs_per_day=runs_per_day),
+            metrics=self.metrics
+        )
+        self.scheduler.add_provider(
+            Provider('serpapi',
+                     requests_per_minute=int(os.getenv('SERPAPI_RPM') or '0'),
+                     max_concurrency=serpapi_concurrency,
+                     breaker=CircuitBreaker(reset_timeout=30)),
+            monthly_quota=self.serpapi_monthly_quota
+        )
+        self.scheduler.add_provider(
+            Provider('groq',
+                     requests_per_minute=int(os.getenv('GROQ_RPM') or '30'),
+                     tokens_per_minute=int(os.getenv('GROQ_TPM') or '0'),
+                     max_concurrency=self.groq_concurrency),
+            daily_quota=int(os.getenv('GROQ_DAILY_REQUESTS') or '0')
+        )
+        
+        self.fetcher = SerpFetcher(
+            self.serpapi_key,
+            max_workers=serpapi_concurrency,
+            max_pages=int(os.getenv('SERPAPI_MAX_PAGES', '3')),
+            scheduler=self.scheduler
+        )
+        # Follow-up calls allowed when a completion is cut off at max_tokens
+        self.max_continuations = int(os.getenv('GROQ_MAX_CONTINUATIONS', '2'))
+        
+        self.extraction_cache = ExtractionCache(
+            ttl_seconds=int(os.getenv('EXTRACTION_CACHE_TTL_DAYS', '14')) * 86400,
+            max_entries=int(os.getenv('EXTRACTION_CACHE_MAX_ENTRIES', '50000'))
+        )
+        self.job_store = open_store()
+        # Month-partitioned history for trend queries; seeded once from the store
+        self.archive = JobArchive()
+        if self.archive.is_empty() and self.job_store.count():
+            self.archive.append(self.job_store.load_jobs(include_closed=True))
+        # Full-text index over the history (scripts/search_index.py); built oldest first
+        self.search_index = SearchIndex()
+        if not len(self.search_index) and self.job_store.count():
+            self.search_index.add(self.job_store.load_jobs(include_closed=True)[::-1])
+        # SEARCH_MODE=incremental: each run fetches the shards due for a refresh with qdr:hN
+        # windows, skipping results seen by earlier runs. Refresh intervals come from the
+        # SerpAPI budget, shortest for the shards finding the most new results, unless
+        # SHARD_REFRESH_HOURS fixes one interval for every shard
+        self.incremental = os.getenv('SEARCH_MODE', 'full') == 'incremental'
+        self.watermarks = None
+        if self.incremental:
+            refresh_hours = os.getenv('SHARD_REFRESH_HOURS')
+            self.watermarks = ShardWatermarks(
+                refresh_hours=float(refresh_hours) if refresh_hours else None,
+                runs_per_day=runs_per_day,
+                # First pages run at NORMAL priority, which may use 80% of a run's allowance
+                daily_fetches=self.serpapi_monthly_quota / 30 * 0.8
+            )
+        self.quiet_day_hour = int(os.getenv('QUIET_DAY_HOUR', '20'))
+        # Progress of this run under data/runs/<RUN_ID>; re-running an unfinished ID resumes it
+        self.checkpoint = RunCheckpoint(
+            os.getenv('RUN_ID'),
+            keep_runs=int(os.getenv('CHECKPOINT_KEEP_RUNS', '14'))
+        )
+        # JobPosting data from the ATS pages themselves (ENRICH_PAGES=0 disables)
+        self.enricher = None
+        if os.getenv('ENRICH_PAGES', '1') != '0':
+            self.enricher = Enricher(
+                max_workers=int(os.getenv('ENRICH_CONCURRENCY', '16')),
+                processes=int(os.getenv('ENRICH_PROCESSES', '0')) or None
+            )
+        # Local relevance ranking, updated as new jobs are saved
+        self.ranker = RankingIndex.load()
+        
+        # Subscriber profiles share shards and extraction; each gets its own alerts.
+        # Without profiles.json there is one profile for TELEGRAM_CHAT_ID (comma-separated chats)
+        self.profiles = ProfileRegistry.load(os.getenv('PROFILES_FILE', 'profiles.json'))
+        # The profiles' titles decide what the classifier, the model and board connectors keep
+        self.roles = self.profiles.roles()
+        self.board_poller = BoardPoller(os.getenv('ATS_WATCHLIST_FILE', 'watchlist.json'), roles=self.roles)
+        self.alerted_profiles = set()
+        self.notifier = None
+        chat_ids = self.profiles.chat_ids
+        if self.telegram_bot_token and chat_ids:
+            repo = os.getenv('GITHUB_REPOSITORY', 'username/repo')
+            self.notifier = TelegramNotifier(
+                self.telegram_bot_token,
+                chat_ids,
+                dashboard_url=f"https://{repo.replace('/', '.github.io/')}"
+            )
         
-        # Boolean search query targeting ATS sites
-        self.search_query = """
-        (site:myworkdayjobs.com OR site:greenhouse.io OR site:lever.co OR 
-         site:icims.com OR site:smartrecruiters.com OR site:taleo.net OR 
-         site:jobvite.com OR site:workforcenow.adp.com OR site:bamboohr.com OR 
-         site:brassring.com OR site:breezy.hr OR site:bullhorn.com OR 
-         site:jazzhr.com OR site:jobdiva.com OR site:successfactors.com)
-        ("product manager" OR "senior product manager" OR "associate product manager" OR "principal product manager")
-        (India OR Bengaluru OR Bangalore OR Mumbai OR Delhi OR Gurgaon OR Gurugram OR Hyderabad OR Pune OR Chennai OR Noida OR Kolkata OR "New Delhi")
-        """.replace('\n', ' ').strip()
+        # Per-host latency for every external HTTP call
+        self.metrics.instrument_session(self.fetcher.session)
+        self.metrics.instrument_session(self.board_poller.session)
+        if self.enricher:
+            self.metrics.instrument_session(self.enricher.session)
+        if self.notifier:
+            self.metrics.instrument_session(self.notifier.session)
     
-    def search_jobs(self):
-        """Search for jobs using SerpAPI"""
-        try:
-            url = "https://serpapi.com/search"
-            params = {
-                'engine': 'google',
-                'q': self.search_query,
-                'api_key': self.serpapi_key,
-                'num': 50,
-                'gl': 'in',
-                'hl': 'en',
-                'tbs': 'qdr:d'  # Last 24 hours only
-            }
-            
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            logger.info(f"SerpAPI returned {len(data.get('organic_results', []))} results")
-            return data
-            
-        except Exception as e:
-            logger.error(f"Error searching jobs: {e}")
-            return None
+    def plan_shards(self):
+        """The profiles' search shards, with incremental windows and priorities when enabled"""
+        shards = self.profiles.build_shards()
+        return self.watermarks.plan(shards) if self.watermarks else shards
     
-    def process_with_ai(self, search_results):
-        """Process search results with Groq AI"""
-        try:
-            if not search_results or 'organic_results' not in search_results:
-                logger.warning("No search results to process")
-                return []
-            
-            results = search_results['organic_results'][:30]  # Process top 30
-            
-            prompt = f"""
-Analyze these Google search results for Product Manager jobs in India from ATS career sites.
+    def build_prompt(self, batch):
+        """Build the extraction prompt for one batch of compact search results"""
+        return f"""
+Analyze these Google search results for {self.roles.names} jobs in India from ATS career sites.
 
 SEARCH RESULTS:
-{json.dumps(results, indent=2)[:4000]}  
+{serialize_results(batch)}
 
-TASK: Extract only legitimate Product Manager positions and return as JSON array.
+TASK: Extract only legitimate {self.roles.names} positions and return as JSON array.
 
 RULES:
-1. Only include roles with "Product Manager" in title (exclude Sales PM, Technical PM unless clearly product roles)
+1. Only include roles whose title is one of: {', '.join(self.roles.roles)} (with or without a seniority prefix such as Senior or Associate); exclude sales or support roles that only share the name
 2. Must be from India or major Indian cities
 3. Must be from career/ATS sites (not job boards like Naukri, Indeed)
 4. Remove duplicates based on company + title
@@ -92,165 +187,340 @@ REQUIRED JSON FORMAT:
 
 Return ONLY valid JSON array, no additional text or markdown.
 """
-            
-            chat_completion = self.groq_client.chat.completions.create(
+    
+    def stream_completion(self, batch, on_job=None):
+        """Stream one Groq completion, validating each job object as soon as it closes.
+
+        Returns (jobs, truncated); truncated is True when the output stopped
+        before the closing bracket, e.g. at max_tokens. The call goes through
+        the scheduler, which reserves the prompt plus an equal-sized answer
+        against the token limit and settles the difference from the reported usage.
+        """
+        prompt = self.build_prompt(batch)
+        reserved = 2 * estimate_tokens(prompt)
+        return self.scheduler.call(
+            'groq', lambda: self._stream_completion(batch, prompt, reserved, on_job), tokens=reserved
+        )
+    
+    def _stream_completion(self, batch, prompt, reserved, on_job):
+        started = time.perf_counter()
+        parser = JsonArrayStream()
+        response_text = []
+        jobs = []
+        dropped = 0
+        finish_reason = None
+        usage = None
+        try:
+            stream = self.groq_client.chat.completions.create(
                 messages=[
                     {
                         "role": "system", 
-                        "content": "You are a job search expert. Always return valid JSON arrays only. Be strict about Product Manager roles."
+                        "content": f"You are a job search expert. Always return valid JSON arrays only. Be strict about {self.roles.names} roles."
                     },
                     {"role": "user", "content": prompt}
                 ],
                 model="llama-3.1-70b-versatile",
                 temperature=0.1,
-                max_tokens=3000
+                max_tokens=GROQ_MAX_TOKENS,
+                stream=True
             )
             
-            ai_response = chat_completion.choices[0].message.content.strip()
-            
-            # Clean response to extract JSON
-            if '```json' in ai_response:
-                ai_response = ai_response.split('```json')[1].split('```')[0].strip()
-            elif '```' in ai_response:
-                ai_response = ai_response.split('```')[1].strip()
-            
-            # Parse JSON
-            jobs = json.loads(ai_response)
-            
-            # Validate jobs format
-            validated_jobs = []
-            for job in jobs:
-                if isinstance(job, dict) and all(key in job for key in ['title', 'company', 'link']):
-                    # Add missing fields with defaults
-                    job.setdefault('location', 'India')
-                    job.setdefault('snippet', 'No description available')
-                    job.setdefault('date_found', datetime.now().strftime('%Y-%m-%d'))
-                    validated_jobs.append(job)
-            
-            logger.info(f"AI processed {len(validated_jobs)} valid jobs from {len(results)} search results")
-            return validated_jobs
+            for chunk in stream:
+                choice = chunk.choices[0] if chunk.choices else None
+                if choice is not None:
+                    finish_reason = choice.finish_reason or finish_reason
+                    content = choice.delta.content or ''
+                    response_text.append(content)
+                    objects = parser.feed(content)
+                    valid = validate_jobs(objects)
+                    dropped += len(objects) - len(valid)
+                    for job in valid:
+                        jobs.append(job)
+                        if on_job:
+                            on_job(job)
+                # Groq reports token usage on the final chunk
+                usage = getattr(getattr(chunk, 'x_groq', None), 'usage', None) or getattr(chunk, 'usage', None) or usage
+        except Exception:
+            self.metrics.observe_http('api.groq.com', time.perf_counter() - started)
+            raise
+        
+        elapsed = time.perf_counter() - started
+        total_tokens = getattr(usage, 'total_tokens', None)
+        if total_tokens:
+            self.scheduler.adjust_tokens('groq', total_tokens - reserved)
+        self.metrics.record_groq_call(
+            elapsed,
+            getattr(usage, 'prompt_tokens', None),
+            getattr(usage, 'completion_tokens', None),
+            finish_reason,
+            len(batch)
+        )
+        self.metrics.add_stage_time('ai', elapsed)
+        self.metrics.inc('ai_jobs_dropped_by_validation', dropped + parser.errors)
+        
+        if not parser.started:
+            # No JSON array at all: fall back to parsing the whole response
+            parsed = parse_ai_json(''.join(response_text))
+            jobs = validate_jobs(parsed)
+            if on_job:
+                for job in jobs:
+                    on_job(job)
+            return jobs, False
+        
+        return jobs, not parser.complete
+    
+    def extract_results(self, batch, on_job=None, depth=0, emitted=None):
+        """Extract jobs from a batch, recovering from truncated output with continuation calls.
+
+        Returns (jobs, remaining). Complete objects from a truncated completion
+        are kept, and only results the model has not produced a job for (after
+        the last one it reached) are sent again. Each link is passed to
+        ``on_job`` once, however often a retry returns it. ``remaining`` are
+        the results still unprocessed when continuation calls ran out or failed.
+        """
+        emitted = set() if emitted is None else emitted
+        jobs = []
+        
+        def emit(job):
+            key = canonicalize_url(job['link'])
+            if key in emitted:
+                return
+            emitted.add(key)
+            jobs.append(job)
+            if on_job:
+                on_job(job)
+        
+        _, truncated = self.stream_completion(batch, emit)
+        if not truncated:
+            return jobs, []
+        
+        self.metrics.inc('ai_completions_truncated')
+        reached = [i for i, result in enumerate(batch) if canonicalize_url(result['link']) in emitted]
+        rest = [result for result in batch[reached[-1] + 1 if reached else 0:]
+                if canonicalize_url(result['link']) not in emitted]
+        if not rest:
+            return jobs, []
+        if depth >= self.max_continuations:
+            logger.warning(f"AI output still truncated after {depth} continuation calls, "
+                           f"leaving {len(rest)} results for a later run")
+            return jobs, rest
+        
+        if reached:
+            logger.info(f"AI output truncated after {len(jobs)} jobs, continuing with {len(rest)} remaining results")
+            self.metrics.inc('ai_continuations')
+            more, remaining = self._continue(rest, on_job, depth + 1, emitted)
+            return jobs + more, remaining
+        
+        if len(rest) == 1:
+            return jobs, []
+        
+        # Nothing usable to resume from: split the batch and retry both halves
+        logger.info(f"AI output truncated with no usable jobs, splitting batch of {len(rest)}")
+        self.metrics.inc('ai_continuations', 2)
+        mid = len(rest) // 2
+        remaining = []
+        for half in (rest[:mid], rest[mid:]):
+            more, left = self._continue(half, on_job, depth + 1, emitted)
+            jobs += more
+            remaining += left
+        return jobs, remaining
+    
+    def _continue(self, results, on_job, depth, emitted):
+        """A continuation call; if it fails, its results are left for a later run"""
+        try:
+            return self.extract_results(results, on_job, depth, emitted)
+        except Exception as e:
+            logger.warning(f"Continuation call failed, leaving {len(results)} results for a later run: {e}")
+            return [], results
+    
+    def extract_batch(self, batch, on_job=None):
+        """Run one batch through Groq: returns (jobs, done), or None on failure.
+
+        ``done`` are the results whose outcome is final, normally the whole
+        batch; results truncated output never reached are left out so they
+        are not cached and a later run retries them. ``on_job`` is called
+        with each job as soon as the model finishes it.
+        """
+        try:
+            jobs, remaining = self.extract_results(batch, on_job)
+            jobs = merge_jobs([jobs])
+            self.metrics.inc('ai_jobs_extracted', len(jobs))
+            if remaining:
+                self.metrics.inc('ai_results_deferred', len(remaining))
+            left = {result['link'] for result in remaining}
+            return jobs, [result for result in batch if result['link'] not in left]
             
+        except QuotaExceeded as e:
+            # Not cached, so the batch is picked up again by a later run
+            self.metrics.inc('ai_batches_deferred')
+            logger.warning(f"Deferring batch of {len(batch)} results: {e}")
+            return None
         except json.JSONDecodeError as e:
+            self.metrics.inc('ai_batches_failed')
             logger.error(f"Failed to parse AI response as JSON: {e}")
-            logger.error(f"AI Response: {ai_response[:500]}...")
-            return []
+            return None
         except Exception as e:
-            logger.error(f"Error processing with AI: {e}")
-            return []
+            self.metrics.inc('ai_batches_failed')
+            logger.error(f"Error processing batch with AI: {e}")
+            return None
     
-    def send_telegram_alert(self, jobs):
-        """Send job alerts to Telegram"""
-        if not self.telegram_bot_token or not self.telegram_chat_id:
-            logger.warning("Telegram credentials missing, skipping notification")
-            return
-            
-        try:
-            url = f"https://api.telegram.org/bot{self.telegram_bot_token}/sendMessage"
-            
-            if not jobs:
-                message = """🔍 *Daily Job Search Complete*
+    def enrich_results(self, accepted_jobs, misses):
+        """Fill accepted jobs from page JobPosting data and decide misses it makes conclusive.
 
-No new Product Manager positions found today from ATS sites.
-
-The automation searched through:
-• Workday, Greenhouse, Lever
-• ICIMS, SmartRecruiters, Taleo  
-• BambooHR, Breezy, JazzHR
-• And 6+ more ATS platforms
-
-Try again tomorrow! 🚀
-
-#JobSearch #ProductManager #India"""
+        Returns (jobs, remaining_misses); only the remaining misses need the model.
+        """
+        if not self.enricher or not (accepted_jobs or misses):
+            return accepted_jobs, misses
+        try:
+            with self.metrics.stage('enrich'):
+                postings = self.enricher.fetch_postings(
+                    [job['link'] for job in accepted_jobs] + [r['link'] for r in misses if r.get('link')]
+                )
+        except Exception as e:
+            logger.error(f"Error enriching results: {e}")
+            return accepted_jobs, misses
+        
+        # Postings past their validThrough date are closed even if the snippet looked right
+        kept = []
+        for job in accepted_jobs:
+            posting = postings.get(job['link'])
+            if is_expired(posting):
+                continue
+            if posting:
+                job.update(posting_fields(posting))
+            kept.append(job)
+        self.metrics.inc('enrich_expired_dropped', len(accepted_jobs) - len(kept))
+        
+        decided, decided_jobs, remaining = [], [], []
+        for result in misses:
+            decision, job = decide_from_posting(result, postings.get(result.get('link')), self.roles)
+            if decision == ACCEPT:
+                decided_jobs.append(job)
+            if decision in (ACCEPT, REJECT):
+                decided.append(result)
             else:
-                repo = os.getenv('GITHUB_REPOSITORY', 'username/repo')
-                dashboard_url = f"https://{repo.replace('/', '.github.io/')}"
-                
-                message = f"🎯 *{len(jobs)} New Product Manager Jobs Found!*\n\n"
-                
-                # Show top 5 jobs
-                for i, job in enumerate(jobs[:5], 1):
-                    title = job.get('title', 'N/A')[:50]  # Truncate long titles
-                    company = job.get('company', 'N/A')
-                    location = job.get('location', 'N/A').split(',')[0]  # Just city
-                    link = job.get('link', '#')
-                    
-                    message += f"{i}\\. *{title}*\n"
-                    message += f"🏢 {company}\n"
-                    message += f"📍 {location}\n"
-                    message += f"🔗 [Apply Now]({link})\n\n"
-                
-                if len(jobs) > 5:
-                    message += f"\\.\\.\\. and {len(jobs) - 5} more jobs\\!\n\n"
-                
-                message += f"📊 [View Full Dashboard]({dashboard_url})\n\n"
-                message += "#ProductManager #Jobs #India #ATS"
-            
-            data = {
-                'chat_id': self.telegram_chat_id,
-                'text': message,
-                'parse_mode': 'MarkdownV2',
-                'disable_web_page_preview': False
-            }
-            
-            response = requests.post(url, json=data, timeout=30)
-            response.raise_for_status()
-            logger.info("Telegram alert sent successfully")
+                remaining.append(result)
+        # Cache these like model outcomes so later runs skip the page fetch too
+        if decided:
+            self.extraction_cache.store_batch(decided, decided_jobs)
+        
+        self.metrics.inc('enrich_pages_with_jobposting', sum(1 for p in postings.values() if p))
+        self.metrics.inc('enrich_accepted_without_ai', len(decided_jobs))
+        self.metrics.inc('enrich_rejected_without_ai', len(decided) - len(decided_jobs))
+        return kept + decided_jobs, remaining
+    
+    def record_dispatch(self, counts, misses):
+        """Count classifier outcomes and what batch packing drops or truncates"""
+        for decision, count in counts.items():
+            self.metrics.inc(f'classifier_{decision}', count)
+        no_link, truncated = truncation_counts(misses)
+        self.metrics.inc('results_dropped_without_link', no_link)
+        self.metrics.inc('snippets_truncated', truncated)
+    
+    def send_telegram_alert(self, jobs, profiles=None):
+        """Send each profile the jobs matching its filters (the "no new jobs" message if jobs is empty).
+
+        Deliveries are checkpointed per chat, so a resumed run only sends
+        what each chat has not received yet.
+        """
+        if not self.notifier:
+            logger.warning("Telegram credentials missing, skipping notification")
+            return
             
-        except Exception as e:
-            logger.error(f"Error sending Telegram alert: {e}")
-            # Try without markdown as fallback
+        for profile in (self.profiles if profiles is None else profiles):
+            matched = profile.filter(jobs)
+            if (jobs and not matched) or not profile.chat_ids:
+                continue
+            matched = self.ranker.rank(matched, profile)
+            keys = [job['link'] for job in matched] or [f"quiet|{profile.name}"]
+            # Chats grouped by what they are still missing
+            groups = {}
+            for chat_id in profile.chat_ids:
+                unsent = tuple(self.checkpoint.unsent(chat_id, keys))
+                if unsent:
+                    groups.setdefault(unsent, []).append(chat_id)
+            if not groups:
+                logger.info(f"Profile '{profile.name}' already notified in run {self.checkpoint.run_id}")
+                if matched:
+                    self.alerted_profiles.add(profile.name)
+                continue
             try:
-                simple_message = f"🎯 Found {len(jobs)} new Product Manager jobs today! Check your dashboard for details."
-                data = {
-                    'chat_id': self.telegram_chat_id,
-                    'text': simple_message
-                }
-                requests.post(url, json=data, timeout=30)
-                logger.info("Sent simple Telegram fallback message")
-            except:
-                logger.error("Failed to send even simple Telegram message")
+                with self.metrics.stage('notify'):
+                    for unsent, chat_ids in groups.items():
+                        pending = set(unsent)
+                        delivered = self.notifier.send_jobs(
+                            [job for job in matched if job['link'] in pending],
+                            chat_ids=chat_ids, heading=profile.label
+                        )
+                        for chat_id, ok in delivered.items():
+                            if ok:
+                                self.checkpoint.record_sent(chat_id, unsent)
+                if matched:
+                    self.alerted_profiles.add(profile.name)
+                    self.metrics.inc(f'alerts_profile_{profile.name}', len(matched))
+                logger.info(f"Telegram alert sent to profile '{profile.name}' ({len(matched)} jobs)")
+            except Exception as e:
+                logger.error(f"Error sending Telegram alert to profile '{profile.name}': {e}")
+    
+    def send_quiet_day_alerts(self):
+        """Send the "no new jobs" message to profiles that received no alert this run.
+
+        Incremental runs are hourly, so there it goes out once, from the run
+        at QUIET_DAY_HOUR, to profiles that got no alert all day.
+        """
+        alerted = self.alerted_profiles
+        if self.watermarks:
+            self.watermarks.record_alerts(self.alerted_profiles)
+            if datetime.now().hour != self.quiet_day_hour:
+                return
+            alerted = self.watermarks.alerted_today()
+        quiet = [p for p in self.profiles if p.name not in alerted]
+        if quiet:
+            self.send_telegram_alert([], profiles=quiet)
     
     def save_jobs_data(self, jobs):
-        """Save jobs to JSON file and return new jobs only"""
+        """Upsert jobs into the job store and return new jobs only.
+
+        Errors propagate: the pipeline must stop rather than mark results seen
+        that were never stored.
+        """
+        with self.metrics.stage('save'):
+            new_jobs = self.job_store.save_new_jobs(jobs)
+        self.metrics.inc('jobs_new', len(new_jobs))
+        self.ranker.add(new_jobs)
+        self.archive.append(new_jobs)
+        self.search_index.add(new_jobs)
+        
+        if new_jobs:
+            logger.info(f"Saved {len(new_jobs)} new jobs, total: {self.job_store.count()}")
+        else:
+            logger.info("No new jobs to save")
+        return new_jobs
+    
+    def write_run_report(self, stats):
+        """Emit the JSON run report and Prometheus textfile for this run"""
+        cache = self.extraction_cache
+        lookups = cache.hits + cache.misses
+        self.metrics.set('pipeline', stats)
+        self.metrics.set('extraction_cache', {
+            'hits': cache.hits,
+            'misses': cache.misses,
+            'hit_rate': round(cache.hits / lookups, 4) if lookups else None,
+        })
+        self.metrics.inc('extraction_cache_hits', cache.hits)
+        self.metrics.inc('extraction_cache_misses', cache.misses)
+        self.metrics.set('quota', {
+            name: {'run_allowance': self.scheduler.planner.allowances.get(name),
+                   'run_used': self.scheduler.planner.used.get(name, 0)}
+            for name in self.scheduler.providers
+        })
         try:
-            os.makedirs('data', exist_ok=True)
-            jobs_file = 'data/jobs.json'
-            
-            # Load existing jobs
-            existing_jobs = []
-            if os.path.exists(jobs_file):
-                with open(jobs_file, 'r') as f:
-                    try:
-                        existing_jobs = json.load(f)
-                    except json.JSONDecodeError:
-                        logger.warning("Invalid existing jobs file, starting fresh")
-                        existing_jobs = []
-            
-            # Simple deduplication by link
-            existing_links = {job.get('link', '') for job in existing_jobs}
-            new_jobs = [job for job in jobs if job.get('link', '') not in existing_links and job.get('link')]
-            
-            if new_jobs:
-                # Add new jobs to the beginning
-                all_jobs = new_jobs + existing_jobs
-                # Keep only last 200 jobs to prevent file from growing too large
-                all_jobs = all_jobs[:200]
-                
-                with open(jobs_file, 'w') as f:
-                    json.dump(all_jobs, f, indent=2, ensure_ascii=False)
-                
-                logger.info(f"Saved {len(new_jobs)} new jobs, total: {len(all_jobs)}")
-                return new_jobs
-            else:
-                logger.info("No new jobs to save")
-                return []
-                
-        except Exception as e:
-            logger.error(f"Error saving jobs: {e}")
-            return []
+            self.metrics.write()
+        except OSError as e:
+            logger.error(f"Error writing run report: {e}")
     
     def run(self):
-        """Main execution function"""
+        """Main execution function; returns the process exit status"""
         logger.info("🚀 Starting daily job search automation")
         
         # Validate required environment variables
@@ -259,34 +529,51 @@ Try again tomorrow! 🚀
         
         if missing_vars:
             logger.error(f"Missing required environment variables: {missing_vars}")
-            return
-        
-        # Search for jobs
-        logger.info("🔍 Searching for jobs...")
-        search_results = self.search_jobs()
+            return 1
+        # Frequent runs need a monthly budget to spread SerpAPI searches over
+        if self.incremental and not self.serpapi_monthly_quota:
+            logger.error("SEARCH_MODE=incremental requires SERPAPI_MONTHLY_QUOTA to be set")
+            return 1
         
-        if not search_results:
-            logger.error("❌ No search results obtained")
-            return
+        # Search, extract, save and notify as concurrent streaming stages
+        logger.info("🔍 Streaming search -> AI -> save -> notify pipeline...")
+        pipeline = StreamingPipeline(
+            self,
+            extract_workers=self.groq_concurrency,
+            alert_interval=float(os.getenv('ALERT_INTERVAL_SECONDS') or '60'),
+            alert_max_jobs=int(os.getenv('ALERT_MAX_JOBS') or '50')
+        )
+        with profiling('job_search'):
+            stats = pipeline.run()
+        self.ranker.save()
+        self.scheduler.save()
+        if self.watermarks:
+            self.metrics.inc('results_skipped_seen', self.watermarks.skipped)
+            self.watermarks.close()
+        if self.enricher:
+            self.enricher.close()
+        self.write_run_report(stats)
         
-        # Process with AI
-        logger.info("🧠 Processing results with AI...")
-        processed_jobs = self.process_with_ai(search_results)
+        # Fail the workflow so "Re-run failed jobs" resumes this run ID from its checkpoint
+        if pipeline.failed:
+            logger.error(f"❌ Pipeline stages failed: {', '.join(stats['failed_stages']) or 'unknown'}")
+            return 1
         
-        # Save new jobs
-        logger.info("💾 Saving job data...")
-        new_jobs = self.save_jobs_data(processed_jobs)
-        
-        # Send notifications for new jobs only
-        logger.info("📱 Sending notifications...")
-        self.send_telegram_alert(new_jobs)
+        if not stats['results']:
+            if self.incremental:
+                logger.info("No results since the last run")
+                print("SUCCESS: No new search results since the last run")
+            else:
+                logger.error("❌ No search results obtained")
+            return 0
         
         # Log final summary
-        logger.info(f"✅ Job search completed! Processed: {len(processed_jobs)}, New: {len(new_jobs)}")
-        print(f"SUCCESS: Found {len(processed_jobs)} total jobs, {len(new_jobs)} are new")
+        logger.info(f"✅ Job search completed! Processed: {stats['processed']}, New: {stats['new']}")
+        print(f"SUCCESS: Found {stats['processed']} total jobs, {stats['new']} are new")
+        return 0
 
 if __name__ == "__main__":
     automation = JobSearchAutomation()
-    automation.run()
+    sys.exit(automation.run())
 
 # END OF FILE 1
@@ -0,0 +1,129 @@
+import logging
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+
+def job_city(job):
+    """City shown on the dashboard: first component of the location"""
+    return (job.get('location') or 'Unknown').split(',')[0].strip()
+
+
+class JobStats:
+    """Materialized per-day, per-company and per-city job counts.
+
+    Aggregates are updated incrementally as jobs are saved, so dashboard
+    counters and time series are read from small tables instead of scanning
+    the job history.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS stats_daily (
+                day TEXT PRIMARY KEY,
+                count INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS stats_company (
+                company TEXT PRIMARY KEY,
+                count INTEGER NOT NULL,
+                last_seen TEXT
+            );
+            CREATE TABLE IF NOT EXISTS stats_city (
+                city TEXT PRIMARY KEY,
+                count INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_stats_company_count ON stats_company(count);
+        """)
+        self.conn.commit()
+
+    def _apply(self, jobs, delta):
+        daily = {}
+        company = {}
+        city = {}
+        for job in jobs:
+            day = job.get('date_found', '')
+            daily[day] = daily.get(day, 0) + delta
+            name = job.get('company') or 'Unknown'
+            count, last_seen = company.get(name, (0, ''))
+            company[name] = (count + delta, max(last_seen, day))
+            if job.get('location'):
+                city[job_city(job)] = city.get(job_city(job), 0) + delta
+
+        self.conn.executemany("""
+            INSERT INTO stats_daily (day, count) VALUES (?, ?)
+            ON CONFLICT(day) DO UPDATE SET count = count + excluded.count
+        """, daily.items())
+        self.conn.executemany("""
+            INSERT INTO stats_company (company, count, last_seen) VALUES (?, ?, ?)
+            ON CONFLICT(company) DO UPDATE SET
+                count = count + excluded.count,
+                last_seen = MAX(COALESCE(last_seen, ''), excluded.last_seen)
+        """, [(name, count, last_seen) for name, (count, last_seen) in company.items()])
+        self.conn.executemany("""
+            INSERT INTO stats_city (city, count) VALUES (?, ?)
+            ON CONFLICT(city) DO UPDATE SET count = count + excluded.count
+        """, city.items())
+
+        # Drop groups that no longer have any jobs
+        for table in ('stats_daily', 'stats_company', 'stats_city'):
+            self.conn.execute(f"DELETE FROM {table} WHERE count <= 0")
+
+    def record(self, jobs):
+        """Count newly stored jobs (call within the store's transaction)"""
+        if jobs:
+            self._apply(jobs, 1)
+
+    def remove(self, jobs):
+        """Uncount jobs removed from the store or found to be closed"""
+        if jobs:
+            self._apply(jobs, -1)
+
+    def total(self):
+        return self.conn.execute("SELECT COALESCE(SUM(count), 0) FROM stats_daily").fetchone()[0]
+
+    def rebuild(self, jobs):
+        """Recompute all aggregates from scratch (used once when migrating)"""
+        for table in ('stats_daily', 'stats_company', 'stats_city'):
+            self.conn.execute(f"DELETE FROM {table}")
+        self._apply(jobs, 1)
+        self.conn.commit()
+        logger.info(f"Rebuilt job statistics from {len(jobs)} stored jobs")
+
+    def counters(self, today):
+        """Dashboard counters: total jobs, new today, companies and cities"""
+        row = self.conn.execute("""
+            SELECT
+                (SELECT COALESCE(SUM(count), 0) FROM stats_daily),
+                (SELECT COALESCE(SUM(count), 0) FROM stats_daily WHERE day = ?),
+                (SELECT COUNT(*) FROM stats_company),
+                (SELECT COUNT(*) FROM stats_city)
+        """, (today,)).fetchone()
+        return {
+            'total_jobs': row[0],
+            'new_today': row[1],
+            'companies': row[2],
+            'cities': row[3],
+        }
+
+    def daily_series(self, days=30, end=None):
+        """Jobs found per day for the last ``days`` days, oldest first, zero-filled"""
+        end = end or datetime.now()
+        start = (end - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+        counts = dict(self.conn.execute(
+            "SELECT day, count FROM stats_daily WHERE day >= ? AND day <= ?",
+            (start, end.strftime('%Y-%m-%d'))
+        ).fetchall())
+        series = []
+        for offset in range(days - 1, -1, -1):
+            day = (end - timedelta(days=offset)).strftime('%Y-%m-%d')
+            series.append({'day': day, 'count': counts.get(day, 0)})
+        return series
+
+    def top_companies(self, limit=10):
+        """Companies with the most tracked jobs"""
+        rows = self.conn.execute(
+            "SELECT company, count, last_seen FROM stats_company ORDER BY count DESC, company LIMIT ?",
+            (limit,)
+        ).fetchall()
+        return [{'company': c, 'count': n, 'last_seen': last} for c, n, last in rows]
@@ -0,0 +1,340 @@
+import os
+import sys
+import json
+import hashlib
+import sqlite3
+import logging
+
+from dedup import DedupIndex
+from job_stats import JobStats
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = 'data/jobs.db'
+LEGACY_JOBS_FILE = 'data/jobs.json'
+
+JOB_COLUMNS = ('link', 'title', 'company', 'location', 'snippet', 'date_found')
+
+
+class JobStore:
+    """SQLite-backed job history.
+
+    Jobs are keyed by ``link`` and indexed on company and date_found, so
+    inserts and the new-job diff cost O(batch) instead of O(history).
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # The streaming pipeline opens the store on the main thread and writes from a stage thread
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._create_schema()
+        self.dedup = DedupIndex(self.conn)
+        self.dedup.backfill(self._unindexed_jobs())
+        self.stats = JobStats(self.conn)
+        # Statistics count open jobs only; rebuild when missing or out of step (older stores)
+        if self.stats.total() != self._open_count():
+            self.stats.rebuild(self.load_jobs())
+
+    def _create_schema(self):
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                link TEXT NOT NULL UNIQUE,
+                title TEXT NOT NULL,
+                company TEXT NOT NULL,
+                location TEXT,
+                snippet TEXT,
+                date_found TEXT NOT NULL,
+                extra TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_company ON jobs(company);
+            CREATE INDEX IF NOT EXISTS idx_jobs_date_found ON jobs(date_found);
+            CREATE TABLE IF NOT EXISTS job_liveness (
+                link TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                http_status INTEGER,
+                etag TEXT,
+                last_modified TEXT,
+                last_checked REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_liveness_checked ON job_liveness(last_checked);
+            CREATE INDEX IF NOT EXISTS idx_liveness_status ON job_liveness(status);
+        """)
+        self.conn.commit()
+
+    def _unindexed_jobs(self):
+        rows = self.conn.execute("""
+            SELECT jobs.* FROM jobs
+            LEFT JOIN job_fingerprints fp ON fp.link = jobs.link
+            WHERE fp.link IS NULL
+        """).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    @staticmethod
+    def _row_values(job):
+        extra = {k: v for k, v in job.items() if k not in JOB_COLUMNS}
+        return (
+            job['link'],
+            job.get('title', ''),
+            job.get('company', ''),
+            job.get('location', 'India'),
+            job.get('snippet', 'No description available'),
+            job.get('date_found', ''),
+            json.dumps(extra, ensure_ascii=False) if extra else None,
+        )
+
+    @staticmethod
+    def _row_to_job(row):
+        job = {column: row[column] for column in JOB_COLUMNS}
+        if row['extra']:
+            job.update(json.loads(row['extra']))
+        return job
+
+    def find_new(self, jobs):
+        """Return the jobs whose link is not stored yet, in input order"""
+        links = list({job['link'] for job in jobs if job.get('link')})
+        if not links:
+            return []
+
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS incoming (link TEXT PRIMARY KEY)")
+        self.conn.execute("DELETE FROM incoming")
+        self.conn.executemany("INSERT INTO incoming (link) VALUES (?)", [(link,) for link in links])
+        new_links = {row[0] for row in self.conn.execute("""
+            SELECT incoming.link FROM incoming
+            LEFT JOIN jobs ON jobs.link = incoming.link
+            WHERE jobs.link IS NULL
+        """)}
+
+        new_jobs = []
+        for job in jobs:
+            if job.get('link') in new_links:
+                new_jobs.append(job)
+                new_links.discard(job['link'])
+        return new_jobs
+
+    def upsert_jobs(self, jobs):
+        """Insert jobs, refreshing the details of links already stored.
+
+        The original ``date_found`` of a stored job is kept. Open jobs whose
+        company or location changed are moved between the statistics groups
+        in the same transaction; new links are counted by the caller.
+        """
+        jobs = [job for job in jobs if job.get('link')]
+        before = {job['link']: job for job in self.get_jobs([job['link'] for job in jobs])}
+        closed = self._closed_links(list(before))
+        self.conn.executemany("""
+            INSERT INTO jobs (link, title, company, location, snippet, date_found, extra)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(link) DO UPDATE SET
+                title = excluded.title,
+                company = excluded.company,
+                location = excluded.location,
+                snippet = excluded.snippet,
+                extra = excluded.extra
+        """, [self._row_values(job) for job in jobs])
+
+        # Closed jobs are not counted, so only open ones move
+        group = lambda job: (job['company'], job['location'])
+        moved = [job for job in self.get_jobs([link for link in before if link not in closed])
+                 if group(job) != group(before[job['link']])]
+        self.stats.remove([before[job['link']] for job in moved])
+        self.stats.record(moved)
+        self.conn.commit()
+
+    def save_new_jobs(self, jobs):
+        """Upsert jobs and return the ones that were not stored before.
+
+        Jobs with an unseen link that duplicate a stored job (reposted under
+        another URL, or a near-identical posting) are dropped.
+        """
+        candidates = self.find_new(jobs)
+        candidate_ids = {id(job) for job in candidates}
+        known_jobs = [job for job in jobs if id(job) not in candidate_ids and job.get('link')]
+
+        new_jobs = []
+        duplicates = 0
+        for job in candidates:
+            if self.dedup.find_duplicate(job):
+                duplicates += 1
+                continue
+            self.dedup.add(job)
+            new_jobs.append(job)
+
+        if duplicates:
+            logger.info(f"Skipped {duplicates} reposted or near-duplicate jobs")
+        self.stats.record(new_jobs)
+        self.upsert_jobs(known_jobs + new_jobs)
+        return new_jobs
+
+    def import_jobs(self, jobs):
+        """Bulk-insert a known-clean job history: no duplicate detection, one transaction.
+
+        Links already stored are skipped. Returns the number of jobs inserted.
+        """
+        jobs = self.find_new(jobs)
+        self.conn.executemany(
+            "INSERT INTO jobs (link, title, company, location, snippet, date_found, extra) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            map(self._row_values, jobs)
+        )
+        self.dedup.add_many(jobs)
+        self.stats.record(jobs)
+        self.conn.commit()
+        return len(jobs)
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def iter_jobs(self, limit=None, include_closed=False):
+        """Yield stored jobs, newest first, skipping postings found to be closed"""
+        query = "SELECT jobs.* FROM jobs"
+        if not include_closed:
+            query += """
+                LEFT JOIN job_liveness lv ON lv.link = jobs.link
+                WHERE lv.status IS NULL OR lv.status != 'closed'
+            """
+        query += " ORDER BY date_found DESC, id DESC"
+        params = ()
+        if limit is not None:
+            query += " LIMIT ?"
+            params = (limit,)
+        for row in self.conn.execute(query, params):
+            yield self._row_to_job(row)
+
+    def load_jobs(self, limit=None, include_closed=False):
+        return list(self.iter_jobs(limit, include_closed))
+
+    def get_jobs(self, links):
+        """Stored jobs for the given links, in the same order (unknown links are skipped)"""
+        found = {}
+        for i in range(0, len(links), 500):
+            chunk = links[i:i + 500]
+            for row in self.conn.execute(
+                f"SELECT * FROM jobs WHERE link IN ({','.join('?' * len(chunk))})", chunk
+            ):
+                found[row['link']] = self._row_to_job(row)
+        return [found[link] for link in links if link in found]
+
+    def links_due_for_check(self, checked_before, limit):
+        """Open (or never checked) links whose last liveness check is older than checked_before.
+
+        Returns dicts with link, etag and last_modified, least recently checked first.
+        """
+        rows = self.conn.execute("""
+            SELECT jobs.link, lv.etag, lv.last_modified FROM jobs
+            LEFT JOIN job_liveness lv ON lv.link = jobs.link
+            WHERE lv.link IS NULL OR (lv.status != 'closed' AND lv.last_checked < ?)
+            ORDER BY COALESCE(lv.last_checked, 0), jobs.date_found DESC
+            LIMIT ?
+        """, (checked_before, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    def _closed_links(self, links):
+        closed = set()
+        for i in range(0, len(links), 500):
+            chunk = links[i:i + 500]
+            closed.update(row[0] for row in self.conn.execute(
+                f"SELECT link FROM job_liveness WHERE status = 'closed' AND link IN ({','.join('?' * len(chunk))})",
+                chunk
+            ))
+        return closed
+
+    def _open_count(self):
+        return self.conn.execute("""
+            SELECT COUNT(*) FROM jobs
+            LEFT JOIN job_liveness lv ON lv.link = jobs.link
+            WHERE lv.status IS NULL OR lv.status != 'closed'
+        """).fetchone()[0]
+
+    def record_liveness(self, checks):
+        """Store liveness results: dicts with link, status, http_status, etag, last_modified, last_checked.
+
+        Jobs that become closed are uncounted from the dashboard statistics
+        (and counted again should they reopen).
+        """
+        checks = list(checks)
+        previous = {}
+        links = [check['link'] for check in checks]
+        for i in range(0, len(links), 500):
+            chunk = links[i:i + 500]
+            previous.update(self.conn.execute(
+                f"SELECT link, status FROM job_liveness WHERE link IN ({','.join('?' * len(chunk))})", chunk
+            ))
+        closed = [c['link'] for c in checks if c['status'] == 'closed' and previous.get(c['link']) != 'closed']
+        reopened = [c['link'] for c in checks if c['status'] != 'closed' and previous.get(c['link']) == 'closed']
+
+        self.conn.executemany("""
+            INSERT INTO job_liveness (link, status, http_status, etag, last_modified, last_checked)
+            VALUES (:link, :status, :http_status, :etag, :last_modified, :last_checked)
+            ON CONFLICT(link) DO UPDATE SET
+                status = excluded.status,
+                http_status = excluded.http_status,
+                etag = COALESCE(excluded.etag, etag),
+                last_modified = COALESCE(excluded.last_modified, last_modified),
+                last_checked = excluded.last_checked
+        """, checks)
+        self.stats.remove(self.get_jobs(closed))
+        self.stats.record(self.get_jobs(reopened))
+        self.conn.commit()
+
+    def import_json(self, jobs_file=LEGACY_JOBS_FILE):
+        """Seed the store from the legacy data/jobs.json file if the store is empty"""
+        if self.count() or not os.path.exists(jobs_file):
+            return 0
+
+        try:
+            with open(jobs_file, 'r') as f:
+                jobs = json.load(f)
+        except json.JSONDecodeError:
+            logger.warning(f"Invalid legacy jobs file {jobs_file}, skipping import")
+            return 0
+
+        # Legacy file is newest first; insert oldest first so ids follow history
+        self.upsert_jobs(list(reversed(jobs)))
+        self.dedup.backfill(self._unindexed_jobs())
+        self.stats.rebuild(self.load_jobs())
+        logger.info(f"Imported {len(jobs)} jobs from {jobs_file}")
+        return len(jobs)
+
+    def export_json(self, jobs_file, limit=None):
+        """Write stored jobs (newest first) to a JSON file"""
+        os.makedirs(os.path.dirname(jobs_file) or '.', exist_ok=True)
+        with open(jobs_file, 'w', encoding='utf-8') as f:
+            json.dump(self.load_jobs(limit), f, ensure_ascii=False)
+
+    def content_digest(self):
+        """Hash of the stored jobs and which are closed, ignoring check timestamps and validators"""
+        digest = hashlib.sha256()
+        for row in self.conn.execute("""
+            SELECT jobs.link, title, company, location, snippet, date_found, extra,
+                   COALESCE(job_liveness.status = 'closed', 0)
+            FROM jobs LEFT JOIN job_liveness ON job_liveness.link = jobs.link
+            ORDER BY jobs.id
+        """):
+            digest.update(json.dumps(list(row), ensure_ascii=False).encode('utf-8'))
+        return digest.hexdigest()
+
+    def close(self):
+        self.conn.close()
+
+
+def open_store(path=DEFAULT_DB_PATH):
+    """Open the job store, migrating the legacy JSON history on first use"""
+    store = JobStore(path)
+    store.import_json()
+    return store
+
+
+if __name__ == "__main__":
+    # Usage: python scripts/job_store.py export <output.json> [limit]
+    #        python scripts/job_store.py digest   (changes only when job content does)
+    if len(sys.argv) >= 3 and sys.argv[1] == 'export':
+        limit = int(sys.argv[3]) if len(sys.argv) > 3 else None
+        store = open_store()
+        store.export_json(sys.argv[2], limit)
+        print(f"Exported {min(store.count(), limit or store.count())} jobs to {sys.argv[2]}")
+    elif len(sys.argv) == 2 and sys.argv[1] == 'digest':
+        print(open_store().content_digest())
+    else:
+        print("Usage: python scripts/job_store.py export <output.json> [limit] | digest")
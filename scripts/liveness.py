@@ -0,0 +1,171 @@
+import os
+import re
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from job_store import open_store
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+OPEN = 'open'
+CLOSED = 'closed'
+UNKNOWN = 'unknown'
+
+# Wording ATS pages use once a requisition is closed
+GENERIC_CLOSED_MARKERS = re.compile(
+    r"no longer (?:accepting applications|available|open)|position has been filled|"
+    r"job (?:has expired|is closed|posting is closed)|this job is no longer|"
+    r"page you are looking for (?:doesn't|does not) exist",
+    re.IGNORECASE
+)
+CLOSED_MARKERS = {
+    'greenhouse.io': re.compile(r"job you are looking for is no longer open", re.IGNORECASE),
+    'lever.co': re.compile(r"sorry, we couldn't find anything here", re.IGNORECASE),
+    'smartrecruiters.com': re.compile(r"job ad is no longer active|job has been closed", re.IGNORECASE),
+    'myworkdayjobs.com': re.compile(r"job posting is no longer available", re.IGNORECASE),
+    'icims.com': re.compile(r"position is no longer (?:accepting|available)", re.IGNORECASE),
+}
+# Redirect targets that mean the posting is gone
+CLOSED_REDIRECT_RE = re.compile(r"[?&]error=true|/jobs/?$|/careers/?$|/search/?$", re.IGNORECASE)
+
+MAX_BODY_BYTES = 256 * 1024
+
+
+def host_markers(host):
+    for domain, pattern in CLOSED_MARKERS.items():
+        if host == domain or host.endswith('.' + domain):
+            return pattern
+    return None
+
+
+class LivenessChecker:
+    """Re-check stored job links and mark closed postings.
+
+    Links are checked concurrently with a cap per ATS host, using
+    If-None-Match / If-Modified-Since so unchanged pages cost a 304. Only
+    links not checked within ``recheck_after_hours`` are visited each run.
+    """
+
+    def __init__(self, store, max_workers=32, per_host_limit=4, recheck_after_hours=24,
+                 max_checks=2000, timeout=15):
+        self.store = store
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.recheck_after_hours = recheck_after_hours
+        self.max_checks = max_checks
+        self.timeout = timeout
+
+        self.host_limits = {}
+        self.host_limits_lock = threading.Lock()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=64, pool_maxsize=per_host_limit)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers['User-Agent'] = 'Mozilla/5.0 (compatible; PM-Job-Scout/1.0)'
+
+    def _host_limit(self, host):
+        with self.host_limits_lock:
+            if host not in self.host_limits:
+                self.host_limits[host] = threading.Semaphore(self.per_host_limit)
+            return self.host_limits[host]
+
+    def check(self, entry):
+        """Check one link and return its liveness record"""
+        link = entry['link']
+        host = urlparse(link).netloc.lower()
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+        record = {
+            'link': link,
+            'status': UNKNOWN,
+            'http_status': None,
+            'etag': None,
+            'last_modified': None,
+            'last_checked': time.time(),
+        }
+        try:
+            with self._host_limit(host):
+                with self.session.get(link, headers=headers, timeout=self.timeout,
+                                      stream=True, allow_redirects=True) as response:
+                    record['http_status'] = response.status_code
+                    record['etag'] = response.headers.get('ETag')
+                    record['last_modified'] = response.headers.get('Last-Modified')
+                    body = ''
+                    if response.status_code == 200:
+                        body = next(response.iter_content(MAX_BODY_BYTES, decode_unicode=True), '') or ''
+                        if isinstance(body, bytes):
+                            body = body.decode('utf-8', errors='ignore')
+                    record['status'] = self.classify(link, response, body)
+        except requests.RequestException as e:
+            logger.debug(f"Liveness check failed for {link}: {e}")
+        return record
+
+    @staticmethod
+    def classify(link, response, body):
+        """Decide open/closed/unknown from the response status, redirects and body markers"""
+        if response.status_code == 304:
+            return OPEN
+        if response.status_code in (404, 410):
+            return CLOSED
+        if response.status_code != 200:
+            return UNKNOWN
+
+        if response.history and urlparse(response.url).path != urlparse(link).path:
+            if CLOSED_REDIRECT_RE.search(response.url):
+                return CLOSED
+
+        markers = host_markers(urlparse(response.url).netloc.lower())
+        if (markers and markers.search(body)) or GENERIC_CLOSED_MARKERS.search(body):
+            return CLOSED
+        return OPEN
+
+    def run(self):
+        """Check due links and record the results; returns counts per status"""
+        checked_before = time.time() - self.recheck_after_hours * 3600
+        due = self.store.links_due_for_check(checked_before, self.max_checks)
+        counts = {OPEN: 0, CLOSED: 0, UNKNOWN: 0}
+        if not due:
+            logger.info("No job links due for a liveness check")
+            return counts
+
+        records = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self.check, entry) for entry in due]
+            for future in as_completed(futures):
+                record = future.result()
+                counts[record['status']] += 1
+                # Failed checks are left to be retried on the next run
+                if record['status'] != UNKNOWN:
+                    records.append(record)
+
+        self.store.record_liveness(records)
+        logger.info(
+            f"Liveness: checked {len(due)} links - {counts[OPEN]} open, "
+            f"{counts[CLOSED]} closed, {counts[UNKNOWN]} unreachable"
+        )
+        return counts
+
+
+if __name__ == "__main__":
+    store = open_store()
+    checker = LivenessChecker(
+        store,
+        max_workers=int(os.getenv('LIVENESS_CONCURRENCY', '32')),
+        per_host_limit=int(os.getenv('LIVENESS_PER_HOST', '4')),
+        recheck_after_hours=int(os.getenv('LIVENESS_RECHECK_HOURS', '24')),
+        max_checks=int(os.getenv('LIVENESS_MAX_CHECKS', '2000'))
+    )
+    counts = checker.run()
+    store.close()
+    print(f"SUCCESS: {counts[CLOSED]} closed postings expired, {counts[OPEN]} still open")
@@ -0,0 +1,237 @@
+import os
+import json
+import time
+import logging
+import threading
+import contextlib
+from datetime import datetime
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_METRICS_DIR = 'data/metrics'
+
+# Upper bounds in seconds, Prometheus-style (each bucket counts observations <= bound)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class Histogram:
+    """Cumulative latency histogram with fixed buckets"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 4),
+            'buckets': {str(bound): count for bound, count in zip(self.buckets, self.counts)},
+        }
+
+
+class RunMetrics:
+    """Thread-safe counters, stage timers and latency histograms for one run.
+
+    Pipeline stages, HTTP sessions and the Groq client all report here; at the
+    end of a run ``write`` emits a JSON run report and a Prometheus textfile
+    (for node_exporter's textfile collector) under ``data/metrics/``.
+    """
+
+    def __init__(self, name, metrics_dir=DEFAULT_METRICS_DIR):
+        self.name = name
+        self.metrics_dir = metrics_dir
+        self.started = datetime.now()
+        self.lock = threading.Lock()
+        self.stages = {}
+        self.counters = {}
+        self.http = {}
+        self.groq_calls = []
+        self.extra = {}
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Time a block and add its wall time to the named stage"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage_time(name, time.perf_counter() - started)
+
+    def add_stage_time(self, name, seconds):
+        with self.lock:
+            stage = self.stages.setdefault(name, {'seconds': 0.0, 'calls': 0})
+            stage['seconds'] += seconds
+            stage['calls'] += 1
+
+    def inc(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe_http(self, host, seconds, status=None):
+        with self.lock:
+            entry = self.http.setdefault(host, {'histogram': Histogram(), 'status': {}})
+            entry['histogram'].observe(seconds)
+            status = str(status) if status is not None else 'error'
+            entry['status'][status] = entry['status'].get(status, 0) + 1
+
+    def record_groq_call(self, seconds, prompt_tokens, completion_tokens, finish_reason, results):
+        """Record one completion: latency, token usage and how many results it covered"""
+        self.observe_http('api.groq.com', seconds, 200)
+        with self.lock:
+            self.groq_calls.append({
+                'seconds': round(seconds, 3),
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'finish_reason': finish_reason,
+                'results': results,
+            })
+
+    def set(self, name, value):
+        """Attach an arbitrary JSON-serializable value to the report"""
+        with self.lock:
+            self.extra[name] = value
+
+    def instrument_session(self, session):
+        """Observe the latency of every response on a requests session, per host"""
+        def hook(response, *args, **kwargs):
+            host = urlparse(response.url).netloc.lower()
+            self.observe_http(host, response.elapsed.total_seconds(), response.status_code)
+        session.hooks['response'].append(hook)
+        return session
+
+    def report(self):
+        with self.lock:
+            prompt_tokens = sum(c['prompt_tokens'] or 0 for c in self.groq_calls)
+            completion_tokens = sum(c['completion_tokens'] or 0 for c in self.groq_calls)
+            return {
+                'name': self.name,
+                'started': self.started.isoformat(),
+                'duration_seconds': round((datetime.now() - self.started).total_seconds(), 3),
+                'stages': {
+                    name: {'seconds': round(s['seconds'], 3), 'calls': s['calls']}
+                    for name, s in self.stages.items()
+                },
+                'counters': dict(self.counters),
+                'http': {
+                    host: dict(entry['histogram'].as_dict(), status=dict(entry['status']))
+                    for host, entry in self.http.items()
+                },
+                'groq': {
+                    'calls': len(self.groq_calls),
+                    'prompt_tokens': prompt_tokens,
+                    'completion_tokens': completion_tokens,
+                    'per_call': list(self.groq_calls),
+                },
+                **self.extra,
+            }
+
+    def prometheus(self, report=None):
+        """Render the report in the Prometheus text exposition format"""
+        report = report or self.report()
+        prefix = 'job_scout'
+        job = f'job="{self.name}"'
+        lines = [
+            f'# HELP {prefix}_run_duration_seconds Wall time of the whole run',
+            f'# TYPE {prefix}_run_duration_seconds gauge',
+            f'{prefix}_run_duration_seconds{{{job}}} {report["duration_seconds"]}',
+            f'# HELP {prefix}_run_timestamp_seconds When the run started',
+            f'# TYPE {prefix}_run_timestamp_seconds gauge',
+            f'{prefix}_run_timestamp_seconds{{{job}}} {self.started.timestamp():.0f}',
+            f'# HELP {prefix}_stage_seconds Wall time spent in each stage',
+            f'# TYPE {prefix}_stage_seconds gauge',
+        ]
+        for name, stage in sorted(report['stages'].items()):
+            lines.append(f'{prefix}_stage_seconds{{{job},stage="{name}"}} {stage["seconds"]}')
+
+        lines += [
+            f'# HELP {prefix}_events_total Counted events (results, drops, cache hits)',
+            f'# TYPE {prefix}_events_total counter',
+        ]
+        for name, value in sorted(report['counters'].items()):
+            lines.append(f'{prefix}_events_total{{{job},event="{name}"}} {value}')
+
+        lines += [
+            f'# HELP {prefix}_groq_tokens_total Groq tokens used',
+            f'# TYPE {prefix}_groq_tokens_total counter',
+            f'{prefix}_groq_tokens_total{{{job},kind="prompt"}} {report["groq"]["prompt_tokens"]}',
+            f'{prefix}_groq_tokens_total{{{job},kind="completion"}} {report["groq"]["completion_tokens"]}',
+            f'# HELP {prefix}_http_request_duration_seconds External HTTP latency per host',
+            f'# TYPE {prefix}_http_request_duration_seconds histogram',
+        ]
+        for host, histogram in sorted(report['http'].items()):
+            labels = f'{job},host="{host}"'
+            for bound, count in histogram['buckets'].items():
+                lines.append(f'{prefix}_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'{prefix}_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram["count"]}')
+            lines.append(f'{prefix}_http_request_duration_seconds_sum{{{labels}}} {histogram["sum"]}')
+            lines.append(f'{prefix}_http_request_duration_seconds_count{{{labels}}} {histogram["count"]}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self):
+        """Write <name>.json and <name>.prom into the metrics directory"""
+        report = self.report()
+        os.makedirs(self.metrics_dir, exist_ok=True)
+        json_path = os.path.join(self.metrics_dir, f'{self.name}.json')
+        prom_path = os.path.join(self.metrics_dir, f'{self.name}.prom')
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        # Write then rename so the textfile collector never reads a partial file
+        with open(prom_path + '.tmp', 'w', encoding='utf-8') as f:
+            f.write(self.prometheus(report))
+        os.replace(prom_path + '.tmp', prom_path)
+
+        stages = ', '.join(f"{name} {s['seconds']:.1f}s" for name, s in report['stages'].items())
+        logger.info(f"📈 Run report written to {json_path} ({stages})")
+        return report
+
+
+@contextlib.contextmanager
+def profiling(name, metrics_dir=DEFAULT_METRICS_DIR):
+    """Profile the block when JOB_SCOUT_PROFILE lists "cprofile" and/or "tracemalloc".
+
+    cProfile stats go to <name>.pstats (open with ``python -m pstats``) and
+    the top allocation sites to <name>.alloc.txt, next to the run report.
+    """
+    modes = {m.strip().lower() for m in os.getenv('JOB_SCOUT_PROFILE', '').split(',') if m.strip()}
+    if not modes:
+        yield
+        return
+
+    profiler = None
+    if 'cprofile' in modes:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    if 'tracemalloc' in modes:
+        import tracemalloc
+        tracemalloc.start(25)
+
+    try:
+        yield
+    finally:
+        os.makedirs(metrics_dir, exist_ok=True)
+        if profiler:
+            profiler.disable()
+            path = os.path.join(metrics_dir, f'{name}.pstats')
+            profiler.dump_stats(path)
+            logger.info(f"cProfile stats written to {path}")
+        if 'tracemalloc' in modes:
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            path = os.path.join(metrics_dir, f'{name}.alloc.txt')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(f"Peak traced memory: {peak / 1024 / 1024:.1f} MB\n\n")
+                for stat in snapshot.statistics('lineno')[:30]:
+                    f.write(f"{stat}\n")
+            logger.info(f"tracemalloc peak {peak / 1024 / 1024:.1f} MB, top allocations in {path}")
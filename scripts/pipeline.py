@@ -0,0 +1,334 @@
+import time
+import queue
+import logging
+import threading
+
+from classifier import classify_results
+from extraction import pack_batches
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a stage's output on its queue
+DONE = object()
+# Yielded by _drain(flush=True) when a queue has run dry, and periodically while it stays empty
+FLUSH = object()
+
+
+class StreamingPipeline:
+    """Run fetch -> classify -> extract -> save -> notify as concurrent stages.
+
+    Stages are threads connected by bounded queues, so a slow downstream stage
+    applies backpressure upstream. Shard results flow into extraction batches
+    as they arrive, each job is passed on as soon as the streamed completion
+    closes its JSON object, and Telegram alerts go out while later batches
+    are still in flight. Save writes whatever is already queued in one
+    transaction. The first new jobs are alerted at once; later ones are
+    coalesced for ``alert_interval`` seconds (or until ``alert_max_jobs`` are
+    waiting) and the rest go out when saving finishes, so a run sends each
+    chat a few messages rather than one per save. Every stage forwards
+    ``DONE`` when it finishes (or fails), which shuts the next stage down cleanly. Postings from direct
+    ATS board connectors skip the model and join at the save stage.
+
+    Fetched shards, extracted batches and new jobs are checkpointed as they
+    complete (see ``RunCheckpoint``), so re-running the same run ID replays
+    finished work from disk and only alerts what was not delivered yet.
+    In incremental mode shard watermarks drop results seen by earlier runs
+    right after the fetch, and are committed once the run completes. A stage
+    that raises stops the whole pipeline; the run is then left unfinished
+    (``failed_stages`` in the stats) so the same run ID can resume it.
+    """
+
+    def __init__(self, automation, queue_size=8, extract_workers=4, alert_interval=60, alert_max_jobs=50):
+        self.automation = automation
+        self.queue_size = queue_size
+        self.extract_workers = extract_workers
+        self.alert_interval = alert_interval
+        self.alert_max_jobs = alert_max_jobs
+        self._stop = threading.Event()
+
+        self.stats = {
+            'results': 0,
+            'processed': 0,
+            'new': 0,
+            'alerts': 0,
+            'first_alert_seconds': None,
+            'failed_stages': [],
+        }
+        self._started_at = None
+        self.checkpoint = automation.checkpoint
+        self.watermarks = automation.watermarks
+
+    @property
+    def failed(self):
+        """True once a stage has raised (stages only stop the pipeline on errors)"""
+        return self._stop.is_set() or bool(self.stats['failed_stages'])
+
+    def _put(self, q, item):
+        """Blocking put that gives up once the pipeline is stopping"""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _close(self, q):
+        """Signal the end of a stage's output, unless the pipeline is stopping and q is full"""
+        while True:
+            try:
+                q.put(DONE, timeout=0.5)
+                return
+            except queue.Full:
+                if self._stop.is_set():
+                    return
+
+    def _drain(self, q, expected_done=1, flush=False):
+        """Yield items until the expected number of DONE markers arrive or the pipeline stops.
+
+        With ``flush=True`` a FLUSH marker is yielded whenever the queue runs
+        dry after delivering items, and then every half second while it stays
+        empty, so consumers can batch what was queued and act on timers.
+        """
+        remaining = expected_done
+        pending = False
+        while remaining:
+            try:
+                item = q.get_nowait() if pending else q.get(timeout=0.5)
+            except queue.Empty:
+                if pending:
+                    pending = False
+                    yield FLUSH
+                elif self._stop.is_set():
+                    return
+                elif flush:
+                    yield FLUSH
+                continue
+            if item is DONE:
+                remaining -= 1
+            else:
+                pending = flush
+                yield item
+
+    def _stage(self, name, target, *args):
+        def runner():
+            try:
+                target(*args)
+            except Exception as e:
+                logger.error(f"Pipeline stage '{name}' failed: {e}")
+                self.stats['failed_stages'].append(name)
+                self._stop.set()
+        thread = threading.Thread(target=runner, name=f"pipeline-{name}", daemon=True)
+        thread.start()
+        return thread
+
+    def _fetch(self, results_q):
+        """Stage 1: stream each shard's results downstream as soon as it completes"""
+        seen_links = set()
+        metrics = self.automation.metrics
+        try:
+            fetcher = self.automation.fetcher
+            shards = self.automation.plan_shards()
+            done = [(s, self.checkpoint.shards[s['key']]) for s in shards if s['key'] in self.checkpoint.shards]
+            fresh = [s for s in shards if s['key'] not in self.checkpoint.shards]
+            if done:
+                logger.info(f"Replaying {len(done)} checkpointed shards, fetching {len(fresh)}")
+            with metrics.stage('search'):
+                for shard, results, replayed in self._iter_shards(fetcher, done, fresh):
+                    # Incomplete shards are fetched again if the run is resumed
+                    if not replayed and not shard.get('incomplete'):
+                        self.checkpoint.record_shard(shard, results)
+                    if self.watermarks:
+                        results = self.watermarks.filter_new(shard, results)
+                    unique = [r for r in results if r.get('link') and r['link'] not in seen_links]
+                    seen_links.update(r['link'] for r in unique)
+                    self.stats['results'] += len(unique)
+                    metrics.inc('results_fetched', len(unique))
+                    if unique and not self._put(results_q, unique):
+                        return
+            if not self._stop.is_set():
+                self.checkpoint.mark('search')
+        finally:
+            self._close(results_q)
+
+    @staticmethod
+    def _iter_shards(fetcher, done, fresh):
+        for shard, results in done:
+            yield shard, results, True
+        for shard, results in fetcher.iter_shards(fresh):
+            yield shard, results, False
+
+    def _poll_boards(self, jobs_q):
+        """Stage 1b: merge postings from direct ATS board connectors (no model needed)"""
+        metrics = self.automation.metrics
+        try:
+            with metrics.stage('boards'):
+                for jobs in self.automation.board_poller.iter_jobs():
+                    self.stats['results'] += len(jobs)
+                    metrics.inc('board_jobs_fetched', len(jobs))
+                    if not self._put(jobs_q, (None, jobs)):
+                        return
+        finally:
+            self._close(jobs_q)
+
+    def _dispatch(self, results_q, batches_q, jobs_q):
+        """Stage 2: classify locally, serve cache hits and pack misses into batches"""
+        cache = self.automation.extraction_cache
+        budget = self.automation.batch_token_budget
+        pending = []
+        try:
+            for results in self._drain(results_q):
+                accepted, ambiguous, counts = classify_results(results, self.automation.roles)
+                # Batches extracted before this run was interrupted come back from the checkpoint
+                extracted, ambiguous = self.checkpoint.lookup(ambiguous)
+                accepted += extracted
+                cached, misses = cache.lookup(ambiguous)
+                self.automation.record_dispatch(counts, misses)
+                accepted, misses = self.automation.enrich_results(accepted, misses)
+                if accepted or cached:
+                    self._put(jobs_q, (None, accepted + cached))
+
+                pending.extend(misses)
+                batches = pack_batches(pending, token_budget=budget)
+                # Hold back the last, possibly partial batch until more results arrive
+                for batch in batches[:-1]:
+                    self._put(batches_q, self._with_originals(batch, pending))
+                if len(batches) > 1:
+                    kept = {r['link'] for r in batches[-1]}
+                    pending = [r for r in pending if r['link'] in kept]
+
+            for batch in pack_batches(pending, token_budget=budget):
+                self._put(batches_q, self._with_originals(batch, pending))
+        finally:
+            for _ in range(self.extract_workers):
+                self._close(batches_q)
+            self._close(jobs_q)
+
+    @staticmethod
+    def _with_originals(batch, results):
+        by_link = {r['link']: r for r in results}
+        return batch, [by_link[r['link']] for r in batch]
+
+    def _extract(self, batches_q, jobs_q):
+        """Stage 3 (parallel workers): stream each batch's jobs downstream as the model emits them"""
+        try:
+            for batch, originals in self._drain(batches_q):
+                outcome = self.automation.extract_batch(
+                    batch, on_job=lambda job: self._put(jobs_q, (None, [job]))
+                )
+                jobs, done = outcome if outcome is not None else (None, [])
+                # Results the model finished are final even if the rest of the batch was cut off
+                done_links = {result['link'] for result in done}
+                finished = [r for r in originals if r['link'] in done_links]
+                unfinished = [r for r in originals if r['link'] not in done_links]
+                if finished:
+                    self.checkpoint.record_batch(finished, jobs)
+                if unfinished and self.watermarks:
+                    self.watermarks.forget(unfinished)
+                # Batch outcome for the extraction cache; its jobs were already sent
+                if not self._put(jobs_q, (finished, jobs if finished else None)):
+                    return
+        finally:
+            self._close(jobs_q)
+
+    def _persist(self, jobs_q, alerts_q):
+        """Stage 4: cache model outcomes, dedupe and save jobs as they arrive"""
+        cache = self.automation.extraction_cache
+        pending = []
+        try:
+            for item in self._drain(jobs_q, expected_done=2 + self.extract_workers, flush=True):
+                if item is FLUSH:
+                    # Save everything queued so far in one transaction
+                    if pending and not self._save(pending, alerts_q):
+                        return
+                    pending = []
+                    continue
+
+                originals, jobs = item
+                if originals is not None:
+                    # End of a model batch: failed batches are not cached
+                    if jobs is not None:
+                        cache.store_batch(originals, jobs)
+                elif jobs:
+                    pending.extend(jobs)
+            if pending:
+                self._save(pending, alerts_q)
+        finally:
+            cache.evict()
+            self._close(alerts_q)
+
+    def _save(self, jobs, alerts_q):
+        self.stats['processed'] += len(jobs)
+        new_jobs = self.automation.save_jobs_data(jobs)
+        self.checkpoint.record_new_jobs(new_jobs)
+        if new_jobs:
+            self.stats['new'] += len(new_jobs)
+            return self._put(alerts_q, new_jobs)
+        return True
+
+    def _send_alert(self, new_jobs):
+        self.automation.send_telegram_alert(new_jobs)
+        self.stats['alerts'] += 1
+        if self.stats['first_alert_seconds'] is None:
+            self.stats['first_alert_seconds'] = time.monotonic() - self._started_at
+            logger.info(f"First alert sent after {self.stats['first_alert_seconds']:.1f}s")
+
+    def _notify(self, alerts_q):
+        """Stage 5: send alerts for new jobs while the run continues"""
+        pending = []
+        last_sent = None
+        for item in self._drain(alerts_q, flush=True):
+            if item is not FLUSH:
+                pending.extend(item)
+                continue
+            if not pending:
+                continue
+            # The first jobs go out at once, later ones are collected into one alert per interval
+            due = last_sent is None or time.monotonic() - last_sent >= self.alert_interval
+            if due or len(pending) >= self.alert_max_jobs:
+                self._send_alert(pending)
+                pending = []
+                last_sent = time.monotonic()
+        if pending:
+            self._send_alert(pending)
+
+        # Keep the daily "nothing new" message for profiles that got no alert
+        if not self._stop.is_set():
+            self.automation.send_quiet_day_alerts()
+
+    def run(self):
+        """Run all stages to completion and return the run statistics"""
+        self._started_at = time.monotonic()
+        results_q = queue.Queue(maxsize=self.queue_size)
+        batches_q = queue.Queue(maxsize=self.queue_size)
+        jobs_q = queue.Queue(maxsize=self.queue_size)
+        alerts_q = queue.Queue(maxsize=self.queue_size)
+
+        # Jobs an interrupted attempt saved are no longer "new" in the store; alert them from the checkpoint
+        if self.checkpoint.new_jobs:
+            self.stats['new'] += len(self.checkpoint.new_jobs)
+            alerts_q.put(list(self.checkpoint.new_jobs))
+
+        threads = [
+            self._stage('fetch', self._fetch, results_q),
+            self._stage('boards', self._poll_boards, jobs_q),
+            self._stage('dispatch', self._dispatch, results_q, batches_q, jobs_q),
+            self._stage('persist', self._persist, jobs_q, alerts_q),
+            self._stage('notify', self._notify, alerts_q),
+        ]
+        threads += [
+            self._stage(f'extract-{i}', self._extract, batches_q, jobs_q)
+            for i in range(self.extract_workers)
+        ]
+        for thread in threads:
+            thread.join()
+        # Only a run whose jobs were all saved may complete and advance the watermarks
+        if self.failed:
+            logger.error(f"Run {self.checkpoint.run_id} stopped early, leaving its checkpoint to resume")
+        else:
+            self.checkpoint.mark('complete')
+            if self.watermarks:
+                self.watermarks.commit()
+
+        self.automation.extraction_cache.log_stats()
+        return self.stats
@@ -0,0 +1,160 @@
+import os
+import re
+import json
+import logging
+
+from classifier import RoleMatcher
+from dedup import normalize_city
+from search_config import ATS_DOMAINS, ROLE_TITLES, CITY_GROUPS, CITIES, build_query
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILES_FILE = 'profiles.json'
+
+# Titles per shard query, so a long union of profile titles is split rather
+# than producing one OR clause Google would truncate
+TITLES_PER_SHARD = len(ROLE_TITLES)
+
+SENIORITY_PATTERNS = [
+    ('lead', re.compile(r'\b(?:lead|principal|group|staff|head|director|vp)\b', re.IGNORECASE)),
+    ('senior', re.compile(r'\b(?:senior|sr)\b', re.IGNORECASE)),
+    ('associate', re.compile(r'\b(?:associate|junior|jr|apm)\b', re.IGNORECASE)),
+]
+
+
+def seniority(title):
+    """Coarse seniority band for a job title: associate, mid, senior or lead"""
+    for band, pattern in SENIORITY_PATTERNS:
+        if pattern.search(title or ''):
+            return band
+    return 'mid'
+
+
+def _phrase_re(phrases):
+    if not phrases:
+        return None
+    return re.compile(r'\b(?:' + '|'.join(re.escape(p) for p in phrases) + r')\b', re.IGNORECASE)
+
+
+class Profile:
+    """One subscriber profile: what to search for and which jobs its chats receive.
+
+    ``titles`` and ``cities`` widen the shared search; ``titles``,
+    ``title_keywords``, ``seniorities``, ``cities`` and ``exclude_keywords``
+    are local filters applied to the shared pool of extracted jobs.
+    """
+
+    def __init__(self, name, label=None, titles=None, title_keywords=None, seniorities=None,
+                 cities=None, exclude_keywords=None, chat_ids=None, chat_ids_env=None):
+        self.name = name
+        self.label = label or 'Product Manager'
+        self.titles = [t.lower() for t in (titles or ROLE_TITLES)]
+        self.roles = RoleMatcher(self.titles)
+        self.seniorities = set(seniorities or [])
+        self.cities = list(cities or [])
+        self.city_keys = {normalize_city(c) for c in self.cities}
+        self.title_keywords = list(title_keywords or [])
+        self.title_re = _phrase_re(title_keywords)
+        self.exclude_re = _phrase_re(exclude_keywords)
+
+        # Chat IDs usually live in a secret, referenced by environment variable name
+        self.chat_ids = list(chat_ids or [])
+        if chat_ids_env:
+            self.chat_ids += [c.strip() for c in os.getenv(chat_ids_env, '').split(',') if c.strip()]
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def matches(self, job):
+        """Local predicate: does this job belong in the profile's alerts?"""
+        title = job.get('title') or ''
+        if not self.roles.title_re.search(title):
+            return False
+        if self.title_re and not self.title_re.search(title):
+            return False
+        if self.exclude_re and self.exclude_re.search(f"{title} {job.get('snippet') or ''}"):
+            return False
+        if self.seniorities and seniority(title) not in self.seniorities:
+            return False
+        if self.city_keys and normalize_city(job.get('location')) not in self.city_keys:
+            return False
+        return True
+
+    def filter(self, jobs):
+        return [job for job in jobs if self.matches(job)]
+
+
+class ProfileRegistry:
+    """All configured profiles plus the deduplicated search shards they need.
+
+    Shards are keyed by (ATS domain, city group, title group), so profiles
+    that overlap share one SerpAPI query and one pool of extracted jobs.
+    Search cost grows with the distinct titles and cities across profiles,
+    not with the number of profiles or subscribers.
+    """
+
+    def __init__(self, profiles):
+        self.profiles = profiles
+
+    @classmethod
+    def load(cls, path=DEFAULT_PROFILES_FILE):
+        """Load profiles from JSON, falling back to one PM/India profile for TELEGRAM_CHAT_ID"""
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                profiles = [Profile.from_dict(p) for p in data.get('profiles', [])]
+                if profiles:
+                    logger.info(f"Loaded {len(profiles)} search profiles from {path}")
+                    return cls(profiles)
+            except (json.JSONDecodeError, TypeError) as e:
+                logger.error(f"Invalid profiles file {path}: {e}")
+        return cls([Profile('default', chat_ids_env='TELEGRAM_CHAT_ID')])
+
+    def __iter__(self):
+        return iter(self.profiles)
+
+    def __len__(self):
+        return len(self.profiles)
+
+    @property
+    def chat_ids(self):
+        """Every subscribed chat across profiles, each listed once"""
+        return list(dict.fromkeys(c for p in self.profiles for c in p.chat_ids))
+
+    def roles(self):
+        """Every searched title across profiles, for classification, prompts and board filters"""
+        return RoleMatcher([t for p in self.profiles for t in p.titles])
+
+    def title_groups(self):
+        titles = list(dict.fromkeys(t for p in self.profiles for t in p.titles))
+        return [titles[i:i + TITLES_PER_SHARD] for i in range(0, len(titles), TITLES_PER_SHARD)]
+
+    def city_groups(self):
+        """The standard city groups any profile needs, plus one for cities outside them"""
+        if any(not p.cities for p in self.profiles):
+            groups = list(CITY_GROUPS)
+        else:
+            wanted = {normalize_city(c) for p in self.profiles for c in p.cities}
+            groups = [g for g in CITY_GROUPS if wanted & {normalize_city(c) for c in g}]
+
+        known = {normalize_city(c) for c in CITIES}
+        extra = list(dict.fromkeys(
+            c for p in self.profiles for c in p.cities if normalize_city(c) not in known
+        ))
+        if extra:
+            groups.append(extra)
+        return groups
+
+    def build_shards(self, domains=ATS_DOMAINS):
+        """One shard per (domain, city group, title group) needed by any profile"""
+        shards = []
+        title_groups = self.title_groups()
+        for domain in domains:
+            for city_index, cities in enumerate(self.city_groups()):
+                for title_index, titles in enumerate(title_groups):
+                    # Keep the original "<domain>|<city group>" key for the default titles
+                    key = f"{domain}|{city_index}" + (f"|t{title_index}" if title_index else '')
+                    shards.append({'key': key, 'query': build_query([domain], titles, cities)})
+        return shards
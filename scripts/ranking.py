@@ -0,0 +1,206 @@
+import os
+import re
+import math
+import zlib
+import hashlib
+import logging
+import threading
+
+import numpy as np
+
+from dates import EPOCH_ORDINAL, day_number, today_number
+from dedup import normalize_city
+from profiles import seniority
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_FILE = 'data/ranking_index.npz'
+
+# Hashed feature space: collisions are rare enough at this size for short postings
+FEATURE_BITS = 18
+TITLE_WEIGHT = 2.0
+MAX_SNIPPET_TOKENS = 60
+
+SENIORITY_CODES = {'associate': 0, 'mid': 1, 'senior': 2, 'lead': 3}
+SENIORITY_BOOST = 0.3
+CITY_BOOST = 0.2
+
+# Words every profile cares about, so untargeted profiles still prefer real PM postings
+BASE_PROFILE_TERMS = ['product manager', 'product management', 'roadmap', 'product strategy',
+                      'customers', 'stakeholders', 'discovery', 'metrics']
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+STOPWORDS = frozenset(
+    'a an and are as at be by for from has in is it of on or our the this to we will with you your'.split()
+)
+
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall((text or '').lower()) if t not in STOPWORDS]
+
+
+def _feature(term):
+    return zlib.crc32(term.encode('utf-8')) & ((1 << FEATURE_BITS) - 1)
+
+
+def text_features(title, snippet=''):
+    """Hashed term weights for title unigrams/bigrams (boosted) and snippet unigrams"""
+    weights = {}
+    title_tokens = tokenize(title)
+    for term in title_tokens + [f"{a} {b}" for a, b in zip(title_tokens, title_tokens[1:])]:
+        feature = _feature(term)
+        weights[feature] = weights.get(feature, 0.0) + TITLE_WEIGHT
+    for term in tokenize(snippet)[:MAX_SNIPPET_TOKENS]:
+        feature = _feature(term)
+        weights[feature] = weights.get(feature, 0.0) + 1.0
+    return weights
+
+
+def link_key(link):
+    """Stable 63-bit key for a job link (Python's hash() changes between runs)"""
+    return int.from_bytes(hashlib.blake2b(link.encode('utf-8'), digest_size=8).digest(), 'big') >> 1
+
+
+def city_code(location):
+    return zlib.crc32(normalize_city(location).encode('utf-8'))
+
+
+class RankingIndex:
+    """Hashed TF-IDF vectors for every stored job, scored with NumPy.
+
+    Jobs are stored as one sparse COO matrix (row, feature, log-scaled term
+    frequency) plus per-job seniority, city and date columns. IDF comes
+    from document frequencies that are updated as jobs are added, so adding
+    a job only vectorizes that job. Scoring a profile is a handful of
+    vectorized gathers and a ``bincount``, which ranks the full history in
+    milliseconds.
+    """
+
+    def __init__(self):
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.rows = np.zeros(0, dtype=np.int32)
+        self.features = np.zeros(0, dtype=np.int32)
+        self.weights = np.zeros(0, dtype=np.float32)
+        self.seniority = np.zeros(0, dtype=np.int8)
+        self.city = np.zeros(0, dtype=np.uint32)
+        self.day = np.zeros(0, dtype=np.int32)
+        self.doc_freq = np.zeros(1 << FEATURE_BITS, dtype=np.int32)
+        self._positions = None
+        self.lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path=DEFAULT_INDEX_FILE):
+        index = cls()
+        if os.path.exists(path):
+            try:
+                with np.load(path) as data:
+                    for name in ('keys', 'rows', 'features', 'weights', 'seniority', 'city', 'day', 'doc_freq'):
+                        setattr(index, name, data[name])
+                # Indexes saved before days were counted from 1970 hold proleptic ordinals
+                if index.day.size and index.day.max() > EPOCH_ORDINAL:
+                    index.day = index.day - np.int32(EPOCH_ORDINAL)
+            except (OSError, KeyError, ValueError) as e:
+                logger.warning(f"Could not load ranking index {path}, rebuilding: {e}")
+                index = cls()
+        return index
+
+    def save(self, path=DEFAULT_INDEX_FILE):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + '.tmp.npz'
+        with self.lock:
+            np.savez(tmp_path, keys=self.keys, rows=self.rows, features=self.features, weights=self.weights,
+                     seniority=self.seniority, city=self.city, day=self.day, doc_freq=self.doc_freq)
+        os.replace(tmp_path, path)
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def positions(self):
+        if self._positions is None:
+            self._positions = {key: i for i, key in enumerate(self.keys.tolist())}
+        return self._positions
+
+    def add(self, jobs, job_keys=None):
+        """Vectorize jobs not yet in the index; returns how many were added"""
+        with self.lock:
+            return self._add(jobs, job_keys)
+
+    def _add(self, jobs, job_keys):
+        positions = self.positions
+        rows, features, weights = [], [], []
+        keys, seniorities, cities, days = [], [], [], []
+        for job, key in zip(jobs, job_keys or map(link_key, (job['link'] for job in jobs))):
+            if key in positions:
+                continue
+            row = len(self.keys) + len(keys)
+            positions[key] = row
+            keys.append(key)
+            seniorities.append(SENIORITY_CODES[seniority(job.get('title'))])
+            cities.append(city_code(job.get('location')))
+            days.append(day_number(job.get('date_found')))
+            for feature, tf in text_features(job.get('title'), job.get('snippet')).items():
+                rows.append(row)
+                features.append(feature)
+                weights.append(1.0 + math.log(tf))
+        if not keys:
+            return 0
+
+        features = np.array(features, dtype=np.int32)
+        self.keys = np.concatenate([self.keys, np.array(keys, dtype=np.int64)])
+        self.rows = np.concatenate([self.rows, np.array(rows, dtype=np.int32)])
+        self.features = np.concatenate([self.features, features])
+        self.weights = np.concatenate([self.weights, np.array(weights, dtype=np.float32)])
+        self.seniority = np.concatenate([self.seniority, np.array(seniorities, dtype=np.int8)])
+        self.city = np.concatenate([self.city, np.array(cities, dtype=np.uint32)])
+        self.day = np.concatenate([self.day, np.array(days, dtype=np.int32)])
+        self.doc_freq += np.bincount(features, minlength=len(self.doc_freq)).astype(np.int32)
+        return len(keys)
+
+    def profile_vector(self, profile):
+        """Dense query vector from the profile's titles, keywords and the shared PM vocabulary"""
+        vector = np.zeros(len(self.doc_freq), dtype=np.float32)
+        terms = list(profile.titles) + profile.title_keywords + BASE_PROFILE_TERMS
+        for term in terms:
+            for feature, weight in text_features(term).items():
+                vector[feature] += weight
+        return vector
+
+    def scores(self, profile, half_life_days=None):
+        """Relevance of every indexed job to a profile (cosine TF-IDF with boosts)"""
+        n = len(self.keys)
+        if not n:
+            return np.zeros(0, dtype=np.float32)
+
+        idf = np.log((1 + n) / (1 + self.doc_freq)).astype(np.float32) + 1.0
+        query = self.profile_vector(profile) * idf
+        query_norm = np.linalg.norm(query) or 1.0
+
+        tfidf = self.weights * idf[self.features]
+        dots = np.bincount(self.rows, weights=tfidf * query[self.features], minlength=n)
+        norms = np.sqrt(np.bincount(self.rows, weights=tfidf * tfidf, minlength=n))
+        scores = np.divide(dots, norms * query_norm, out=np.zeros(n), where=norms > 0)
+
+        if profile.seniorities:
+            wanted = [SENIORITY_CODES[s] for s in profile.seniorities if s in SENIORITY_CODES]
+            scores *= 1.0 + SENIORITY_BOOST * np.isin(self.seniority, wanted)
+        if profile.cities:
+            wanted = list({city_code(c) for c in profile.cities})
+            scores *= 1.0 + CITY_BOOST * np.isin(self.city, np.array(wanted, dtype=np.uint32))
+        if half_life_days:
+            age = np.maximum(today_number() - self.day, 0)
+            scores *= np.exp2(-age / half_life_days)
+        return scores
+
+    def rank(self, jobs, profile, half_life_days=None):
+        """Return jobs ordered by relevance to the profile, most relevant first"""
+        if not jobs:
+            return []
+        job_keys = [link_key(job['link']) for job in jobs]
+        with self.lock:
+            self._add(jobs, job_keys)
+            scores = self.scores(profile, half_life_days)
+            job_scores = scores[[self.positions[key] for key in job_keys]]
+        # Stable sort keeps the incoming (newest-first) order among ties
+        order = np.argsort(-job_scores, kind='stable')
+        return [jobs[i] for i in order]
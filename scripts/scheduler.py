@@ -0,0 +1,318 @@
+import os
+import json
+import time
+import heapq
+import random
+import logging
+import itertools
+import threading
+from datetime import datetime
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATE_FILE = 'data/quota_state.json'
+
+# Lower numbers are served first
+HIGH = 0
+NORMAL = 1
+LOW = 2
+
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class QuotaExceeded(Exception):
+    """The provider's budget for this run (or its account quota) is used up"""
+
+
+class CircuitOpenError(Exception):
+    """The provider kept failing and its circuit breaker is open"""
+
+
+def retry_info(error):
+    """Return (retryable, retry_after_seconds) for an exception from an API call"""
+    response = getattr(error, 'response', None)
+    status = getattr(response, 'status_code', None) or getattr(error, 'status_code', None)
+    retry_after = None
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        retry_after = float(headers.get('retry-after') or headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        pass
+
+    if isinstance(error, QuotaExceeded):
+        return False, None
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True, retry_after
+    if status in RETRYABLE_STATUS:
+        return True, retry_after
+    # Groq's client raises its own APIConnectionError / APITimeoutError
+    name = type(error).__name__
+    return ('Timeout' in name or 'Connection' in name), retry_after
+
+
+class TokenBucket:
+    """Refilling bucket; reservations may go into debt and the caller sleeps it off"""
+
+    def __init__(self, per_minute, capacity=None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.level = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount):
+        """Take ``amount`` now; returns how long to wait before using it"""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.level -= min(amount, self.capacity)
+            return max(0.0, -self.level / self.rate)
+
+    def adjust(self, amount):
+        """Correct an earlier reservation (positive takes more, negative refunds)"""
+        with self.lock:
+            self._refill(time.monotonic())
+            self.level = min(self.capacity, self.level - amount)
+
+    def pause(self, seconds):
+        """Empty the bucket for ``seconds``, e.g. after the provider sent Retry-After"""
+        with self.lock:
+            self._refill(time.monotonic())
+            self.level = min(self.level, -seconds * self.rate)
+
+
+class CircuitBreaker:
+    """Stop calling a provider after repeated failures, then probe it again after a cool-down"""
+
+    def __init__(self, failure_threshold=5, reset_timeout=60, max_wait=300):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_wait = max_wait
+        self.failures = 0
+        self.open_until = 0.0
+        self.lock = threading.Lock()
+
+    def before_call(self, name):
+        """Wait out an open circuit (the work is kept, not dropped) unless that takes too long"""
+        with self.lock:
+            wait = self.open_until - time.monotonic()
+        if wait > self.max_wait:
+            raise CircuitOpenError(f"{name} circuit open for another {wait:.0f}s")
+        if wait > 0:
+            time.sleep(wait)
+
+    def success(self):
+        with self.lock:
+            self.failures = 0
+
+    def failure(self, name):
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.open_until = time.monotonic() + self.reset_timeout
+                self.failures = self.failure_threshold - 1  # one more failure re-opens it
+                logger.warning(f"{name}: {self.failure_threshold} consecutive failures, "
+                               f"pausing calls for {self.reset_timeout}s")
+
+
+class BudgetPlanner:
+    """Spread monthly and daily request quotas over the runs of each day.
+
+    Usage is persisted per provider, so each run gets what is left of
+    today's share divided by the runs still expected today.
+    """
+
+    def __init__(self, state_file=DEFAULT_STATE_FILE, runs_per_day=1):
+        self.state_file = state_file
+        self.runs_per_day = max(1, runs_per_day)
+        self.lock = threading.Lock()
+        self.state = {}
+        if os.path.exists(state_file):
+            try:
+                with open(state_file, 'r', encoding='utf-8') as f:
+                    self.state = json.load(f)
+            except json.JSONDecodeError:
+                logger.warning(f"Invalid quota state in {state_file}, starting fresh")
+        self.allowances = {}
+        self.used = {}
+
+    def _entry(self, name, now):
+        entry = self.state.setdefault(name, {})
+        month, day = now.strftime('%Y-%m'), now.strftime('%Y-%m-%d')
+        if entry.get('month') != month:
+            entry.update(month=month, month_used=0)
+        if entry.get('day') != day:
+            entry.update(day=day, day_used=0, runs=0)
+        return entry
+
+    def start_run(self, name, monthly_quota=0, daily_quota=0):
+        """Work out this run's allowance for a provider (None = unlimited)"""
+        now = datetime.now()
+        with self.lock:
+            entry = self._entry(name, now)
+            limits = []
+            if monthly_quota:
+                days_in_month = (now.replace(month=now.month % 12 + 1, day=1, year=now.year + now.month // 12)
+                                 - now.replace(day=1)).days
+                days_left = days_in_month - now.day + 1
+                limits.append((monthly_quota - entry['month_used'] + entry['day_used']) / days_left
+                              - entry['day_used'])
+            if daily_quota:
+                limits.append(daily_quota - entry['day_used'])
+            runs_left = max(1, self.runs_per_day - entry['runs'])
+            entry['runs'] += 1
+            allowance = max(0, int(min(limits) / runs_left)) if limits else None
+            self.allowances[name] = allowance
+            self.used[name] = 0
+        if allowance is not None:
+            logger.info(f"Quota planner: {name} may make {allowance} calls this run")
+        return allowance
+
+    def consume(self, name, priority, reserve_fraction=0.2):
+        """Count one call; lower-priority calls leave a reserve for high-priority ones"""
+        with self.lock:
+            allowance = self.allowances.get(name)
+            used = self.used.get(name, 0)
+            if allowance is not None:
+                limit = allowance if priority == HIGH else int(allowance * (1 - reserve_fraction))
+                if used >= limit:
+                    raise QuotaExceeded(f"{name} run budget of {allowance} calls used up")
+            self.used[name] = used + 1
+            entry = self._entry(name, datetime.now())
+            entry['month_used'] += 1
+            entry['day_used'] += 1
+
+    def exhaust(self, name):
+        """The provider reported the account quota as used up: stop calling it this run"""
+        with self.lock:
+            self.allowances[name] = self.used.get(name, 0)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.state_file) or '.', exist_ok=True)
+        with self.lock:
+            with open(self.state_file, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f, indent=2)
+
+
+class Provider:
+    """Rate limits, concurrency, retry policy and breaker for one external API"""
+
+    def __init__(self, name, requests_per_minute=0, tokens_per_minute=0, max_concurrency=4,
+                 max_retries=4, base_delay=1.0, max_delay=60.0, breaker=None):
+        self.name = name
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker()
+
+        self.condition = threading.Condition()
+        self.waiting = []
+        self.active = 0
+        self.sequence = itertools.count()
+
+    def acquire(self, priority, tokens):
+        """Block until this call is the highest-priority waiter with a free slot and quota"""
+        ticket = (priority, next(self.sequence))
+        with self.condition:
+            heapq.heappush(self.waiting, ticket)
+            while self.waiting[0] != ticket or self.active >= self.max_concurrency:
+                self.condition.wait()
+            heapq.heappop(self.waiting)
+            self.active += 1
+            self.condition.notify_all()
+
+        wait = 0.0
+        if self.request_bucket:
+            wait = self.request_bucket.reserve(1)
+        if self.token_bucket and tokens:
+            wait = max(wait, self.token_bucket.reserve(tokens))
+        if wait:
+            time.sleep(wait)
+
+    def release(self):
+        with self.condition:
+            self.active -= 1
+            self.condition.notify_all()
+
+    def backoff(self, attempt):
+        """Full-jitter exponential backoff"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class QuotaScheduler:
+    """Single gateway for quota-limited API calls.
+
+    Each call waits its turn by priority, spends from request and token
+    buckets, counts against the run's planned budget, and is retried with
+    jittered backoff (honouring Retry-After) while the provider's circuit
+    breaker pauses everyone after repeated failures.
+    """
+
+    def __init__(self, planner=None, metrics=None):
+        self.providers = {}
+        self.planner = planner or BudgetPlanner()
+        self.metrics = metrics
+
+    def add_provider(self, provider, monthly_quota=0, daily_quota=0):
+        self.providers[provider.name] = provider
+        self.planner.start_run(provider.name, monthly_quota, daily_quota)
+        return provider
+
+    def _count(self, name, event):
+        if self.metrics:
+            self.metrics.inc(f'scheduler_{name}_{event}')
+
+    def call(self, name, fn, priority=NORMAL, tokens=0):
+        """Run ``fn()`` under the provider's limits and retry policy and return its result"""
+        provider = self.providers[name]
+        for attempt in range(provider.max_retries + 1):
+            provider.breaker.before_call(name)
+            self.planner.consume(name, priority)
+            provider.acquire(priority, tokens)
+            try:
+                result = fn()
+            except QuotaExceeded:
+                self.planner.exhaust(name)
+                self._count(name, 'quota_exhausted')
+                raise
+            except Exception as e:
+                retryable, retry_after = retry_info(e)
+                if not retryable:
+                    raise
+                provider.breaker.failure(name)
+                if attempt == provider.max_retries:
+                    self._count(name, 'gave_up')
+                    raise
+                if retry_after:
+                    for bucket in (provider.request_bucket, provider.token_bucket):
+                        if bucket:
+                            bucket.pause(retry_after)
+                delay = retry_after or provider.backoff(attempt)
+                self._count(name, 'retries')
+                logger.warning(f"{name} call failed ({e}), retry {attempt + 1}/{provider.max_retries} in {delay:.1f}s")
+            else:
+                provider.breaker.success()
+                self._count(name, 'calls')
+                return result
+            finally:
+                provider.release()
+            # Sleep without holding a concurrency slot
+            time.sleep(delay)
+
+    def adjust_tokens(self, name, amount):
+        """Charge (or refund) the difference between estimated and actual token usage"""
+        bucket = self.providers[name].token_bucket
+        if bucket and amount:
+            bucket.adjust(amount)
+
+    def save(self):
+        self.planner.save()
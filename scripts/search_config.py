@@ -0,0 +1,36 @@
+# Search targets shared by the fetch and processing stages
+
+# ATS career sites searched via SerpAPI
+ATS_DOMAINS = [
+    'myworkdayjobs.com', 'greenhouse.io', 'lever.co',
+    'icims.com', 'smartrecruiters.com', 'taleo.net',
+    'jobvite.com', 'workforcenow.adp.com', 'bamboohr.com',
+    'brassring.com', 'breezy.hr', 'bullhorn.com',
+    'jazzhr.com', 'jobdiva.com', 'successfactors.com',
+]
+
+ROLE_TITLES = [
+    'product manager', 'senior product manager',
+    'associate product manager', 'principal product manager',
+]
+
+# Cities are grouped so each shard's OR clause stays short enough for Google
+CITY_GROUPS = [
+    ['Bengaluru', 'Bangalore', 'Hyderabad', 'Chennai'],
+    ['Delhi', 'New Delhi', 'Gurgaon', 'Gurugram', 'Noida'],
+    ['Mumbai', 'Pune', 'Kolkata', 'India'],
+]
+
+CITIES = [city for group in CITY_GROUPS for city in group]
+
+
+def _or_clause(terms, quote=False):
+    """Join terms into a parenthesised Google OR clause"""
+    parts = [f'"{t}"' if quote or ' ' in t else t for t in terms]
+    return f"({' OR '.join(parts)})"
+
+
+def build_query(domains, titles, cities):
+    """Build a boolean Google query restricted to the given ATS domains"""
+    sites = _or_clause([f'site:{d}' for d in domains])
+    return f"{sites} {_or_clause(titles, quote=True)} {_or_clause(cities)}"
@@ -0,0 +1,330 @@
+"""Inverted full-text index over the stored job history.
+
+Title, company, location and snippet are tokenized per field, with Indian
+city aliases folded together (Bangalore finds Bengaluru, Gurgaon finds
+Gurugram). The index lives in ``data/search_index/`` as append-only
+segments written whenever jobs are saved:
+
+- ``links.txt``: document id -> job link (line number)
+- ``seg-<first doc>.npz``: sorted field-qualified terms, per-term offsets,
+  gap-encoded document ids and the day each document was found, compressed
+
+Segments are merged once there are more than ``MAX_SEGMENTS``.
+
+Queries combine terms with implicit AND, ``OR``, ``-term`` / ``NOT``,
+parentheses, ``"quoted phrases"`` (all words present), ``field:term``
+(title, company, location/city, snippet) and trailing ``*`` prefixes:
+
+    python scripts/search_index.py 'product manager (bangalore OR gurgaon) -intern'
+    python scripts/search_index.py 'company:razor* title:senior' --since 2024-01-01 --limit 20
+    python scripts/search_index.py --rebuild
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import threading
+
+import numpy as np
+
+from dates import day_number
+from dedup import CITY_ALIASES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_DIR = 'data/search_index'
+MAX_SEGMENTS = 16
+
+# Single-letter field codes keep the term dictionary small
+FIELDS = {'title': 't', 'company': 'c', 'location': 'l', 'snippet': 's'}
+FIELD_NAMES = dict(FIELDS, city='l')
+
+# Multi-word aliases ("new delhi") already contain their canonical word
+TOKEN_ALIASES = {alias: city for alias, city in CITY_ALIASES.items() if ' ' not in alias}
+TOKEN_ALIASES.update({'banglore': 'bengaluru', 'blr': 'bengaluru', 'ggn': 'gurugram'})
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+QUERY_TOKEN_RE = re.compile(r'\(|\)|-?(?:\w+:)?"[^"]*"|[^\s()]+')
+
+
+def tokenize(text):
+    """Lowercase alphanumeric tokens with city aliases resolved"""
+    return [TOKEN_ALIASES.get(t, t) for t in TOKEN_RE.findall((text or '').lower())]
+
+
+class Segment:
+    """Postings for a contiguous range of document ids"""
+
+    def __init__(self, terms, offsets, docs, days, first_doc):
+        self.terms = terms
+        self.offsets = offsets
+        self.docs = docs
+        self.days = days
+        self.first_doc = first_doc
+
+    @classmethod
+    def build(cls, postings, days, first_doc):
+        """From {term: [doc ids in increasing order]}"""
+        terms = sorted(postings)
+        lengths = np.array([len(postings[t]) for t in terms], dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        docs = np.fromiter((d for t in terms for d in postings[t]), dtype=np.uint32, count=int(offsets[-1]))
+        return cls(np.array([t.encode('utf-8') for t in terms], dtype=bytes),
+                   offsets, docs, np.asarray(days, dtype=np.int32), first_doc)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            offsets = data['offsets']
+            gaps = data['gaps'].astype(np.int64)
+            # Each posting list is stored as its first id followed by gaps
+            running = np.cumsum(gaps)
+            starts = offsets[:-1]
+            base = np.repeat(np.where(starts > 0, running[np.maximum(starts - 1, 0)], 0), np.diff(offsets))
+            docs = (running - base).astype(np.uint32)
+            return cls(data['terms'], offsets, docs, data['days'], int(data['first_doc']))
+
+    def save(self, path):
+        gaps = self.docs.astype(np.int64)
+        gaps[1:] -= gaps[:-1].copy()
+        starts = self.offsets[:-1]
+        gaps[starts] = self.docs[starts]
+        tmp_path = path + '.tmp.npz'
+        np.savez_compressed(tmp_path, terms=self.terms, offsets=self.offsets, gaps=gaps.astype(np.uint32),
+                            days=self.days, first_doc=self.first_doc)
+        os.replace(tmp_path, path)
+
+    def lookup(self, term, prefix=False):
+        """Doc ids for a term (or every term starting with it)"""
+        key = term.encode('utf-8')
+        lo = np.searchsorted(self.terms, key, side='left')
+        hi = np.searchsorted(self.terms, key + b'\xff', side='left') if prefix else lo + 1
+        if lo >= len(self.terms) or (not prefix and self.terms[lo] != key):
+            return np.zeros(0, dtype=np.uint32)
+        return self.docs[self.offsets[lo]:self.offsets[hi]]
+
+
+class SearchIndex:
+    """Incrementally built inverted index with boolean, prefix and date-filtered queries"""
+
+    def __init__(self, path=DEFAULT_INDEX_DIR):
+        self.path = path
+        self.lock = threading.Lock()
+        self.links = []
+        self.segments = []
+        self.days = np.zeros(0, dtype=np.int32)
+
+        links_path = os.path.join(path, 'links.txt')
+        if os.path.exists(links_path):
+            with open(links_path, 'r', encoding='utf-8') as f:
+                self.links = f.read().split('\n')[:-1]
+        indexed = 0
+        for name in self._segment_files():
+            segment = Segment.load(os.path.join(path, name))
+            # Left over by a merge that died before deleting its inputs
+            if segment.first_doc < indexed:
+                continue
+            self.segments.append(segment)
+            indexed += len(segment.days)
+        # Links written by a run that died before its segment: drop them (they are re-added later)
+        if len(self.links) > indexed:
+            del self.links[indexed:]
+            with open(links_path, 'w', encoding='utf-8') as f:
+                f.write(''.join(f"{link}\n" for link in self.links))
+        if self.segments:
+            self.days = np.concatenate([s.days for s in self.segments])
+        self.link_set = set(self.links)
+
+    def _segment_files(self):
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(name for name in os.listdir(self.path) if name.startswith('seg-') and name.endswith('.npz'))
+
+    def __len__(self):
+        return len(self.links)
+
+    def add(self, jobs):
+        """Index jobs not indexed yet as one new segment; returns how many were added"""
+        with self.lock:
+            jobs = [job for job in jobs if job.get('link') and job['link'] not in self.link_set]
+            jobs = list({job['link']: job for job in jobs}.values())
+            if not jobs:
+                return 0
+            first_doc = len(self.links)
+            postings = {}
+            for doc, job in enumerate(jobs, start=first_doc):
+                for field, code in FIELDS.items():
+                    for token in set(tokenize(job.get(field))):
+                        postings.setdefault(f"{code}:{token}", []).append(doc)
+            segment = Segment.build(postings, [day_number(job.get('date_found')) for job in jobs], first_doc)
+
+            os.makedirs(self.path, exist_ok=True)
+            new_links = [job['link'] for job in jobs]
+            with open(os.path.join(self.path, 'links.txt'), 'a', encoding='utf-8') as f:
+                f.write(''.join(f"{link}\n" for link in new_links))
+            segment.save(os.path.join(self.path, f"seg-{first_doc:010d}.npz"))
+
+            self.links.extend(new_links)
+            self.link_set.update(new_links)
+            self.segments.append(segment)
+            self.days = np.concatenate([self.days, segment.days])
+            if len(self.segments) > MAX_SEGMENTS:
+                self._merge()
+            return len(jobs)
+
+    def _merge(self):
+        """Combine all segments into one"""
+        postings = {}
+        for segment in self.segments:
+            for i, term in enumerate(segment.terms.tolist()):
+                postings.setdefault(term, []).append(segment.docs[segment.offsets[i]:segment.offsets[i + 1]])
+        terms = sorted(postings)
+        lists = [np.concatenate(postings[t]) for t in terms]
+        offsets = np.concatenate([[0], np.cumsum([len(docs) for docs in lists])])
+        merged = Segment(np.array(terms, dtype=bytes), offsets, np.concatenate(lists), self.days.copy(), 0)
+
+        old_files = self._segment_files()
+        merged.save(os.path.join(self.path, f"seg-{0:010d}.npz"))
+        for name in old_files:
+            if name != f"seg-{0:010d}.npz":
+                os.remove(os.path.join(self.path, name))
+        self.segments = [merged]
+        logger.info(f"Search index: merged {len(old_files)} segments ({len(terms)} terms)")
+
+    def _term(self, value, field=None):
+        """Mask of docs with every token of value in one field (or any field)"""
+        prefix = value.endswith('*')
+        tokens = tokenize(value)
+        if not tokens:
+            return None
+        result = None
+        for i, token in enumerate(tokens):
+            is_prefix = prefix and i == len(tokens) - 1
+            mask = np.zeros(len(self.links), dtype=bool)
+            for code in ([field] if field else FIELDS.values()):
+                for segment in self.segments:
+                    mask[segment.lookup(f"{code}:{token}", is_prefix)] = True
+            result = mask if result is None else result & mask
+        return result
+
+    def _parse(self, query):
+        """Evaluate a query to a boolean mask over doc ids"""
+        tokens = QUERY_TOKEN_RE.findall(query)
+        position = 0
+
+        def peek():
+            return tokens[position] if position < len(tokens) else None
+
+        def expression():
+            nonlocal position
+            result = conjunction()
+            while peek() in ('OR', '|'):
+                position += 1
+                result = result | conjunction()
+            return result
+
+        def conjunction():
+            nonlocal position
+            result = np.ones(len(self.links), dtype=bool)
+            while peek() is not None and peek() not in ('OR', '|', ')'):
+                if peek() == 'AND':
+                    position += 1
+                    continue
+                negate, mask = unary()
+                if mask is not None:
+                    result &= ~mask if negate else mask
+            return result
+
+        def unary():
+            nonlocal position
+            token = peek()
+            if token is None:
+                return False, None
+            if token in ('NOT', '-'):
+                position += 1
+                negate, mask = unary()
+                return not negate, mask
+            if token.startswith('-'):
+                tokens[position] = token[1:]
+                negate, mask = unary()
+                return not negate, mask
+            position += 1
+            if token == '(':
+                mask = expression()
+                if peek() == ')':
+                    position += 1
+                return False, mask
+            field, _, value = token.partition(':')
+            if value and field.lower() in FIELD_NAMES:
+                return False, self._term(value.strip('"'), FIELD_NAMES[field.lower()])
+            return False, self._term(token.strip('"'))
+
+        return expression()
+
+    def search(self, query, since=None, until=None, limit=50):
+        """Links of matching jobs, newest first.
+
+        ``since`` / ``until`` are inclusive ISO dates on date_found.
+        """
+        with self.lock:
+            mask = self._parse(query)
+            if since:
+                mask &= self.days >= day_number(since)
+            if until:
+                mask &= self.days <= day_number(until)
+            docs = np.flatnonzero(mask)
+            # Newest first: by day, then by insertion order
+            keys = self.days[docs].astype(np.int64) * len(self.links) + docs
+            if limit is not None and len(docs) > limit:
+                top = np.argpartition(-keys, limit - 1)[:limit]
+                docs, keys = docs[top], keys[top]
+            return [self.links[i] for i in docs[np.argsort(-keys)]]
+
+    def count(self, query, since=None, until=None):
+        return len(self.search(query, since, until, limit=None))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Search the stored job history')
+    parser.add_argument('query', nargs='?', default='', help="e.g. 'product manager bangalore -intern'")
+    parser.add_argument('--since', help='only jobs found on or after this date (YYYY-MM-DD)')
+    parser.add_argument('--until', help='only jobs found on or before this date (YYYY-MM-DD)')
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--json', action='store_true', help='print full job records as JSON')
+    parser.add_argument('--rebuild', action='store_true', help='index every stored job from scratch')
+    args = parser.parse_args()
+
+    from job_store import open_store
+    store = open_store()
+    if args.rebuild:
+        shutil.rmtree(DEFAULT_INDEX_DIR, ignore_errors=True)
+        index = SearchIndex()
+        # Oldest first, so document ids follow history
+        added = index.add(list(reversed(store.load_jobs(include_closed=True))))
+        print(f"Indexed {added} jobs")
+        return
+
+    index = SearchIndex()
+    started = time.perf_counter()
+    links = index.search(args.query, args.since, args.until, args.limit)
+    elapsed = (time.perf_counter() - started) * 1000
+    jobs = store.get_jobs(links)
+    store.close()
+
+    if args.json:
+        json.dump(jobs, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    else:
+        for job in jobs:
+            print(f"{job.get('date_found', '')}  {job.get('title')} — {job.get('company')} ({job.get('location')})")
+            print(f"            {job.get('link')}")
+    print(f"{len(links)} results in {elapsed:.1f} ms ({len(index)} jobs indexed)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scheduler import HIGH, LOW, QuotaExceeded
+
+logger = logging.getLogger(__name__)
+
+SERPAPI_URL = "https://serpapi.com/search"
+
+
+class SerpFetcher:
+    """Fetch SerpAPI results as many small sharded queries instead of one giant OR query.
+
+    Shards come from ``ProfileRegistry.build_shards``. Each one targets a
+    single ATS domain and city group, is paged through with
+    ``start`` and runs concurrently with the other shards on a pooled session.
+    With a ``scheduler`` every page request goes through its ``serpapi``
+    provider: first pages of fresh shards are served before later pages.
+    Shards may carry their own ``tbs`` window and ``priority``; a shard
+    that hit an error is flagged ``incomplete`` so its watermark is not advanced.
+    """
+
+    def __init__(self, api_key, max_workers=8, max_pages=3, page_size=10,
+                 time_window='qdr:d', timeout=30, scheduler=None):
+        self.api_key = api_key
+        self.scheduler = scheduler
+        self.max_workers = max_workers
+        self.max_pages = max_pages
+        self.page_size = page_size
+        self.time_window = time_window
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount('https://', adapter)
+
+    def _get_page(self, params):
+        response = self.session.get(SERPAPI_URL, params=params, timeout=self.timeout)
+        if response.status_code == 429 and 'run out of searches' in response.text:
+            raise QuotaExceeded("SerpAPI account has run out of searches")
+        response.raise_for_status()
+        return response.json()
+
+    def fetch_shard(self, shard):
+        """Page through a single shard until results run out or max_pages is hit"""
+        results = []
+        priority = shard.get('priority', HIGH)
+        for page in range(self.max_pages):
+            params = {
+                'engine': 'google',
+                'q': shard['query'],
+                'api_key': self.api_key,
+                'num': self.page_size,
+                'start': page * self.page_size,
+                'gl': 'in',
+                'hl': 'en',
+                'tbs': shard.get('tbs', self.time_window),
+            }
+            try:
+                if self.scheduler:
+                    data = self.scheduler.call('serpapi', lambda: self._get_page(params),
+                                               priority=min(LOW, priority + page))
+                else:
+                    data = self._get_page(params)
+            except QuotaExceeded as e:
+                logger.warning(f"Skipping shard {shard['key']} page {page + 1}: {e}")
+                shard['incomplete'] = True
+                break
+            except Exception as e:
+                logger.error(f"Error fetching shard {shard['key']} page {page + 1}: {e}")
+                shard['incomplete'] = True
+                break
+
+            page_results = data.get('organic_results', [])
+            results.extend(page_results)
+
+            if len(page_results) < self.page_size or 'next' not in data.get('serpapi_pagination', {}):
+                break
+
+        return results
+
+    def iter_shards(self, shards):
+        """Yield (shard, results) pairs as each shard finishes"""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.fetch_shard, shard): shard for shard in shards}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
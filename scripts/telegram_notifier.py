@@ -0,0 +1,219 @@
+import re
+import time
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+TELEGRAM_API = "https://api.telegram.org"
+MAX_MESSAGE_LENGTH = 4096
+
+MARKDOWN_V2_SPECIAL = re.compile(r'([_*\[\]()~`>#+\-=|{}.!\\])')
+MARKDOWN_V2_URL_SPECIAL = re.compile(r'([)\\])')
+
+NO_JOBS_MESSAGE = """🔍 Daily Job Search Complete
+
+No new Product Manager positions found today from ATS sites.
+
+The automation searched through:
+• Workday, Greenhouse, Lever
+• ICIMS, SmartRecruiters, Taleo
+• BambooHR, Breezy, JazzHR
+• And 6+ more ATS platforms
+
+Try again tomorrow! 🚀
+
+#JobSearch #ProductManager #India"""
+
+
+def escape_markdown_v2(text):
+    """Escape every character MarkdownV2 treats as markup"""
+    return MARKDOWN_V2_SPECIAL.sub(r'\\\1', str(text))
+
+
+def escape_markdown_v2_url(url):
+    """Escape a URL for use inside a MarkdownV2 inline link"""
+    return MARKDOWN_V2_URL_SPECIAL.sub(r'\\\1', str(url))
+
+
+def format_job(index, job):
+    """Format one job as a MarkdownV2 block"""
+    title = job.get('title', 'N/A')[:80]
+    company = job.get('company', 'N/A')
+    location = job.get('location', 'N/A').split(',')[0]  # Just city
+    link = job.get('link', '#')
+    return (
+        f"{index}\\. *{escape_markdown_v2(title)}*\n"
+        f"🏢 {escape_markdown_v2(company)}\n"
+        f"📍 {escape_markdown_v2(location)}\n"
+        f"🔗 [Apply Now]({escape_markdown_v2_url(link)})\n\n"
+    )
+
+
+def message_length(text):
+    """Length as Telegram counts it (UTF-16 code units), ignoring that escapes are dropped"""
+    return len(text.encode('utf-16-le')) // 2
+
+
+def build_messages(jobs, dashboard_url, heading='Product Manager'):
+    """Split all jobs into MarkdownV2 messages under Telegram's length limit"""
+    if not jobs:
+        return [escape_markdown_v2(NO_JOBS_MESSAGE)]
+
+    header = f"🎯 *{len(jobs)} New {escape_markdown_v2(heading)} Jobs Found\\!*\n\n"
+    footer = (
+        f"📊 [View Full Dashboard]({escape_markdown_v2_url(dashboard_url)})\n\n"
+        + escape_markdown_v2("#ProductManager #Jobs #India #ATS")
+    )
+
+    messages = []
+    current = header
+    for i, job in enumerate(jobs, 1):
+        block = format_job(i, job)
+        if message_length(current) + message_length(block) > MAX_MESSAGE_LENGTH:
+            messages.append(current.rstrip())
+            current = ''
+        current += block
+
+    if message_length(current) + message_length(footer) > MAX_MESSAGE_LENGTH:
+        messages.append(current.rstrip())
+        current = ''
+    messages.append(current + footer)
+    return messages
+
+
+class ChatRateLimiter:
+    """Space out sends per chat and globally, as Telegram throttles both"""
+
+    def __init__(self, per_chat_interval=1.0, global_interval=1 / 30):
+        self.per_chat_interval = per_chat_interval
+        self.global_interval = global_interval
+        self.lock = threading.Lock()
+        self.next_chat_slot = {}
+        self.next_global_slot = 0.0
+
+    def wait(self, chat_id):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_chat_slot.get(chat_id, 0.0), self.next_global_slot)
+            self.next_chat_slot[chat_id] = slot + self.per_chat_interval
+            self.next_global_slot = slot + self.global_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def defer(self, chat_id, seconds):
+        """Push a chat's next slot back after Telegram asked us to slow down"""
+        with self.lock:
+            self.next_chat_slot[chat_id] = max(
+                self.next_chat_slot.get(chat_id, 0.0), time.monotonic() + seconds
+            )
+
+
+def retry_after(response, attempt):
+    """Seconds to wait after a 429: Telegram's ``retry_after``, else the Retry-After header, else backoff.
+
+    Proxies in front of the Bot API may answer 429 with HTML or other JSON.
+    """
+    try:
+        value = response.json().get('parameters', {}).get('retry_after')
+    except (ValueError, AttributeError):
+        value = None
+    if value is None:
+        value = response.headers.get('Retry-After')
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return min(2 ** attempt, 30)
+
+
+class TelegramNotifier:
+    """Deliver job alerts to one or more Telegram chats.
+
+    Uses a persistent session, splits every new job into length-limited
+    MarkdownV2 messages, honours ``retry_after`` on 429 responses and
+    retries transient failures with jittered exponential backoff.
+    """
+
+    def __init__(self, bot_token, chat_ids, dashboard_url, max_retries=5, timeout=30):
+        self.bot_token = bot_token
+        self.chat_ids = chat_ids
+        self.dashboard_url = dashboard_url
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.rate_limiter = ChatRateLimiter()
+
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_maxsize=max(len(chat_ids), 1)))
+
+    @property
+    def url(self):
+        return f"{TELEGRAM_API}/bot{self.bot_token}/sendMessage"
+
+    def send_message(self, chat_id, text):
+        """Send one message, retrying throttled and transient failures"""
+        data = {
+            'chat_id': chat_id,
+            'text': text,
+            'parse_mode': 'MarkdownV2',
+            'disable_web_page_preview': False
+        }
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.wait(chat_id)
+            try:
+                response = self.session.post(self.url, json=data, timeout=self.timeout)
+            except requests.RequestException as e:
+                logger.warning(f"Telegram request to chat {chat_id} failed: {e}")
+                time.sleep(min(2 ** attempt, 30) * random.uniform(0.5, 1.5))
+                continue
+
+            if response.ok:
+                return True
+
+            if response.status_code == 429:
+                delay = retry_after(response, attempt)
+                logger.warning(f"Telegram throttled chat {chat_id}, retrying after {delay}s")
+                self.rate_limiter.defer(chat_id, delay)
+                continue
+
+            if response.status_code == 400 and 'parse_mode' in data:
+                # Formatting rejected: resend the same content as plain text
+                logger.warning(f"Telegram rejected MarkdownV2 for chat {chat_id}: {response.text[:200]}")
+                data = {'chat_id': chat_id, 'text': re.sub(r'\\(.)', r'\1', text)}
+                continue
+
+            if response.status_code >= 500:
+                time.sleep(min(2 ** attempt, 30) * random.uniform(0.5, 1.5))
+                continue
+
+            logger.error(f"Telegram error for chat {chat_id}: {response.status_code} {response.text[:200]}")
+            return False
+
+        logger.error(f"Giving up on Telegram message to chat {chat_id} after {self.max_retries + 1} attempts")
+        return False
+
+    def _send_to_chat(self, chat_id, messages):
+        sent = 0
+        for message in messages:
+            if self.send_message(chat_id, message):
+                sent += 1
+        return sent
+
+    def send_jobs(self, jobs, chat_ids=None, heading='Product Manager'):
+        """Send all jobs to every chat (or just ``chat_ids``) concurrently.
+
+        Returns {chat_id: True if every message was delivered}.
+        """
+        chat_ids = self.chat_ids if chat_ids is None else chat_ids
+        messages = build_messages(jobs, self.dashboard_url, heading)
+        with ThreadPoolExecutor(max_workers=max(len(chat_ids), 1)) as executor:
+            counts = executor.map(lambda chat_id: self._send_to_chat(chat_id, messages), chat_ids)
+            results = dict(zip(chat_ids, counts))
+
+        for chat_id, sent in results.items():
+            logger.info(f"Telegram: sent {sent}/{len(messages)} messages to chat {chat_id}")
+        return {chat_id: sent == len(messages) for chat_id, sent in results.items()}
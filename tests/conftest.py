@@ -0,0 +1,100 @@
+import os
+import sys
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(ROOT, 'tests', 'fixtures')
+
+# Scripts import each other by bare module name, as when run as scripts/<name>.py
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def load_fixture(name):
+    return json.loads(read_fixture(name))
+
+
+class FakeServer:
+    """Local HTTP stand-in: serves ``routes`` and logs every request.
+
+    ``routes`` maps a path (query string included) to a dict with ``status``
+    (default 200), ``body`` (str or JSON-serializable), ``headers`` and
+    optional ``etag`` / ``last_modified`` validators; a request sending a
+    matching If-None-Match or If-Modified-Since gets 304. A list of such
+    dicts is answered in order, repeating the last one. POST is served like GET.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append((self.path, dict(self.headers)))
+                route = server.routes.get(self.path)
+                if isinstance(route, list):
+                    route = route.pop(0) if len(route) > 1 else route[0]
+                if route is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                etag = route.get('etag')
+                last_modified = route.get('last_modified')
+                if ((etag and self.headers.get('If-None-Match') == etag)
+                        or (last_modified and self.headers.get('If-Modified-Since') == last_modified)):
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                body = route.get('body', '')
+                if not isinstance(body, str):
+                    body = json.dumps(body)
+                payload = body.encode('utf-8')
+                self.send_response(route.get('status', 200))
+                for name, value in route.get('headers', {}).items():
+                    self.send_header(name, value)
+                if etag:
+                    self.send_header('ETag', etag)
+                if last_modified:
+                    self.send_header('Last-Modified', last_modified)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                self.do_GET()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def fake_server():
+    server = FakeServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run in an empty directory so data/ files never touch the repository"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,90 @@
+import json
+
+from ats_connectors import BoardPoller, GreenhouseConnector, LeverConnector, SmartRecruitersConnector
+from classifier import RoleMatcher
+from conftest import load_fixture
+
+
+def test_greenhouse_parse_keeps_indian_pm_postings():
+    board = {'token': 'phonepe', 'company': 'PhonePe'}
+    jobs = list(GreenhouseConnector(None).parse(board, load_fixture('greenhouse_board.json')))
+
+    assert [job['link'] for job in jobs] == ['https://boards.greenhouse.io/phonepe/jobs/5123401']
+    job = jobs[0]
+    assert job['title'] == 'Senior Product Manager, Payments'
+    assert job['company'] == 'PhonePe'
+    assert job['location'] == 'Bengaluru, India'
+    assert job['snippet'].startswith('Own the merchant payments roadmap')
+    assert '<' not in job['snippet']
+    assert job['source'] == 'greenhouse'
+
+
+def test_lever_parse_uses_all_locations():
+    board = {'token': 'cred', 'company': 'CRED'}
+    jobs = list(LeverConnector(None).parse(board, load_fixture('lever_board.json')))
+
+    assert [(job['title'], job['location']) for job in jobs] == [
+        ('Product Manager - Growth', 'Mumbai, India'),
+        ('Associate Product Manager', 'Hyderabad, India'),
+    ]
+    assert jobs[0]['link'] == 'https://jobs.lever.co/cred/8f1c2d9e-5a77-4c1b-9a0e-1f6f3b2c4d10'
+
+
+def test_smartrecruiters_parse_builds_posting_links():
+    board = {'token': 'Freshworks', 'company': 'Freshworks'}
+    jobs = list(SmartRecruitersConnector(None).parse(board, load_fixture('smartrecruiters_board.json')))
+
+    assert len(jobs) == 1
+    assert jobs[0]['title'] == 'Principal Product Manager'
+    assert jobs[0]['location'] == 'Chennai, India'
+    assert jobs[0]['link'] == 'https://jobs.smartrecruiters.com/Freshworks/744000012345678'
+
+
+def test_parse_follows_profile_roles():
+    board = {'token': 'phonepe', 'company': 'PhonePe'}
+    connector = GreenhouseConnector(None, roles=RoleMatcher(['backend engineer']))
+    jobs = list(connector.parse(board, load_fixture('greenhouse_board.json')))
+
+    assert [job['title'] for job in jobs] == ['Backend Engineer']
+
+
+def test_poller_merges_boards_and_revalidates_with_etag(workdir, fake_server):
+    fake_server.routes = {
+        '/greenhouse/phonepe/jobs?content=true': {
+            'body': load_fixture('greenhouse_board.json'), 'etag': '"gh-v1"',
+        },
+        '/lever/cred?mode=json': {
+            'body': load_fixture('lever_board.json'),
+            'last_modified': 'Thu, 02 May 2024 10:00:00 GMT',
+        },
+        '/smartrecruiters/Freshworks/postings?country=in&limit=100': {
+            'body': load_fixture('smartrecruiters_board.json'), 'etag': '"sr-v1"',
+        },
+    }
+    watchlist = {
+        'greenhouse': [{'token': 'phonepe', 'company': 'PhonePe'}],
+        'lever': [{'token': 'cred', 'company': 'CRED'}],
+        'smartrecruiters': [{'token': 'Freshworks'}],
+    }
+    (workdir / 'watchlist.json').write_text(json.dumps(watchlist))
+    base_urls = {name: f"{fake_server.url}/{name}" for name in watchlist}
+
+    poller = BoardPoller('watchlist.json', state_file='data/state.json', base_urls=base_urls)
+    jobs = poller.fetch_all()
+    assert sorted(job['source'] for job in jobs) == ['greenhouse', 'lever', 'lever', 'smartrecruiters']
+
+    state = json.loads((workdir / 'data' / 'state.json').read_text())
+    assert state['greenhouse:phonepe']['etag'] == '"gh-v1"'
+    assert state['lever:cred']['last_modified'] == 'Thu, 02 May 2024 10:00:00 GMT'
+
+    # A fresh poller reloads the validators; unchanged boards answer 304 and yield nothing
+    fake_server.requests.clear()
+    poller = BoardPoller('watchlist.json', state_file='data/state.json', base_urls=base_urls)
+    assert poller.fetch_all() == []
+    sent = {path: headers for path, headers in fake_server.requests}
+    assert sent['/greenhouse/phonepe/jobs?content=true']['If-None-Match'] == '"gh-v1"'
+    assert sent['/lever/cred?mode=json']['If-Modified-Since'] == 'Thu, 02 May 2024 10:00:00 GMT'
+
+    # A 304 keeps the stored validators for the next run
+    state = json.loads((workdir / 'data' / 'state.json').read_text())
+    assert state['smartrecruiters:Freshworks']['etag'] == '"sr-v1"'
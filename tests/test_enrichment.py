@@ -0,0 +1,96 @@
+from datetime import date
+
+from classifier import ACCEPT, AMBIGUOUS, REJECT
+from conftest import read_fixture
+from enrichment import Enricher, decide_from_posting, is_expired, parse_job_posting
+
+
+def result_for(link):
+    return {'title': 'Product Manager', 'link': link, 'snippet': ''}
+
+
+def test_parse_valid_posting():
+    posting = parse_job_posting(read_fixture('posting_valid.html'))
+
+    assert posting['title'] == 'Senior Product Manager - Payments'
+    assert posting['company'] == 'Razorpay'
+    assert posting['location'] == 'Bengaluru, Karnataka, India'
+    assert posting['countries'] == ['IN']
+    assert posting['date_posted'] == '2024-05-02'
+    assert posting['valid_through'] == '2099-12-31'
+    assert posting['employment_type'] == 'FULL_TIME'
+    assert posting['description'].startswith('Own the checkout and payment links roadmap')
+
+
+def test_valid_posting_is_accepted_without_the_model():
+    link = 'https://jobs.lever.co/razorpay/0d6c7a1e'
+    posting = parse_job_posting(read_fixture('posting_valid.html'))
+    decision, job = decide_from_posting(result_for(link), posting)
+
+    assert decision == ACCEPT
+    assert job['link'] == link
+    assert job['company'] == 'Razorpay'
+    assert job['location'] == 'Bengaluru, Karnataka, India'
+    assert job['date_posted'] == '2024-05-02'
+    assert job['source_data'] == 'jsonld'
+
+
+def test_expired_posting_is_rejected():
+    posting = parse_job_posting(read_fixture('posting_expired.html'))
+
+    assert posting['valid_through'] == '2024-04-30'
+    assert is_expired(posting)
+    assert not is_expired(posting, today=date(2024, 4, 30))
+    assert decide_from_posting(result_for('https://jobs.lever.co/meesho/1'), posting) == (REJECT, None)
+
+
+def test_posting_outside_india_is_rejected():
+    posting = parse_job_posting(read_fixture('posting_foreign.html'))
+
+    assert posting['location'] == 'London, GB'
+    assert decide_from_posting(result_for('https://jobs.lever.co/freshworks/2'), posting) == (REJECT, None)
+
+
+def test_posting_inside_graph_wrapper():
+    posting = parse_job_posting(read_fixture('posting_graph.html'))
+
+    assert posting['title'] == 'Associate Product Manager'
+    assert posting['company'] == 'Zeta'
+    assert posting['location'] == 'Pune, Maharashtra, India'
+    assert posting['employment_type'] == 'FULL_TIME, INTERN'
+
+
+def test_malformed_json_ld_is_ignored():
+    posting = parse_job_posting(read_fixture('posting_malformed.html'))
+
+    assert posting is None
+    assert decide_from_posting(result_for('https://jobs.lever.co/swiggy/3'), posting) == (AMBIGUOUS, None)
+
+
+def test_enricher_caches_by_etag(workdir, fake_server):
+    fake_server.routes = {
+        '/razorpay/jobs/1': {'body': read_fixture('posting_valid.html'), 'etag': '"page-v1"'},
+        '/swiggy/jobs/2': {'body': read_fixture('posting_malformed.html')},
+    }
+    valid, malformed = f"{fake_server.url}/razorpay/jobs/1", f"{fake_server.url}/swiggy/jobs/2"
+    # max_age_hours=0: every call revalidates, so the second one goes out as a conditional request
+    enricher = Enricher(cache_path='data/enrichment_cache.db', max_workers=2, processes=1, max_age_hours=0)
+    try:
+        postings = enricher.fetch_postings([valid, malformed])
+        assert postings[valid]['company'] == 'Razorpay'
+        assert postings[malformed] is None
+
+        fake_server.requests.clear()
+        assert enricher.fetch_postings([valid]) == {valid: postings[valid]}
+        assert fake_server.requests[0][1]['If-None-Match'] == '"page-v1"'
+    finally:
+        enricher.close()
+
+    # A fresh cache entry is served without a request at all
+    fake_server.requests.clear()
+    enricher = Enricher(cache_path='data/enrichment_cache.db', processes=1)
+    try:
+        assert enricher.fetch_postings([valid])[valid]['title'] == 'Senior Product Manager - Payments'
+        assert fake_server.requests == []
+    finally:
+        enricher.close()
@@ -0,0 +1,72 @@
+import os
+
+os.environ.setdefault('GROQ_API_KEY', 'test')
+
+from job_search import JobSearchAutomation
+from metrics import RunMetrics
+
+
+class ScriptedModel(JobSearchAutomation):
+    """Stands in for Groq: reads ``capacity`` results per call, then stops mid-array.
+
+    Even-numbered results are product roles; their jobs come back with a
+    tracking parameter on the link, as the model sometimes copies it.
+    """
+
+    def __init__(self, capacity, max_continuations=2, repeat_last=False):
+        self.capacity = capacity
+        self.max_continuations = max_continuations
+        self.repeat_last = repeat_last
+        self.metrics = RunMetrics('test')
+        self.calls = []
+        self.last_job = None
+
+    def stream_completion(self, batch, on_job=None):
+        self.calls.append([result['link'] for result in batch])
+        if self.repeat_last and self.last_job:
+            on_job(self.last_job)
+        for result in batch[:self.capacity]:
+            if int(result['link'].rsplit('/', 1)[-1]) % 2 == 0:
+                self.last_job = {'title': 'Product Manager', 'company': 'Acme', 'location': 'Pune, India',
+                                 'link': result['link'] + '?utm_source=google', 'snippet': '',
+                                 'date_found': '2024-05-01'}
+                on_job(self.last_job)
+        return [], len(batch) > self.capacity
+
+
+def make_batch(count):
+    return [{'link': f'https://jobs.example.com/{i}', 'title': f'Result {i}'} for i in range(count)]
+
+
+def test_continuation_sends_only_results_not_reached(workdir):
+    model = ScriptedModel(capacity=4)
+    emitted = []
+    jobs, done = model.extract_batch(make_batch(10), on_job=emitted.append)
+
+    # Results are matched by canonical link, so the tail is continued rather than the batch split
+    assert model.calls[1] == [f'https://jobs.example.com/{i}' for i in range(3, 10)]
+    assert len(model.calls) == 3
+    assert [job['link'].split('?')[0].rsplit('/', 1)[-1] for job in emitted] == ['0', '2', '4', '6', '8']
+    assert jobs == emitted
+    assert len(done) == 10
+
+
+def test_each_link_is_emitted_once(workdir):
+    model = ScriptedModel(capacity=4, repeat_last=True)
+    emitted = []
+    jobs, _ = model.extract_batch(make_batch(10), on_job=emitted.append)
+
+    links = [job['link'] for job in emitted]
+    assert len(links) == len(set(links)) == 5
+    assert jobs == emitted
+
+
+def test_exhausted_continuations_keep_the_partial_outcome(workdir):
+    model = ScriptedModel(capacity=3, max_continuations=1)
+    emitted = []
+    jobs, done = model.extract_batch(make_batch(12), on_job=emitted.append)
+
+    assert len(model.calls) == 2
+    assert [job['link'] for job in jobs] == [job['link'] for job in emitted]
+    # Results the model never reached are left out of the outcome, so they are retried later
+    assert [result['link'].rsplit('/', 1)[-1] for result in done] == [str(i) for i in range(5)]
@@ -0,0 +1,71 @@
+from incremental import ShardWatermarks, time_window
+from scheduler import HIGH, NORMAL
+
+HOUR = 3600
+
+
+def make_shards(count):
+    return [{'key': f'shard-{i}'} for i in range(count)]
+
+
+def run_once(watermarks, shards, started_at, results_per_shard):
+    """Plan one run at ``started_at``, 'fetch' the planned shards and commit"""
+    watermarks.started_at = started_at
+    planned = watermarks.plan([dict(shard) for shard in shards])
+    for shard in planned:
+        count = results_per_shard.get(shard['key'], 1)
+        links = [{'link': f"https://jobs.example.com/{shard['key']}/{started_at}/{i}"} for i in range(count)]
+        watermarks.filter_new(shard, links)
+    watermarks.commit()
+    return planned
+
+
+def test_time_window():
+    assert time_window(None) == 'qdr:d'
+    assert time_window(0.5 * HOUR) == 'qdr:h2'
+    assert time_window(20 * HOUR) == 'qdr:h21'
+    assert time_window(30 * HOUR) == 'qdr:d2'
+    assert time_window(10 * 24 * HOUR) == 'qdr:w'
+
+
+def test_fixed_refresh_spreads_shards_over_the_day(workdir):
+    shards = make_shards(48)
+    watermarks = ShardWatermarks(refresh_hours=24, runs_per_day=24)
+    start = watermarks.started_at
+
+    first = run_once(watermarks, shards, start, {})
+    assert len(first) == 2
+    assert {shard['priority'] for shard in first} == {HIGH}
+
+    fetched = [shard['key'] for shard in first]
+    for run in range(1, 24):
+        fetched += [shard['key'] for shard in run_once(watermarks, shards, start + run * HOUR, {})]
+    assert sorted(fetched) == sorted(shard['key'] for shard in shards)
+
+    # A day later the first shards are due again, with a window covering the day
+    again = run_once(watermarks, shards, start + 24 * HOUR, {})
+    assert [shard['key'] for shard in again] == [shard['key'] for shard in first]
+    assert {(shard['tbs'], shard['priority']) for shard in again} == {('qdr:d2', NORMAL)}
+    watermarks.close()
+
+
+def test_budget_sends_hot_shards_hourly_windows(workdir):
+    shards = make_shards(45)
+    hot = {'shard-0': 40, 'shard-1': 40}
+    watermarks = ShardWatermarks(runs_per_day=24, daily_fetches=100)
+    start = watermarks.started_at
+
+    windows = {shard['key']: [] for shard in shards}
+    total = 0
+    for run in range(48):
+        planned = run_once(watermarks, shards, start + run * HOUR, hot)
+        total += len(planned)
+        for shard in planned:
+            windows[shard['key']].append(shard['tbs'])
+
+    assert total <= 2 * 100 + 24
+    # Once every shard has had its first fetch, hot shards come back within hours, quiet ones about daily
+    assert all(tbs.startswith('qdr:h') and int(tbs[5:] or 1) <= 4 for tbs in windows['shard-0'][2:])
+    assert len(windows['shard-0']) > 4 * len(windows['shard-44'])
+    assert all(len(fetches) >= 1 for fetches in windows.values())
+    watermarks.close()
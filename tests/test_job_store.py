@@ -0,0 +1,58 @@
+from job_store import JobStore
+
+
+def make_job(n, company='Acme', location='Pune, India', day='2024-05-01'):
+    return {
+        'title': f'Product Manager {n}',
+        'company': company,
+        'location': location,
+        'link': f'https://jobs.example.com/{n}',
+        'snippet': 'Own the roadmap',
+        'date_found': day,
+    }
+
+
+def stats_rows(store):
+    return {
+        table: sorted(tuple(row) for row in store.conn.execute(f"SELECT * FROM {table}"))
+        for table in ('stats_daily', 'stats_company', 'stats_city')
+    }
+
+
+def rebuilt_rows(store):
+    fresh = JobStore(store.path)
+    fresh.stats.rebuild(fresh.load_jobs())
+    rows = stats_rows(fresh)
+    fresh.close()
+    return rows
+
+
+def test_updated_details_move_statistics(workdir):
+    store = JobStore('data/jobs.db')
+    assert store.save_new_jobs([make_job(1), make_job(2), make_job(3, company='Zeta')]) != []
+
+    # The same links again, now attributed to another company and city
+    assert store.save_new_jobs([make_job(1, company='Acme Corp', location='Bengaluru, India'),
+                                make_job(2, location='Mumbai, India')]) == []
+
+    counters = store.stats.counters('2024-05-01')
+    assert counters == {'total_jobs': 3, 'new_today': 3, 'companies': 3, 'cities': 3}
+    assert {row['company']: row['count'] for row in store.stats.top_companies()} == {
+        'Acme': 1, 'Acme Corp': 1, 'Zeta': 1,
+    }
+    assert stats_rows(store) == rebuilt_rows(store)
+    store.close()
+
+
+def test_updates_to_closed_jobs_stay_uncounted(workdir):
+    store = JobStore('data/jobs.db')
+    store.save_new_jobs([make_job(1), make_job(2)])
+    store.record_liveness([{'link': make_job(1)['link'], 'status': 'closed', 'http_status': 404,
+                            'etag': None, 'last_modified': None, 'last_checked': 1.0}])
+
+    store.upsert_jobs([make_job(1, company='Other', location='Delhi, India')])
+
+    assert store.stats.counters('2024-05-01')['total_jobs'] == 1
+    assert [row['company'] for row in store.stats.top_companies()] == ['Acme']
+    assert stats_rows(store) == rebuilt_rows(store)
+    store.close()
@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+from job_store import JobStore
+from liveness import CLOSED, OPEN, UNKNOWN, LivenessChecker
+
+CLOSED_PAGE = '<html><body><h1>Sorry, this position has been filled.</h1></body></html>'
+OPEN_PAGE = '<html><body><h1>Product Manager</h1><a href="/apply">Apply</a></body></html>'
+
+
+def make_job(link, day='2024-05-01'):
+    return {
+        'title': 'Product Manager',
+        'company': f"Company {link.rsplit('/', 1)[-1]}",
+        'location': 'Pune, India',
+        'link': link,
+        'snippet': 'Own the roadmap',
+        'date_found': day,
+    }
+
+
+def test_run_marks_closed_postings_against_local_server(workdir, fake_server):
+    fake_server.routes = {
+        '/jobs/open': {'body': OPEN_PAGE, 'etag': '"open-v1"'},
+        '/jobs/removed': {'status': 404},
+        '/jobs/filled': {'body': CLOSED_PAGE},
+        '/jobs/moved': {'status': 302, 'headers': {'Location': '/careers/'}},
+        '/careers/': {'body': OPEN_PAGE},
+        '/jobs/flaky': {'status': 503},
+    }
+    names = ['open', 'removed', 'filled', 'moved', 'flaky']
+    store = JobStore('data/jobs.db')
+    store.save_new_jobs([make_job(f"{fake_server.url}/jobs/{name}") for name in names])
+    assert store.stats.counters('2024-05-01')['total_jobs'] == 5
+
+    checker = LivenessChecker(store, max_workers=4, per_host_limit=2, recheck_after_hours=0)
+    assert checker.run() == {OPEN: 1, CLOSED: 3, UNKNOWN: 1}
+
+    visible = {job['link'].rsplit('/', 1)[-1] for job in store.load_jobs()}
+    assert visible == {'open', 'flaky'}
+    # Closed postings leave the dashboard counters too
+    counters = store.stats.counters('2024-05-01')
+    assert counters['total_jobs'] == 2
+    assert counters['companies'] == 2
+
+    # The next run revalidates with the stored ETag, skips closed links and retries the failed one
+    fake_server.requests.clear()
+    assert checker.run() == {OPEN: 1, CLOSED: 0, UNKNOWN: 1}
+    sent = {path: headers for path, headers in fake_server.requests}
+    assert set(sent) == {'/jobs/open', '/jobs/flaky'}
+    assert sent['/jobs/open']['If-None-Match'] == '"open-v1"'
+    store.close()
+
+
+def test_classify_uses_ats_specific_markers():
+    link = 'https://jobs.lever.co/acme/8f1c2d9e'
+    response = SimpleNamespace(status_code=200, history=[], url=link)
+    body = "<p>Sorry, we couldn't find anything here.</p>"
+
+    assert LivenessChecker.classify(link, response, body) == CLOSED
+    assert LivenessChecker.classify(link, response, OPEN_PAGE) == OPEN
+    # The same wording on another host is not a closed marker
+    other = 'https://careers.example.com/jobs/123'
+    assert LivenessChecker.classify(other, SimpleNamespace(status_code=200, history=[], url=other), body) == OPEN
@@ -0,0 +1,45 @@
+import telegram_notifier
+from telegram_notifier import ChatRateLimiter, TelegramNotifier
+
+THROTTLED_HTML = '<html><head><title>429 Too Many Requests</title></head><body>nginx</body></html>'
+
+
+def make_notifier(monkeypatch, fake_server, max_retries=3):
+    monkeypatch.setattr(telegram_notifier, 'TELEGRAM_API', fake_server.url)
+    notifier = TelegramNotifier('token', ['42'], 'https://example.github.io/jobs', max_retries=max_retries)
+    notifier.rate_limiter = ChatRateLimiter(per_chat_interval=0, global_interval=0)
+    return notifier
+
+
+def test_telegram_retry_after_is_honoured(monkeypatch, fake_server):
+    fake_server.routes = {'/bottoken/sendMessage': [
+        {'status': 429, 'body': {'ok': False, 'parameters': {'retry_after': 0}}},
+        {'body': {'ok': True}},
+    ]}
+    notifier = make_notifier(monkeypatch, fake_server)
+
+    assert notifier.send_message('42', 'hello')
+    assert len(fake_server.requests) == 2
+
+
+def test_proxy_429_without_json_falls_back_to_header(monkeypatch, fake_server):
+    fake_server.routes = {'/bottoken/sendMessage': [
+        {'status': 429, 'body': THROTTLED_HTML, 'headers': {'Retry-After': '0'}},
+        {'status': 429, 'body': {'ok': False, 'description': 'Too Many Requests'}, 'headers': {'Retry-After': '0'}},
+        {'body': {'ok': True}},
+    ]}
+    notifier = make_notifier(monkeypatch, fake_server)
+
+    assert notifier.send_message('42', 'hello')
+    assert len(fake_server.requests) == 3
+
+
+def test_retry_after_falls_back_to_backoff():
+    class Response:
+        headers = {'Retry-After': 'Wed, 21 Oct 2026 07:28:00 GMT'}
+
+        def json(self):
+            raise ValueError('not JSON')
+
+    assert telegram_notifier.retry_after(Response(), attempt=2) == 4
+    assert telegram_notifier.retry_after(Response(), attempt=10) == 30